@@ -1,16 +1,53 @@
 """Activity Logger — Cryptographically verified audit trail"""
+import asyncio
 import hashlib
+import hmac
 import json
 import os
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
+import orjson
 import structlog
 
 logger = structlog.get_logger()
 
+# Entry hash encodings. Entries carry the version they were hashed with, so
+# chains written before a version change keep verifying unchanged.
+#   1: json.dumps(sort_keys=True) — legacy, entries without a "hash_version"
+#   2: orjson with sorted keys — compact UTF-8, several times
+#      faster; non-finite floats encode (and are stored) as null. orjson
+#      can't encode integers outside 64 bits (u128 amounts), so entries
+#      holding one are hashed and stored as v1 instead
+HASH_VERSIONS = (1, 2)
+CURRENT_HASH_VERSION = 2
+_ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+class LogCorruptedError(Exception):
+    """Raised when a log segment cannot be resumed without discarding entries"""
+
+
+def canonical_bytes(payload: dict, version: int = CURRENT_HASH_VERSION) -> bytes:
+    """Deterministic encoding of a hash payload under a given hash version"""
+    if version == 2:
+        return orjson.dumps(payload, option=_ORJSON_OPTIONS)
+    if version == 1:
+        return json.dumps(payload, sort_keys=True).encode()
+    raise ValueError(f"unknown hash version: {version}")
+
+
+def _loads(line: bytes):
+    if b'"hash_version":' not in line:
+        # v1 lines may hold NaN/Infinity, which orjson rejects, and integers
+        # beyond 64 bits, which orjson would turn into floats
+        return json.loads(line)
+    return orjson.loads(line)
+
 
 @dataclass
 class ActivityEntry:
@@ -21,20 +58,24 @@ class ActivityEntry:
     entry_hash: str = ""
     previous_hash: str = ""
     sequence: int = 0
+    hash_version: int = 1
 
     def compute_hash(self) -> str:
         """Compute SHA-256 hash of this entry"""
-        data = json.dumps({
+        payload = {
             "timestamp": self.timestamp,
             "action": self.action,
             "details": self.details,
             "previous_hash": self.previous_hash,
             "sequence": self.sequence,
-        }, sort_keys=True)
-        return hashlib.sha256(data.encode()).hexdigest()
+        }
+        if self.hash_version != 1:
+            # Hashed too, so an entry cannot be re-read under another encoding
+            payload["hash_version"] = self.hash_version
+        return hashlib.sha256(canonical_bytes(payload, self.hash_version)).hexdigest()
 
     def to_dict(self) -> dict:
-        return {
+        data = {
             "timestamp": self.timestamp,
             "action": self.action,
             "details": self.details,
@@ -42,6 +83,15 @@ class ActivityEntry:
             "previous_hash": self.previous_hash,
             "sequence": self.sequence,
         }
+        if self.hash_version != 1:
+            data["hash_version"] = self.hash_version
+        return data
+
+    def to_line(self) -> bytes:
+        """Serialized log line, in the same encoding the entry was hashed with"""
+        if self.hash_version == 1:
+            return (json.dumps(self.to_dict()) + "\n").encode()
+        return orjson.dumps(self.to_dict(), option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
 
 
 class ActivityLogger:
@@ -50,31 +100,229 @@ class ActivityLogger:
     
     Each entry includes a SHA-256 hash of its contents plus the previous
     entry's hash, creating a tamper-evident chain similar to a blockchain.
+
+    Entries are chained synchronously, in call order, and handed to a
+    background writer that keeps the file open and group-commits them:
+    everything queued within `flush_interval` seconds (or `max_batch`
+    entries, whichever comes first) is written and fsynced together off
+    the event loop. `flush()` waits until all entries so far are durable.
+    A batch that fails to persist stays at the head of the queue and is
+    retried with backoff (`retry_delay` doubling up to `max_retry_delay`);
+    nothing after it is reported durable until it is written.
+
+    The log is split into numbered segments of at most `segment_max_entries`
+    entries / `segment_max_bytes` bytes. Each segment has a sidecar index
+    (entry count, head/tail hashes, byte length and the byte offset of
+    every `index_stride`-th entry), rewritten after every commit, so
+    startup reads one small index instead of the whole log. Only the last
+    `recent_entries` entries are kept in memory.
+
+    With an `attestor`, every durable batch is also queued for Merkle-root
+    anchoring on-chain.
+
+    New entries are hashed with `hash_version`; existing entries keep the
+    version recorded with them, so a log may mix versions.
     """
 
-    def __init__(self, log_dir: str = "agent/logs", agent_name: str = "solshield"):
+    def __init__(
+        self,
+        log_dir: str = "agent/logs",
+        agent_name: str = "solshield",
+        flush_interval: float = 0.05,
+        max_batch: int = 256,
+        fsync: bool = True,
+        segment_max_entries: int = 10_000,
+        segment_max_bytes: int = 16 * 1024 * 1024,
+        index_stride: int = 64,
+        recent_entries: int = 1000,
+        checkpoint_interval: int = 1000,
+        checkpoint_key: str = "",
+        attestor=None,
+        hash_version: int = CURRENT_HASH_VERSION,
+        retry_delay: float = 0.1,
+        max_retry_delay: float = 5.0,
+    ):
+        if hash_version not in HASH_VERSIONS:
+            raise ValueError(f"unknown hash version: {hash_version}")
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self.agent_name = agent_name
         self.sequence = 0
         self.last_hash = "genesis"
-        self.entries: list[ActivityEntry] = []
+        self.entries: deque[ActivityEntry] = deque(maxlen=recent_entries)
+        self.action_counts: dict[str, int] = {}
 
-        # Load existing log if present
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.fsync = fsync
+        self.segment_max_entries = segment_max_entries
+        self.segment_max_bytes = segment_max_bytes
+        self.index_stride = index_stride
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_key = checkpoint_key
+        self.attestor = attestor  # AttestationBatcher fed with each durable batch
+        self.hash_version = hash_version
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._pending: list[ActivityEntry] = []
+        self._has_pending: Optional[asyncio.Event] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._durable: Optional[asyncio.Condition] = None
+        self._durable_sequence = -1
+        self._writer_task: Optional[asyncio.Task] = None
+        self._file = None
+        self._index: dict = {}
+        self.stats = {"batches": 0, "entries_written": 0, "write_errors": 0, "rotations": 0}
+        # Outcome of the latest verify_integrity() run
+        self.last_verification = {"entries": 0, "verified": 0, "resumed_from": None}
+
+        # Resume the chain from the last segment's index
         self._load_existing()
+        self._durable_sequence = self.sequence - 1
+
+    # ── Segments ─────────────────────────────────────────────────────
+
+    def segment_path(self, segment: int) -> Path:
+        return self.log_dir / f"{self.agent_name}_activity.{segment:06d}.jsonl"
+
+    def index_path(self, segment: int) -> Path:
+        return self.log_dir / f"{self.agent_name}_activity.{segment:06d}.idx.json"
+
+    def segments(self) -> list[int]:
+        """Segment numbers on disk, oldest first"""
+        numbers = []
+        for path in self.log_dir.glob(f"{self.agent_name}_activity.*.jsonl"):
+            suffix = path.name[len(self.agent_name) + len("_activity."):-len(".jsonl")]
+            if suffix.isdigit():
+                numbers.append(int(suffix))
+        return sorted(numbers)
+
+    def read_index(self, segment: int) -> Optional[dict]:
+        try:
+            with open(self.index_path(segment), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _new_index(self, segment: int, first_sequence: int, head_previous_hash: str) -> dict:
+        return {
+            "segment": segment,
+            "first_sequence": first_sequence,
+            "count": 0,
+            "head_previous_hash": head_previous_hash,
+            "tail_hash": head_previous_hash,
+            "bytes": 0,
+            "sealed": False,
+            "offsets": [],  # [sequence, byte offset] every index_stride entries
+        }
+
+    def _write_index(self):
+        path = self.index_path(self._index["segment"])
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, path)
 
     def _load_existing(self):
-        """Load existing log entries to continue the hash chain"""
-        log_file = self.log_dir / f"{self.agent_name}_activity.jsonl"
-        if log_file.exists():
-            try:
-                with open(log_file, "r") as f:
-                    for line in f:
-                        entry_data = json.loads(line.strip())
-                        self.sequence = entry_data.get("sequence", 0) + 1
-                        self.last_hash = entry_data.get("entry_hash", "genesis")
-            except Exception as e:
-                logger.warning("log_load_error", error=str(e))
+        """Continue the hash chain from the last segment's index
+
+        A single-file log from before segmentation becomes segment 0 (and
+        is scanned once to build its index). Entries appended after the
+        last index write — a crash between commit and index update — are
+        scanned from the indexed byte length. Only a torn final record (no
+        trailing newline) is cut off; anything else that does not continue
+        the chain raises LogCorruptedError rather than touching the file.
+        """
+        legacy = self.log_dir / f"{self.agent_name}_activity.jsonl"
+        segments = self.segments()
+        if legacy.exists() and not segments:
+            os.replace(legacy, self.segment_path(0))
+            segments = [0]
+            logger.info("activity_log_migrated", segment=0)
+
+        if not segments:
+            self._index = self._new_index(0, 0, "genesis")
+            return
+
+        last = segments[-1]
+        index = self.read_index(last)
+        if index is None:
+            previous = self.read_index(segments[-2]) if len(segments) > 1 else None
+            index = self._new_index(
+                last,
+                previous["first_sequence"] + previous["count"] if previous else 0,
+                previous["tail_hash"] if previous else "genesis",
+            )
+        self._index = index
+
+        if self._scan_tail():
+            self._write_index()
+
+        self.sequence = index["first_sequence"] + index["count"]
+        self.last_hash = index["tail_hash"]
+
+    def _scan_tail(self) -> int:
+        """Index entries beyond the indexed byte length; returns how many were found"""
+        index = self._index
+        path = self.segment_path(index["segment"])
+        found = 0
+        with open(path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size < index["bytes"]:
+                self._corrupted(path, size, f"segment is shorter than its index ({index['bytes']} bytes)")
+            f.seek(index["bytes"])
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Torn final record from a crash mid-write; it was never durable
+                    f.truncate(index["bytes"])
+                    logger.warning("log_tail_truncated", segment=index["segment"], offset=index["bytes"])
+                    break
+                try:
+                    entry_data = _loads(line)
+                    sequence = entry_data["sequence"]
+                    previous_hash = entry_data["previous_hash"]
+                    entry_hash = entry_data["entry_hash"]
+                except (ValueError, TypeError, KeyError):
+                    self._corrupted(path, index["bytes"], "unreadable entry")
+                expected = index["first_sequence"] + index["count"]
+                if sequence != expected or previous_hash != index["tail_hash"]:
+                    self._corrupted(path, index["bytes"], f"entry {sequence} does not continue the chain at {expected}")
+                self._index_entry(sequence, len(line))
+                index["tail_hash"] = entry_hash
+                found += 1
+        return found
+
+    def _corrupted(self, path: Path, offset: int, reason: str):
+        logger.error("activity_log_corrupted", path=str(path), offset=offset, reason=reason)
+        raise LogCorruptedError(f"{path} at byte {offset}: {reason}; refusing to resume")
+
+    def _index_entry(self, sequence: int, size: int):
+        index = self._index
+        if index["count"] % self.index_stride == 0:
+            index["offsets"].append([sequence, index["bytes"]])
+        index["count"] += 1
+        index["bytes"] += size
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._index["sealed"] = True
+        self._write_index()
+        index = self._index
+        self._index = self._new_index(
+            index["segment"] + 1, index["first_sequence"] + index["count"], index["tail_hash"],
+        )
+        self.stats["rotations"] += 1
+        logger.info("activity_log_rotated", segment=self._index["segment"])
+
+    def _segment_full(self) -> bool:
+        return (
+            self._index["count"] >= self.segment_max_entries
+            or self._index["bytes"] >= self.segment_max_bytes
+        )
+
+    # ── Writing ──────────────────────────────────────────────────────
 
     async def log_activity(
         self,
@@ -82,7 +330,7 @@ class ActivityLogger:
         details: dict,
         timestamp: Optional[float] = None,
     ) -> ActivityEntry:
-        """Log an activity with hash chain integrity"""
+        """Log an activity with hash chain integrity; persisted by the background writer"""
 
         entry = ActivityEntry(
             timestamp=timestamp or time.time(),
@@ -90,16 +338,23 @@ class ActivityLogger:
             details=details,
             previous_hash=self.last_hash,
             sequence=self.sequence,
+            hash_version=self.hash_version,
         )
-        entry.entry_hash = entry.compute_hash()
+        try:
+            entry.entry_hash = entry.compute_hash()
+        except TypeError:
+            # An integer orjson can't encode; v1 handles any size
+            entry.hash_version = 1
+            entry.entry_hash = entry.compute_hash()
 
         # Update chain
         self.last_hash = entry.entry_hash
         self.sequence += 1
         self.entries.append(entry)
+        self.action_counts[action] = self.action_counts.get(action, 0) + 1
 
-        # Persist to disk
-        await self._persist_entry(entry)
+        # Queue for the next group commit
+        self._enqueue(entry)
 
         logger.debug(
             "activity_logged",
@@ -110,76 +365,329 @@ class ActivityLogger:
 
         return entry
 
-    async def _persist_entry(self, entry: ActivityEntry):
-        """Append entry to JSONL log file"""
-        log_file = self.log_dir / f"{self.agent_name}_activity.jsonl"
+    async def flush(self):
+        """Wait until every entry logged so far has been written and fsynced"""
+        target = self.sequence - 1
+        if self._durable is None or self._durable_sequence >= target:
+            return
+        self._batch_full.set()
+        async with self._durable:
+            await self._durable.wait_for(lambda: self._durable_sequence >= target)
+
+    async def close(self):
+        """Flush pending entries, stop the writer and release the file handle"""
+        await self.flush()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            await asyncio.gather(self._writer_task, return_exceptions=True)
+            self._writer_task = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _enqueue(self, entry: ActivityEntry):
+        if self._writer_task is None:
+            self._has_pending = asyncio.Event()
+            self._batch_full = asyncio.Event()
+            self._durable = asyncio.Condition()
+            self._writer_task = asyncio.create_task(self._writer())
+        self._pending.append(entry)
+        self._has_pending.set()
+        if len(self._pending) >= self.max_batch:
+            self._batch_full.set()
+
+    async def _writer(self):
+        """Group-commit loop: gather a window of entries, write and fsync them once"""
+        retry_delay = self.retry_delay
+        while True:
+            await self._has_pending.wait()
+            if not self._batch_full.is_set():
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch, self._pending = self._pending, []
+            self._has_pending.clear()
+            self._batch_full.clear()
+
+            # Entries logged while this batch is being written form the next one
+            persisted = await asyncio.to_thread(self._persist_batch, batch)
+            if not persisted:
+                # Later entries chain onto this batch, so it must land first
+                self._pending = batch + self._pending
+                self._has_pending.set()
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, self.max_retry_delay)
+                continue
+            retry_delay = self.retry_delay
+
+            async with self._durable:
+                self._durable_sequence = batch[-1].sequence
+                self._durable.notify_all()
+            if self.attestor is not None:
+                self.attestor.add(batch)
+
+    def _persist_batch(self, batch: list[ActivityEntry]) -> bool:
+        """Append a batch to the current segment(s) and update the index (runs in a worker thread)"""
         try:
-            with open(log_file, "a") as f:
-                f.write(json.dumps(entry.to_dict()) + "\n")
+            # A retried batch may already be partly on disk
+            start = max(0, self._index["first_sequence"] + self._index["count"] - batch[0].sequence)
+            if start >= len(batch):
+                self._write_index()
+            while start < len(batch):
+                if self._segment_full():
+                    self._rotate()
+                room = self.segment_max_entries - self._index["count"]
+                chunk = batch[start:start + room]
+                self._append(chunk)
+                start += len(chunk)
+            self.stats["batches"] += 1
+            self.stats["entries_written"] += len(batch)
+            return True
         except Exception as e:
-            logger.error("log_persist_error", error=str(e))
+            self.stats["write_errors"] += len(batch)
+            logger.error("log_persist_error", error=str(e), entries=len(batch))
+            return False
+
+    def _append(self, chunk: list[ActivityEntry]):
+        if self._file is None:
+            self._file = open(self.segment_path(self._index["segment"]), "ab")
+        lines = [entry.to_line() for entry in chunk]
+        try:
+            self._file.write(b"".join(lines))
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        except Exception:
+            # Cut the partial, unindexed write so the retry appends cleanly
+            self._file.close()
+            self._file = None
+            with open(self.segment_path(self._index["segment"]), "rb+") as f:
+                f.truncate(self._index["bytes"])
+            raise
+
+        for entry, line in zip(chunk, lines):
+            self._index_entry(entry.sequence, len(line))
+        self._index["tail_hash"] = chunk[-1].entry_hash
+        self._write_index()
+
+    # ── Reading ──────────────────────────────────────────────────────
+
+    @property
+    def checkpoint_path(self) -> Path:
+        return self.log_dir / f"{self.agent_name}_activity.checkpoints.jsonl"
+
+    def _sign_checkpoint(self, checkpoint: dict) -> str:
+        message = "{sequence}:{entry_hash}:{segment}:{offset}".format(**checkpoint)
+        return hmac.new(self.checkpoint_key.encode(), message.encode(), hashlib.sha256).hexdigest()
+
+    def last_checkpoint(self) -> Optional[dict]:
+        """Most recent verified checkpoint whose signature checks out"""
+        if not self.checkpoint_key or not self.checkpoint_path.exists():
+            # Unsigned checkpoints could be forged to skip tampered entries
+            return None
+        with open(self.checkpoint_path, "r") as f:
+            lines = f.readlines()
+        for line in reversed(lines):
+            try:
+                checkpoint = json.loads(line)
+            except ValueError:
+                continue
+            signature = checkpoint.pop("signature", "")
+            if hmac.compare_digest(signature, self._sign_checkpoint(checkpoint)):
+                return checkpoint
+            logger.warning("checkpoint_signature_invalid", sequence=checkpoint.get("sequence"))
+        return None
+
+    def _checkpoint_fits(self, checkpoint: dict) -> bool:
+        """Whether a checkpoint's offset is a line boundary inside its segment"""
+        path = self.segment_path(checkpoint["segment"])
+        offset = checkpoint["offset"]
+        if offset < 0 or offset > path.stat().st_size:
+            return False
+        if offset == 0:
+            return True
+        with open(path, "rb") as f:
+            f.seek(offset - 1)
+            return f.read(1) == b"\n"
+
+    def _save_checkpoints(self, checkpoints: list[dict]):
+        if not checkpoints or not self.checkpoint_key:
+            return
+        with open(self.checkpoint_path, "a") as f:
+            for checkpoint in checkpoints:
+                f.write(json.dumps({**checkpoint, "signature": self._sign_checkpoint(checkpoint)}) + "\n")
 
-    async def verify_integrity(self) -> tuple[bool, int]:
+    async def verify_integrity(
+        self,
+        full: bool = False,
+        parallel: bool = False,
+        workers: Optional[int] = None,
+    ) -> tuple[bool, int]:
         """
         Verify the hash chain integrity of the activity log.
-        Returns (is_valid, num_entries_verified).
+        Returns (is_valid, num_entries) — the length of the chain covered,
+        including entries before a resumed checkpoint that weren't re-read.
+        `last_verification` records how many entries this run actually
+        re-hashed alongside that total.
+
+        Verification resumes from the last signed checkpoint unless `full`
+        is set, and records a new checkpoint every `checkpoint_interval`
+        entries it verifies. Without a `checkpoint_key` no checkpoints are
+        written or trusted, and every run verifies the whole log. A
+        checkpoint whose offset isn't a line boundary in its segment falls
+        back to a full verification. With `parallel`, segments are verified
+        in a process pool and their boundary hashes linked up afterwards.
         """
-        log_file = self.log_dir / f"{self.agent_name}_activity.jsonl"
-        if not log_file.exists():
-            return True, 0
+        await self.flush()
 
+        segments = self.segments()
         previous_hash = "genesis"
         count = 0
+        jobs = [(segment, 0) for segment in segments]
 
-        with open(log_file, "r") as f:
-            for line in f:
-                entry_data = json.loads(line.strip())
-                entry = ActivityEntry(
-                    timestamp=entry_data["timestamp"],
-                    action=entry_data["action"],
-                    details=entry_data["details"],
-                    previous_hash=entry_data["previous_hash"],
-                    sequence=entry_data["sequence"],
+        checkpoint = None if full else self.last_checkpoint()
+        if checkpoint is not None and (checkpoint["segment"] not in segments or not self._checkpoint_fits(checkpoint)):
+            logger.warning("checkpoint_unusable", sequence=checkpoint["sequence"], segment=checkpoint["segment"])
+            checkpoint = None
+        if checkpoint is not None:
+            previous_hash = checkpoint["entry_hash"]
+            count = checkpoint["sequence"] + 1
+            jobs = [
+                (segment, checkpoint["offset"] if segment == checkpoint["segment"] else 0)
+                for segment in segments
+                if segment >= checkpoint["segment"]
+            ]
+
+        args = [(str(self.segment_path(segment)), offset, self.checkpoint_interval) for segment, offset in jobs]
+        if parallel and len(args) > 1:
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = await asyncio.gather(*(loop.run_in_executor(pool, verify_segment, *a) for a in args))
+        else:
+            results = await asyncio.to_thread(lambda: [verify_segment(*a) for a in args])
+
+        last_sequence = checkpoint["sequence"] if checkpoint is not None else -1
+        resumed = count
+        new_checkpoints = []
+        valid = True
+        for (segment, _), result in zip(jobs, results):
+            # Segment boundaries must link to the previous segment's tail
+            if result["count"] and result["head_previous_hash"] != previous_hash:
+                logger.error(
+                    "integrity_violation",
+                    sequence=result["first_sequence"],
+                    expected=previous_hash,
+                    got=result["head_previous_hash"],
                 )
+                valid = False
+                break
 
-                # Verify previous hash chain
-                if entry.previous_hash != previous_hash:
-                    logger.error(
-                        "integrity_violation",
-                        sequence=entry.sequence,
-                        expected=previous_hash,
-                        got=entry.previous_hash,
-                    )
-                    return False, count
-
-                # Verify entry hash
-                computed = entry.compute_hash()
-                if computed != entry_data["entry_hash"]:
-                    logger.error(
-                        "hash_mismatch",
-                        sequence=entry.sequence,
-                        expected=entry_data["entry_hash"],
-                        computed=computed,
-                    )
-                    return False, count
-
-                previous_hash = entry_data["entry_hash"]
-                count += 1
-
-        return True, count
+            count += result["count"]
+            new_checkpoints += [
+                {**cp, "segment": segment}
+                for cp in result["checkpoints"]
+                if cp["sequence"] > last_sequence
+            ]
+            if result["error"] is not None:
+                event, fields = result["error"]
+                logger.error(event, **fields)
+                valid = False
+                break
+            if result["count"]:
+                previous_hash = result["tail_hash"]
+
+        self._save_checkpoints(new_checkpoints)
+        self.last_verification = {
+            "entries": count,
+            "verified": count - resumed,
+            "resumed_from": checkpoint["sequence"] if checkpoint is not None else None,
+        }
+        return valid, count
 
     async def get_summary(self) -> dict:
         """Get a summary of all logged activities"""
-        actions = {}
-        for entry in self.entries:
-            actions[entry.action] = actions.get(entry.action, 0) + 1
-
         is_valid, count = await self.verify_integrity()
 
         return {
             "total_entries": self.sequence,
-            "actions": actions,
+            "actions": dict(self.action_counts),
             "integrity_valid": is_valid,
-            "entries_verified": count,
+            "entries_covered": count,
+            "entries_verified": self.last_verification["verified"],
             "last_hash": self.last_hash,
         }
+
+
+def verify_segment(path: str, offset: int = 0, checkpoint_interval: int = 1000) -> dict:
+    """
+    Verify the hash chain within one segment, starting at a byte offset.
+
+    Runs standalone (e.g. in a process pool worker). The first entry's
+    previous_hash is returned rather than checked so the caller can link
+    segments together. Checkpoint candidates are returned for every entry
+    whose sequence closes a `checkpoint_interval` block.
+    """
+    result = {
+        "count": 0,
+        "first_sequence": None,
+        "head_previous_hash": None,
+        "tail_hash": None,
+        "checkpoints": [],
+        "error": None,
+    }
+    previous_hash = None
+
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            try:
+                entry_data = _loads(line)
+            except ValueError as e:
+                result["error"] = ("malformed_entry", {"offset": offset - len(line), "error": str(e)})
+                break
+            entry = ActivityEntry(
+                timestamp=entry_data["timestamp"],
+                action=entry_data["action"],
+                details=entry_data["details"],
+                previous_hash=entry_data["previous_hash"],
+                sequence=entry_data["sequence"],
+                hash_version=entry_data.get("hash_version", 1),
+            )
+
+            if previous_hash is None:
+                result["first_sequence"] = entry.sequence
+                result["head_previous_hash"] = entry.previous_hash
+
+            # Verify previous hash chain
+            elif entry.previous_hash != previous_hash:
+                result["error"] = ("integrity_violation", {
+                    "sequence": entry.sequence,
+                    "expected": previous_hash,
+                    "got": entry.previous_hash,
+                })
+                break
+
+            # Verify entry hash
+            computed = entry.compute_hash()
+            if computed != entry_data["entry_hash"]:
+                result["error"] = ("hash_mismatch", {
+                    "sequence": entry.sequence,
+                    "expected": entry_data["entry_hash"],
+                    "computed": computed,
+                })
+                break
+
+            previous_hash = computed
+            result["count"] += 1
+            result["tail_hash"] = computed
+            if (entry.sequence + 1) % checkpoint_interval == 0:
+                result["checkpoints"].append({
+                    "sequence": entry.sequence,
+                    "entry_hash": computed,
+                    "offset": offset,
+                })
+
+    return result
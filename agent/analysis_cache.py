@@ -0,0 +1,140 @@
+"""Analysis Cache — reuse AI analyses while a position's risk inputs stand still"""
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import structlog
+
+from protocols.base import PositionData
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class CacheEntry:
+    fingerprint: str
+    health_factor: float
+    result: object  # AnalysisResult
+    stored_at: float
+
+
+class AnalysisCache:
+    """
+    LRU + TTL cache of analysis results, one entry per obligation.
+
+    An entry is reused only while the position's fingerprint — health
+    factor bucket, risk level, collateral/debt composition, debt size band
+    and market-context hash — is unchanged, the health factor hasn't moved
+    more than `hf_delta` since the analysis, and the entry is younger than
+    `ttl_seconds`. The least recently used obligation is evicted once
+    `max_entries` is reached.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 900.0,
+        max_entries: int = 1024,
+        hf_bucket: float = 0.05,
+        hf_delta: float = 0.05,
+        size_band: float = 0.05,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hf_bucket = hf_bucket
+        self.hf_delta = hf_delta
+        self.size_band = size_band
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "hf_moved": 0,
+            "changed": 0,
+            "evictions": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def fingerprint(self, position: PositionData, market_context: Optional[str] = None) -> str:
+        """Hash of the inputs an analysis depends on, coarsened into buckets"""
+        hf = position.health_factor
+        hf_key = "inf" if math.isinf(hf) else str(math.floor(hf / self.hf_bucket))
+        debt = position.total_debt_usd
+        size_key = str(math.floor(math.log(debt, 1 + self.size_band))) if debt > 0 else "0"
+
+        collateral_total = position.total_collateral_usd or 1.0
+        debt_total = debt or 1.0
+        composition = ",".join(sorted(
+            f"c:{c.symbol}:{c.value_usd / collateral_total:.2f}" for c in position.collaterals
+        ) + sorted(
+            f"d:{d.symbol}:{d.value_usd / debt_total:.2f}" for d in position.debts
+        ))
+        context_hash = hashlib.sha256((market_context or "").encode()).hexdigest()[:16]
+
+        raw = "|".join((
+            position.protocol.value, position.risk_level.value, hf_key, size_key, composition, context_hash,
+        ))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, position: PositionData, market_context: Optional[str] = None):
+        """Cached result for the position, or None if missing or invalidated"""
+        key = position.obligation_key
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        reason = None
+        if time.monotonic() - entry.stored_at > self.ttl_seconds:
+            reason = "expired"
+        elif not self._hf_close(entry.health_factor, position.health_factor):
+            reason = "hf_moved"
+        elif entry.fingerprint != self.fingerprint(position, market_context):
+            reason = "changed"
+
+        if reason is not None:
+            del self._entries[key]
+            self.stats[reason] += 1
+            self.stats["misses"] += 1
+            logger.debug("analysis_cache_invalidated", position=key[:16], reason=reason)
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry.result
+
+    def put(self, position: PositionData, result, market_context: Optional[str] = None):
+        key = position.obligation_key
+        self._entries[key] = CacheEntry(
+            fingerprint=self.fingerprint(position, market_context),
+            health_factor=position.health_factor,
+            result=result,
+            stored_at=time.monotonic(),
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def invalidate(self, obligation_key: str):
+        self._entries.pop(obligation_key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+    def _hf_close(self, cached: float, current: float) -> bool:
+        if math.isinf(cached) or math.isinf(current):
+            return cached == current
+        return abs(current - cached) <= self.hf_delta
@@ -1,7 +1,9 @@
 """Claude AI Risk Analyzer — Intelligent DeFi position analysis"""
+import asyncio
 import json
 import hashlib
 import time
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
@@ -9,7 +11,9 @@ from typing import Optional
 import anthropic
 import structlog
 
+from analysis_cache import AnalysisCache
 from protocols.base import PositionData, RiskLevel
+from protocols.rpc import SAMPLE_WINDOW, percentile
 
 logger = structlog.get_logger()
 
@@ -92,36 +96,132 @@ Respond in JSON format:
     "market_context": "relevant market observations"
 }"""
 
+BATCH_INSTRUCTIONS = """
+When several positions are given at once, analyze each one independently and
+respond with a JSON array holding one object per position, in the format above
+plus a "position_key" field copied exactly from the position's heading:
+[
+    {"position_key": "...", "strategy": "...", ...},
+    ...
+]"""
+
+
+def thresholds_block(warn: float, critical: float, emergency: float) -> str:
+    """The risk thresholds the agent is configured with, as a system prompt section"""
+    return f"""## Thresholds
+- Warning: Health Factor < {warn}
+- Critical: Health Factor < {critical}
+- Emergency: Health Factor < {emergency}
+- Liquidation: Health Factor < 1.0
+"""
+
 
 class ClaudeAnalyzer:
-    """Claude AI-powered risk analysis engine"""
+    """
+    Claude AI-powered risk analysis engine.
+
+    Calls go through the async Anthropic client so analyses overlap with
+    fetching and execution. At most `max_concurrent` requests are in
+    flight, each bounded by `timeout_seconds`; once `max_queued` callers
+    are already waiting for a slot, further positions get the rule-based
+    analysis immediately instead of piling up behind the API.
+
+    `analyze_positions` packs up to `batch_size` positions into one
+    request; any position the model leaves out of its reply gets the
+    rule-based analysis.
 
-    def __init__(self, api_key: str, model: str = "claude-sonnet-4-20250514"):
-        self.client = anthropic.Anthropic(api_key=api_key)
+    The system prompt carries the static instructions and the configured
+    risk thresholds; the user message only the position itself. Token
+    counts and latency are recorded for every call.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "claude-sonnet-4-20250514",
+        cache: Optional[AnalysisCache] = None,
+        max_concurrent: int = 8,
+        timeout_seconds: float = 30.0,
+        max_queued: int = 100,
+        batch_size: int = 1,
+        warn: float = 1.5,
+        critical: float = 1.2,
+        emergency: float = 1.05,
+    ):
+        self.client = anthropic.AsyncAnthropic(api_key=api_key)
         self.model = model
+        self.cache = cache
+        self.timeout_seconds = timeout_seconds
+        self.max_queued = max_queued
+        self.batch_size = max(1, batch_size)
         self.analysis_count = 0
 
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._queued = 0
+        self._in_flight = 0
+        self.stats = {
+            "max_in_flight": 0,
+            "max_queued": 0,
+            "timeouts": 0,
+            "shed": 0,
+            "batches": 0,
+            "batch_missing": 0,
+        }
+
+        thresholds = thresholds_block(warn, critical, emergency)
+        self._system = self._system_blocks(thresholds, batch=False)
+        self._batch_system = self._system_blocks(thresholds, batch=True)
+        self.usage = {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+        self._latencies: deque = deque(maxlen=SAMPLE_WINDOW)
+
+    @staticmethod
+    def _system_blocks(thresholds: str, batch: bool) -> list[dict]:
+        """System prompt as content blocks, with the batch instructions for batch requests"""
+        blocks = [
+            {"type": "text", "text": SYSTEM_PROMPT},
+            {"type": "text", "text": thresholds},
+        ]
+        if batch:
+            blocks.append({"type": "text", "text": BATCH_INSTRUCTIONS})
+        return blocks
+
     async def analyze_position(
         self,
         position: PositionData,
         market_context: Optional[str] = None,
     ) -> AnalysisResult:
         """Analyze a DeFi position and recommend rebalancing strategy"""
-        
+        if self.cache is not None:
+            cached = self.cache.get(position, market_context)
+            if cached is not None:
+                logger.debug("ai_analysis_cached", position=position.obligation_key[:16])
+                return cached
+        return await self._analyze_uncached(position, market_context)
+
+    async def _analyze_uncached(
+        self, position: PositionData, market_context: Optional[str]
+    ) -> AnalysisResult:
+        if self._queued >= self.max_queued:
+            self.stats["shed"] += 1
+            logger.warning("ai_analysis_shed", position=position.obligation_key[:16], queued=self._queued)
+            return self._fallback_analysis(position)
+
         prompt = self._build_analysis_prompt(position, market_context)
 
         try:
-            response = self.client.messages.create(
+            response = await self._create(
                 model=self.model,
                 max_tokens=2048,
                 temperature=0.1,
-                system=SYSTEM_PROMPT,
+                system=self._system,
                 messages=[{"role": "user", "content": prompt}],
             )
 
             response_text = response.content[0].text
             result = self._parse_response(response_text, position)
             self.analysis_count += 1
+            if self.cache is not None:
+                self.cache.put(position, result, market_context)
 
             logger.info(
                 "ai_analysis_complete",
@@ -133,11 +233,141 @@ class ClaudeAnalyzer:
 
             return result
 
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            logger.warning("ai_analysis_timeout", position=position.obligation_key[:16], timeout_s=self.timeout_seconds)
+            return self._fallback_analysis(position)
+
         except Exception as e:
             logger.error("ai_analysis_error", error=str(e))
             # Fallback to rule-based analysis
             return self._fallback_analysis(position)
 
+    async def analyze_positions(
+        self,
+        positions: list[PositionData],
+        market_context: Optional[str] = None,
+    ) -> list[AnalysisResult]:
+        """Analyze many positions, up to `batch_size` per request; results keep input order"""
+        results: dict[int, AnalysisResult] = {}
+        pending = []
+        for i, position in enumerate(positions):
+            cached = self.cache.get(position, market_context) if self.cache is not None else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+
+        chunks = [pending[n:n + self.batch_size] for n in range(0, len(pending), self.batch_size)]
+        analyses = await asyncio.gather(*(
+            self._analyze_chunk([positions[i] for i in chunk], market_context) for chunk in chunks
+        ))
+        for chunk, chunk_results in zip(chunks, analyses):
+            results.update(zip(chunk, chunk_results))
+        return [results[i] for i in range(len(positions))]
+
+    async def _analyze_chunk(
+        self, positions: list[PositionData], market_context: Optional[str]
+    ) -> list[AnalysisResult]:
+        if len(positions) == 1:
+            # Already a cache miss in analyze_positions
+            return [await self._analyze_uncached(positions[0], market_context)]
+
+        if self._queued >= self.max_queued:
+            self.stats["shed"] += len(positions)
+            logger.warning("ai_analysis_shed", positions=len(positions), queued=self._queued)
+            return [self._fallback_analysis(p) for p in positions]
+
+        try:
+            response = await self._create(
+                model=self.model,
+                max_tokens=min(8192, 1024 * len(positions)),
+                temperature=0.1,
+                system=self._batch_system,
+                messages=[{"role": "user", "content": self._build_batch_prompt(positions, market_context)}],
+            )
+            results = self._parse_batch_response(response.content[0].text, positions)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            logger.warning("ai_batch_timeout", positions=len(positions), timeout_s=self.timeout_seconds)
+            return [self._fallback_analysis(p) for p in positions]
+        except Exception as e:
+            logger.error("ai_batch_error", positions=len(positions), error=str(e))
+            return [self._fallback_analysis(p) for p in positions]
+
+        self.stats["batches"] += 1
+        analyzed = []
+        for position, result in zip(positions, results):
+            if result is None:
+                self.stats["batch_missing"] += 1
+                analyzed.append(self._fallback_analysis(position))
+                continue
+            self.analysis_count += 1
+            if self.cache is not None:
+                self.cache.put(position, result, market_context)
+            analyzed.append(result)
+
+        logger.info(
+            "ai_batch_analysis_complete",
+            positions=len(positions),
+            missing=sum(r is None for r in results),
+        )
+        return analyzed
+
+    async def _create(self, **kwargs):
+        """messages.create under the concurrency limit and per-call timeout"""
+        self._queued += 1
+        self.stats["max_queued"] = max(self.stats["max_queued"], self._queued)
+        waiting = True
+        try:
+            async with self._slots:
+                self._queued -= 1
+                waiting = False
+                self._in_flight += 1
+                self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self._in_flight)
+                start = time.perf_counter()
+                try:
+                    response = await asyncio.wait_for(
+                        self.client.messages.create(**kwargs), timeout=self.timeout_seconds
+                    )
+                finally:
+                    self._in_flight -= 1
+                self._record_usage(response, time.perf_counter() - start)
+                return response
+        finally:
+            if waiting:
+                self._queued -= 1
+
+    def _record_usage(self, response, latency: float):
+        """Tally token counts and latency for one call"""
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+
+        self.usage["calls"] += 1
+        self.usage["input_tokens"] += input_tokens
+        self.usage["output_tokens"] += output_tokens
+        self._latencies.append(latency)
+
+        logger.info(
+            "ai_call_usage",
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            latency_ms=round(latency * 1000, 1),
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "analyses": self.analysis_count,
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "usage": {
+                **self.usage,
+                "latency_p50_ms": round(percentile(self._latencies, 50) * 1000, 1),
+            },
+        }
+
     def _build_analysis_prompt(
         self, position: PositionData, market_context: Optional[str]
     ) -> str:
@@ -147,20 +377,8 @@ class ClaudeAnalyzer:
 ## Position Details
 {position.to_risk_summary()}
 
-## Thresholds
-- Warning: Health Factor < 1.5
-- Critical: Health Factor < 1.2  
-- Emergency: Health Factor < 1.05
-- Liquidation: Health Factor < 1.0
-
-## Collateral Breakdown
 """
-        for c in position.collaterals:
-            prompt += f"- {c.symbol}: ${c.value_usd:,.2f} (LTV: {c.ltv:.0%}, Liq Threshold: {c.liquidation_threshold:.0%})\n"
-
-        prompt += "\n## Debt Breakdown\n"
-        for d in position.debts:
-            prompt += f"- {d.symbol}: ${d.value_usd:,.2f} (Borrow APY: {d.borrow_rate_apy:.2%})\n"
+        prompt += self._breakdown(position)
 
         if market_context:
             prompt += f"\n## Market Context\n{market_context}\n"
@@ -172,6 +390,37 @@ Consider: current health factor, collateral composition, debt levels, and market
 """
         return prompt
 
+    def _build_batch_prompt(
+        self, positions: list[PositionData], market_context: Optional[str]
+    ) -> str:
+        """Build one prompt covering several positions"""
+        prompt = f"Analyze these {len(positions)} Solana DeFi lending positions:\n"
+        for position in positions:
+            prompt += f"\n# Position {position.obligation_key}\n{position.to_risk_summary()}\n\n"
+            prompt += self._breakdown(position)
+
+        if market_context:
+            prompt += f"\n## Market Context\n{market_context}\n"
+
+        prompt += """
+## Task
+Analyze every position and respond with a JSON array of recommendations, one per
+position, each carrying its position_key.
+"""
+        return prompt
+
+    @staticmethod
+    def _breakdown(position: PositionData) -> str:
+        """Collateral and debt breakdown sections"""
+        text = "## Collateral Breakdown\n"
+        for c in position.collaterals:
+            text += f"- {c.symbol}: ${c.value_usd:,.2f} (LTV: {c.ltv:.0%}, Liq Threshold: {c.liquidation_threshold:.0%})\n"
+
+        text += "\n## Debt Breakdown\n"
+        for d in position.debts:
+            text += f"- {d.symbol}: ${d.value_usd:,.2f} (Borrow APY: {d.borrow_rate_apy:.2%})\n"
+        return text
+
     def _parse_response(self, response_text: str, position: PositionData) -> AnalysisResult:
         """Parse Claude's response into an AnalysisResult"""
         try:
@@ -183,31 +432,64 @@ Consider: current health factor, collateral composition, debt levels, and market
             else:
                 raise ValueError("No JSON found in response")
 
-            reasoning = data.get("reasoning", response_text)
-            reasoning_hash = hashlib.sha256(reasoning.encode()).hexdigest()
-
-            strategy_str = data.get("strategy", "no_action")
-            try:
-                strategy = RebalanceStrategy(strategy_str)
-            except ValueError:
-                strategy = RebalanceStrategy.NO_ACTION
-
-            return AnalysisResult(
-                position_key=position.obligation_key,
-                risk_level=position.risk_level,
-                strategy=strategy,
-                reasoning=reasoning,
-                confidence=float(data.get("confidence", 0.5)),
-                suggested_amount_usd=float(data.get("suggested_amount_usd", 0)),
-                urgency_score=float(data.get("urgency_score", 0)),
-                reasoning_hash=reasoning_hash,
-                timestamp=time.time(),
-            )
+            return self._result_from_data(data, position, response_text)
 
         except (json.JSONDecodeError, KeyError) as e:
             logger.warning("ai_response_parse_error", error=str(e))
             return self._fallback_analysis(position)
 
+    def _parse_batch_response(
+        self, response_text: str, positions: list[PositionData]
+    ) -> list[Optional[AnalysisResult]]:
+        """Match a batch reply's entries to positions by position_key; None where missing"""
+        entries = []
+        json_start = response_text.find("[")
+        json_end = response_text.rfind("]") + 1
+        if json_start >= 0 and json_end > json_start:
+            try:
+                entries = json.loads(response_text[json_start:json_end])
+            except json.JSONDecodeError as e:
+                logger.warning("ai_batch_parse_error", error=str(e))
+
+        by_key = {
+            entry["position_key"]: entry
+            for entry in entries
+            if isinstance(entry, dict) and isinstance(entry.get("position_key"), str)
+        }
+
+        results = []
+        for position in positions:
+            entry = by_key.get(position.obligation_key)
+            try:
+                results.append(self._result_from_data(entry, position) if entry else None)
+            except (TypeError, ValueError) as e:
+                logger.warning("ai_batch_entry_error", position=position.obligation_key[:16], error=str(e))
+                results.append(None)
+        return results
+
+    def _result_from_data(self, data: dict, position: PositionData, default_reasoning: str = "") -> AnalysisResult:
+        """Build an AnalysisResult from one parsed JSON recommendation"""
+        reasoning = str(data.get("reasoning", default_reasoning))
+        reasoning_hash = hashlib.sha256(reasoning.encode()).hexdigest()
+
+        strategy_str = data.get("strategy", "no_action")
+        try:
+            strategy = RebalanceStrategy(strategy_str)
+        except ValueError:
+            strategy = RebalanceStrategy.NO_ACTION
+
+        return AnalysisResult(
+            position_key=position.obligation_key,
+            risk_level=position.risk_level,
+            strategy=strategy,
+            reasoning=reasoning,
+            confidence=float(data.get("confidence", 0.5)),
+            suggested_amount_usd=float(data.get("suggested_amount_usd", 0)),
+            urgency_score=float(data.get("urgency_score", 0)),
+            reasoning_hash=reasoning_hash,
+            timestamp=time.time(),
+        )
+
     def _fallback_analysis(self, position: PositionData) -> AnalysisResult:
         """Rule-based fallback when AI analysis fails"""
         if position.health_factor < 1.05:
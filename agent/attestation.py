@@ -0,0 +1,273 @@
+"""Attestation — Merkle-batched on-chain anchoring of activity log entries"""
+import asyncio
+import base64
+import bisect
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+import httpx
+import structlog
+from solders.hash import Hash
+from solders.instruction import Instruction
+from solders.message import Message
+from solders.pubkey import Pubkey
+from solders.transaction import Transaction
+
+from protocols.rpc import RPCClient
+
+logger = structlog.get_logger()
+
+MEMO_PROGRAM_ID = Pubkey.from_string("MemoSq4gqABAXKb96qnH8TysNcWxMyWCqXgDLGmfcHr")
+
+# Domain-separated hashing so a leaf can never be passed off as an inner node
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def _leaf(entry_hash: str) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + bytes.fromhex(entry_hash)).digest()
+
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def _levels(entry_hashes: list[str]) -> list[list[bytes]]:
+    """All tree levels, leaves first; an odd node out is carried up unchanged"""
+    level = [_leaf(h) for h in entry_hashes]
+    levels = [level]
+    while len(level) > 1:
+        level = [
+            _node(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+            for i in range(0, len(level), 2)
+        ]
+        levels.append(level)
+    return levels
+
+
+def merkle_root(entry_hashes: list[str]) -> str:
+    if not entry_hashes:
+        raise ValueError("empty batch")
+    return _levels(entry_hashes)[-1][0].hex()
+
+
+def merkle_proof(entry_hashes: list[str], index: int) -> list[tuple[str, str]]:
+    """Sibling path from leaf `index` to the root as (side, hash) pairs"""
+    proof = []
+    for level in _levels(entry_hashes)[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(("L" if sibling < index else "R", level[sibling].hex()))
+        index //= 2
+    return proof
+
+
+def verify_proof(entry_hash: str, proof: list, root: str) -> bool:
+    node = _leaf(entry_hash)
+    for side, sibling in proof:
+        sibling = bytes.fromhex(sibling)
+        node = _node(sibling, node) if side == "L" else _node(node, sibling)
+    return node.hex() == root
+
+
+class StubAnchor:
+    """Records roots in memory instead of sending transactions (tests, dry runs)"""
+
+    def __init__(self):
+        self.anchored: list[str] = []
+
+    async def anchor(self, memo: str) -> Optional[str]:
+        self.anchored.append(memo)
+        return "STUB_" + hashlib.sha256(memo.encode()).hexdigest()[:32]
+
+
+class MemoAnchor:
+    """
+    Anchors a memo in a Memo-program transaction.
+
+    The unsigned transaction (fee payer `payer`, fresh blockhash from
+    `rpc_url`) is handed to `sign_and_send` — the agent wallet in
+    production, a local keypair against a test validator.
+    """
+
+    def __init__(
+        self,
+        rpc_url: str,
+        payer: str,
+        sign_and_send: Callable[[str], Awaitable[Optional[str]]],
+        client: Optional[RPCClient] = None,
+    ):
+        self.rpc_url = rpc_url
+        self.payer = Pubkey.from_string(payer)
+        self.sign_and_send = sign_and_send
+        self.client = client or httpx.AsyncClient(timeout=30)
+        self._owns_client = client is None
+
+    async def anchor(self, memo: str) -> Optional[str]:
+        response = await self.client.post(self.rpc_url, json={
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getLatestBlockhash",
+            "params": [{"commitment": "finalized"}],
+        })
+        blockhash = response.json()["result"]["value"]["blockhash"]
+
+        instruction = Instruction(MEMO_PROGRAM_ID, memo.encode(), [])
+        message = Message.new_with_blockhash([instruction], self.payer, Hash.from_string(blockhash))
+        transaction = Transaction.new_unsigned(message)
+        return await self.sign_and_send(base64.b64encode(bytes(transaction)).decode())
+
+    async def close(self):
+        if self._owns_client:
+            await self.client.aclose()
+
+
+class AttestationBatcher:
+    """
+    Anchors activity entries on-chain one Merkle root per window.
+
+    Durable entries are collected for `window_seconds` (or until
+    `max_entries`); the batch's Merkle root over the entry hashes is
+    anchored in a single transaction and the batch — root, sequence
+    range, leaves, transaction signature — appended to a local JSONL
+    index, from which `proof()` serves per-entry inclusion proofs. If
+    anchoring fails, the entries roll into the next window's batch, and a
+    new window is started so they are retried even if no entries follow.
+    """
+
+    def __init__(
+        self,
+        anchor,
+        log_dir: str = "agent/logs",
+        agent_name: str = "solshield",
+        window_seconds: float = 300.0,
+        max_entries: int = 4096,
+    ):
+        self.anchor = anchor
+        self.index_path = Path(log_dir) / f"{agent_name}_attestations.jsonl"
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+
+        self._pending: list[tuple[int, str]] = []  # (sequence, entry_hash)
+        self._batches: list[dict] = []
+        self._first_sequences: list[int] = []
+        self._window_task: Optional[asyncio.Task] = None
+        self._tasks: set[asyncio.Task] = set()
+        self._sealing = asyncio.Lock()
+        self._closing = False
+        self.stats = {"batches": 0, "entries_anchored": 0, "anchor_failures": 0}
+        self._load_index()
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, "r") as f:
+            for line in f:
+                self._remember(json.loads(line))
+
+    def _remember(self, batch: dict):
+        self._batches.append(batch)
+        self._first_sequences.append(batch["first_sequence"])
+
+    def add(self, entries):
+        """Queue durable entries (anything with .sequence and .entry_hash)"""
+        self._pending.extend((entry.sequence, entry.entry_hash) for entry in entries)
+        if len(self._pending) >= self.max_entries:
+            task = asyncio.create_task(self.seal())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            self._arm_window()
+
+    def _arm_window(self):
+        """Start a window timer unless one is already counting down"""
+        window = self._window_task
+        if window is None or window.done() or window is asyncio.current_task():
+            self._window_task = asyncio.create_task(self._seal_after_window())
+
+    async def _seal_after_window(self):
+        await asyncio.sleep(self.window_seconds)
+        await self.seal()
+
+    async def seal(self) -> Optional[dict]:
+        """Anchor the pending entries' Merkle root now; returns the batch record"""
+        async with self._sealing:
+            if not self._pending:
+                return None
+            pending = list(self._pending)
+            leaves = [entry_hash for _, entry_hash in pending]
+            root = merkle_root(leaves)
+            first, last = pending[0][0], pending[-1][0]
+
+            try:
+                signature = await self.anchor.anchor(f"solshield:merkle:{root}:{first}-{last}")
+            except Exception as e:
+                logger.error("attestation_anchor_error", error=str(e))
+                signature = None
+            if not signature:
+                self.stats["anchor_failures"] += 1
+                if not self._closing:
+                    self._arm_window()
+                return None
+
+            self._pending = self._pending[len(pending):]
+            batch = {
+                "batch": len(self._batches),
+                "root": root,
+                "first_sequence": first,
+                "last_sequence": last,
+                "leaves": leaves,
+                "tx_signature": signature,
+                "anchored_at": time.time(),
+            }
+            if last - first + 1 != len(leaves):
+                # Entries that failed to persist were never queued
+                batch["sequences"] = [sequence for sequence, _ in pending]
+            await asyncio.to_thread(self._append_index, batch)
+            self._remember(batch)
+            self.stats["batches"] += 1
+            self.stats["entries_anchored"] += len(leaves)
+            logger.info("attestation_anchored", root=root[:16], entries=len(leaves), tx=signature)
+            return batch
+
+    def _append_index(self, batch: dict):
+        with open(self.index_path, "a") as f:
+            f.write(json.dumps(batch) + "\n")
+
+    def proof(self, sequence: int) -> Optional[dict]:
+        """Inclusion proof for an anchored entry, or None if not anchored yet"""
+        i = bisect.bisect_right(self._first_sequences, sequence) - 1
+        if i < 0 or sequence > self._batches[i]["last_sequence"]:
+            return None
+        batch = self._batches[i]
+        if "sequences" in batch:
+            index = bisect.bisect_left(batch["sequences"], sequence)
+            if index == len(batch["sequences"]) or batch["sequences"][index] != sequence:
+                return None
+        else:
+            index = sequence - batch["first_sequence"]
+        return {
+            "sequence": sequence,
+            "entry_hash": batch["leaves"][index],
+            "root": batch["root"],
+            "proof": merkle_proof(batch["leaves"], index),
+            "tx_signature": batch["tx_signature"],
+            "batch": batch["batch"],
+        }
+
+    async def close(self):
+        """Anchor whatever is pending and stop the window timer"""
+        self._closing = True
+        if self._window_task is not None:
+            self._window_task.cancel()
+            await asyncio.gather(self._window_task, return_exceptions=True)
+        await self.seal()
+        if hasattr(self.anchor, "close"):
+            await self.anchor.close()
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "pending": len(self._pending)}
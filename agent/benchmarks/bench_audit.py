@@ -0,0 +1,67 @@
+"""
+Activity-log audit benchmark
+
+Writes a segmented log of N entries, then times a full sequential
+verification, a full parallel (process pool) verification, and an
+incremental one that resumes from the last checkpoint after a further
+1% of entries were appended.
+
+Run from the agent/ directory:
+    python benchmarks/bench_audit.py [--entries N] [--workers W]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import structlog
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from activity_logger import ActivityLogger
+
+
+async def timed(coro) -> tuple[float, tuple]:
+    start = time.perf_counter()
+    result = await coro
+    return (time.perf_counter() - start) * 1000, result
+
+
+async def run(entries: int, workers: int):
+    details = {"position_key": "Obligation111", "strategy": "debt_repayment", "health_factor": 1.12,
+               "reasoning": "HF below critical threshold; repay part of the USDC debt.", "confidence": 0.85}
+    with tempfile.TemporaryDirectory() as log_dir:
+        log = ActivityLogger(log_dir=log_dir, agent_name="bench", fsync=False, max_batch=4096, checkpoint_key="bench")
+        for _ in range(entries):
+            await log.log_activity("risk_analysis", details)
+        await log.flush()
+
+        full_ms, full = await timed(log.verify_integrity(full=True))
+        parallel_ms, parallel = await timed(log.verify_integrity(full=True, parallel=True, workers=workers))
+        for _ in range(max(1, entries // 100)):
+            await log.log_activity("risk_analysis", details)
+        incremental_ms, incremental = await timed(log.verify_integrity())
+        segments = len(log.segments())
+        await log.close()
+
+    assert full[0] and parallel[0] and incremental[0]
+    print(f"{entries:,} entries in {segments} segments")
+    print(f"  full, sequential   {full_ms:9.1f} ms")
+    print(f"  full, {workers} processes {parallel_ms:9.1f} ms  ({full_ms / parallel_ms:.1f}x)")
+    print(f"  incremental (+1%)  {incremental_ms:9.1f} ms  ({full_ms / incremental_ms:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(30))
+    asyncio.run(run(args.entries, args.workers))
+
+
+if __name__ == "__main__":
+    main()
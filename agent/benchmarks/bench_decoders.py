@@ -0,0 +1,173 @@
+"""
+Obligation decoder microbenchmark
+
+Compares the old field-by-field `struct.unpack_from` parsing with the
+precompiled layouts in protocols/layouts.py on a corpus of real-size
+accounts (1300-byte Kamino obligations, 2312-byte MarginFi accounts,
+916-byte Solend obligations).
+
+Run from the agent/ directory:
+    python benchmarks/bench_decoders.py [--accounts N] [--rounds R]
+"""
+import argparse
+import base64
+import os
+import random
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from protocols.kamino import OBLIGATION_SIZE
+from protocols.layouts import (
+    KAMINO_ENTRY, MARGINFI_BALANCE, MARGINFI_MAX_BALANCES, SOLEND_DEPOSITS_LEN_OFFSET, SOLEND_MAX_DEPOSITS,
+    decode_kamino_obligation, decode_marginfi_balances, decode_solend_deposits, decode_solend_values,
+)
+from protocols.marginfi import MARGIN_ACCOUNT_SIZE
+from protocols.solend import OBLIGATION_SIZE as SOLEND_OBLIGATION_SIZE
+
+
+# ── Corpus ───────────────────────────────────────────────────────────
+
+def make_kamino_obligation(rng: random.Random) -> bytes:
+    data = bytearray(rng.randbytes(OBLIGATION_SIZE))
+    n_deposits = rng.randint(1, 8)
+    n_borrows = rng.randint(0, 8)
+    data[72] = n_deposits
+    offset = 73 + n_deposits * KAMINO_ENTRY.size
+    data[offset] = n_borrows
+    return bytes(data)
+
+
+def make_marginfi_account(rng: random.Random) -> bytes:
+    data = bytearray(rng.randbytes(MARGIN_ACCOUNT_SIZE))
+    for i in range(MARGINFI_MAX_BALANCES):
+        data[72 + i * MARGINFI_BALANCE.size] = rng.random() < 0.3
+    return bytes(data)
+
+
+def make_solend_obligation(rng: random.Random) -> bytes:
+    data = bytearray(rng.randbytes(SOLEND_OBLIGATION_SIZE))
+    data[SOLEND_DEPOSITS_LEN_OFFSET] = rng.randint(0, SOLEND_MAX_DEPOSITS)
+    return bytes(data)
+
+
+# ── Previous decoders (field-by-field unpack_from) ───────────────────
+
+def legacy_kamino(data: bytes):
+    deposits, borrows = [], []
+    num_deposits = struct.unpack_from("<B", data, 72)[0] if len(data) > 72 else 0
+    offset = 73
+    for _ in range(min(num_deposits, 8)):
+        if offset + 48 > len(data):
+            break
+        reserve = data[offset:offset + 32]
+        amount = struct.unpack_from("<Q", data, offset + 32)[0]
+        value = struct.unpack_from("<Q", data, offset + 40)[0]
+        deposits.append((reserve, amount, value))
+        offset += 48
+    num_borrows = struct.unpack_from("<B", data, offset)[0] if offset < len(data) else 0
+    offset += 1
+    for _ in range(min(num_borrows, 8)):
+        if offset + 48 > len(data):
+            break
+        reserve = data[offset:offset + 32]
+        amount = struct.unpack_from("<Q", data, offset + 32)[0]
+        value = struct.unpack_from("<Q", data, offset + 40)[0]
+        borrows.append((reserve, amount, value))
+        offset += 48
+    return deposits, borrows
+
+
+def legacy_marginfi(data: bytes):
+    balances = []
+    for i in range(min(16, (len(data) - 72) // 65)):
+        offset = 72 + i * 65
+        if offset + 65 > len(data):
+            break
+        if not data[offset]:
+            continue
+        balances.append((
+            i,
+            data[offset + 1:offset + 33],
+            struct.unpack_from("<Q", data, offset + 33)[0],
+            struct.unpack_from("<Q", data, offset + 41)[0],
+            struct.unpack_from("<Q", data, offset + 49)[0],
+            struct.unpack_from("<Q", data, offset + 57)[0],
+        ))
+    return balances
+
+
+def legacy_solend(data: bytes):
+    # The old parser's deposit-amount unpack_from had its arguments swapped; fixed here so the outputs compare
+    deposited = borrowed = 0
+    offset = 66
+    if len(data) >= offset + 16:
+        deposited_lo = struct.unpack_from("<Q", data, offset)[0]
+        deposited_hi = struct.unpack_from("<Q", data, offset + 8)[0]
+        deposited = deposited_hi * (2**64) + deposited_lo
+    offset += 16
+    if len(data) >= offset + 16:
+        borrowed_lo = struct.unpack_from("<Q", data, offset)[0]
+        borrowed_hi = struct.unpack_from("<Q", data, offset + 8)[0]
+        borrowed = borrowed_hi * (2**64) + borrowed_lo
+
+    deposits = []
+    if len(data) > 130:
+        dep_offset = 131
+        for _ in range(min(data[130], 10)):
+            if dep_offset + 56 > len(data):
+                break
+            reserve = data[dep_offset:dep_offset + 32]
+            amount = struct.unpack_from("<Q", data, dep_offset + 32)[0]
+            value = struct.unpack_from("<Q", data, dep_offset + 40)[0]
+            deposits.append((reserve, amount, value))
+            dep_offset += 56
+    return (deposited, borrowed), deposits
+
+
+def layout_solend(data: bytes):
+    return decode_solend_values(data), decode_solend_deposits(data)
+
+
+# ── Harness ──────────────────────────────────────────────────────────
+
+def throughput(decode, corpus: list[bytes], rounds: int) -> float:
+    """Best-of-`rounds` accounts decoded per second"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for data in corpus:
+            decode(data)
+        best = min(best, time.perf_counter() - start)
+    return len(corpus) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--accounts", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(8)
+    cases = [
+        ("kamino", make_kamino_obligation, legacy_kamino, decode_kamino_obligation),
+        ("marginfi", make_marginfi_account, legacy_marginfi, decode_marginfi_balances),
+        ("solend", make_solend_obligation, legacy_solend, layout_solend),
+    ]
+
+    print(f"{'layout':<10} {'size':>6} {'before/s':>12} {'after/s':>12} {'speedup':>8}")
+    for name, make, legacy, layout in cases:
+        # Accounts arrive base64-encoded; decode once up front like the adapters do
+        corpus = [base64.b64decode(base64.b64encode(make(rng))) for _ in range(args.accounts)]
+        for data in corpus[:500]:
+            assert legacy(data) == layout(data), f"{name} decoders disagree"
+
+        before = throughput(legacy, corpus, args.rounds)
+        after = throughput(layout, corpus, args.rounds)
+        print(f"{name:<10} {len(corpus[0]):>6} {before:>12,.0f} {after:>12,.0f} {after / before:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Activity-entry hashing benchmark
+
+Hashes N entries with realistic nested details under each hash version
+and reports entries hashed per second, then times a full verification
+of a log of N entries written under each version.
+
+Run from the agent/ directory:
+    python benchmarks/bench_hashing.py [--entries N]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import structlog
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from activity_logger import HASH_VERSIONS, ActivityEntry, ActivityLogger
+
+DETAILS = {
+    "position_key": "Obligation111",
+    "protocol": "kamino",
+    "health_factor": 1.12,
+    "analysis": {
+        "strategy": "debt_repayment",
+        "confidence": 0.85,
+        "reasoning": "HF below critical threshold; repay part of the USDC debt.",
+        "actions": [{"type": "repay", "mint": "USDC", "amount_usd": 1250.0}],
+    },
+    "collaterals": [{"mint": "SOL", "value_usd": 5400.5, "ltv": 0.75}] * 3,
+    "debts": [{"mint": "USDC", "value_usd": 4100.0}] * 2,
+}
+
+
+def hash_rate(entries: int, version: int) -> float:
+    batch = [
+        ActivityEntry(timestamp=1.0 + i, action="risk_analysis", details=DETAILS,
+                      previous_hash="0" * 64, sequence=i, hash_version=version)
+        for i in range(entries)
+    ]
+    start = time.perf_counter()
+    for entry in batch:
+        entry.compute_hash()
+    return entries / (time.perf_counter() - start)
+
+
+async def verify_ms(entries: int, version: int) -> float:
+    with tempfile.TemporaryDirectory() as log_dir:
+        log = ActivityLogger(log_dir=log_dir, agent_name="bench", fsync=False, max_batch=4096,
+                             hash_version=version)
+        for _ in range(entries):
+            await log.log_activity("risk_analysis", DETAILS)
+        await log.flush()
+        start = time.perf_counter()
+        valid, _ = await log.verify_integrity(full=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        await log.close()
+    assert valid
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=100_000)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(30))
+    rates = {version: hash_rate(args.entries, version) for version in HASH_VERSIONS}
+    verify = {version: asyncio.run(verify_ms(args.entries, version)) for version in HASH_VERSIONS}
+
+    print(f"{args.entries:,} entries")
+    for version in HASH_VERSIONS:
+        print(f"  v{version}  {rates[version]:12,.0f} hashes/s ({rates[version] / rates[1]:.1f}x)"
+              f"   full verify {verify[version]:9.1f} ms ({verify[1] / verify[version]:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Health-factor re-scoring benchmark
+
+Scores a batch of Kamino obligations three ways: the per-account
+`parse_account` loop, `score_accounts` (pack + vectorized score, same
+health factors) and `score_records` on an already-packed array, which is
+what a re-score of a held batch costs.
+
+Run from the agent/ directory:
+    python benchmarks/bench_health.py [--accounts N]
+"""
+import argparse
+import asyncio
+import base64
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from protocols.base import Protocol
+from protocols.kamino import KaminoAdapter, OBLIGATION_SIZE
+from protocols.scoring import LAYOUTS, pack_records, score_accounts, score_records
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--accounts", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(9)
+    corpus = []
+    for _ in range(args.accounts):
+        # A few deposits and borrows with realistic values, the rest empty
+        data = bytearray(OBLIGATION_SIZE)
+        deposits, borrows = rng.randint(1, 4), rng.randint(0, 3)
+        data[72] = deposits
+        for i in range(deposits):
+            data[73 + 48 * i:73 + 48 * i + 48] = rng.randbytes(40) + rng.randrange(10**12).to_bytes(8, "little")
+        offset = 73 + 48 * deposits
+        data[offset] = borrows
+        for i in range(borrows):
+            start = offset + 1 + 48 * i
+            data[start:start + 48] = rng.randbytes(40) + rng.randrange(10**12).to_bytes(8, "little")
+        corpus.append(bytes(data))
+    accounts = [{"pubkey": "Obligation", "account": {"data": [base64.b64encode(b).decode(), "base64"]}} for b in corpus]
+    adapter = KaminoAdapter("http://localhost")
+
+    records = pack_records(corpus, LAYOUTS[Protocol.KAMINO])
+    sizes = np.full(len(corpus), OBLIGATION_SIZE)
+
+    async def parse_all():
+        return [await adapter.parse_account("Owner", account) for account in accounts]
+
+    scalar_ms = timed(lambda: asyncio.run(parse_all()))
+    batch_ms = timed(lambda: score_accounts(Protocol.KAMINO, corpus))
+    rescore_ms = timed(lambda: score_records(Protocol.KAMINO, records, sizes))
+
+    print(f"{args.accounts:,} Kamino obligations ({OBLIGATION_SIZE} bytes)")
+    print(f"  parse_account loop {scalar_ms:9.1f} ms")
+    print(f"  score_accounts     {batch_ms:9.1f} ms  ({scalar_ms / batch_ms:.1f}x)")
+    print(f"  score_records      {rescore_ms:9.1f} ms  ({scalar_ms / rescore_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
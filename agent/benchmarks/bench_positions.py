@@ -0,0 +1,124 @@
+"""
+Position memory benchmark
+
+Measures resident memory (tracemalloc) for holding N positions, each
+with two collaterals and one debt, as:
+  - the previous dict-backed dataclasses
+  - slotted PositionData (current)
+  - a columnar PositionTable
+
+Run from the agent/ directory:
+    python benchmarks/bench_positions.py [--positions N]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from protocols.base import CollateralPosition, DebtPosition, PositionData, Protocol, RiskLevel
+from protocols.table import PositionTable
+
+
+# ── Previous (dict-backed) definitions ───────────────────────────────
+
+@dataclass
+class LegacyCollateral:
+    mint: str
+    symbol: str
+    amount: float
+    value_usd: float
+    ltv: float
+    liquidation_threshold: float
+
+
+@dataclass
+class LegacyDebt:
+    mint: str
+    symbol: str
+    amount: float
+    value_usd: float
+    borrow_rate_apy: float
+
+
+@dataclass
+class LegacyPosition:
+    protocol: Protocol
+    owner: str
+    obligation_key: str
+    health_factor: float
+    total_collateral_usd: float
+    total_debt_usd: float
+    net_value_usd: float
+    risk_level: RiskLevel
+    collaterals: list = field(default_factory=list)
+    debts: list = field(default_factory=list)
+    liquidation_price: Optional[float] = None
+    timestamp: float = field(default_factory=time.time)
+
+
+def build(i: int, position_cls, collateral_cls, debt_cls, owners: list[str]):
+    collateral = 1000.0 + i
+    debt = 400.0 + i % 500
+    return position_cls(
+        protocol=Protocol.KAMINO,
+        owner=owners[i % len(owners)],
+        obligation_key=f"{i:044d}",
+        health_factor=collateral * 0.85 / debt,
+        total_collateral_usd=collateral,
+        total_debt_usd=debt,
+        net_value_usd=collateral - debt,
+        risk_level=RiskLevel.HEALTHY,
+        collaterals=[
+            collateral_cls("So11111111111111111111111111111111111111112"[:8] + "...", "SOL", 3.0, collateral * 0.6, 0.75, 0.85),
+            collateral_cls("EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"[:8] + "...", "USDC", collateral * 0.4, collateral * 0.4, 0.8, 0.9),
+        ],
+        debts=[debt_cls("Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB"[:8] + "...", "USDT", debt, debt, 0.05)],
+    )
+
+
+def measure(make) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    obj = make()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--positions", type=int, default=200_000)
+    args = parser.parse_args()
+    n = args.positions
+    owners = [f"{w:044d}" for w in range(n // 4 or 1)]
+
+    def table_from_slotted():
+        table = PositionTable(capacity=n)
+        for i in range(n):
+            table.upsert(build(i, PositionData, CollateralPosition, DebtPosition, owners))
+        return table
+
+    variants = [
+        ("dict dataclasses", lambda: [build(i, LegacyPosition, LegacyCollateral, LegacyDebt, owners) for i in range(n)]),
+        ("slotted dataclasses", lambda: [build(i, PositionData, CollateralPosition, DebtPosition, owners) for i in range(n)]),
+        ("PositionTable", table_from_slotted),
+    ]
+
+    print(f"{n:,} positions (2 collaterals + 1 debt each)")
+    baseline = None
+    for name, make in variants:
+        held, size = measure(make)
+        baseline = baseline or size
+        print(f"  {name:<20} {size / 2**20:8.1f} MB  {size / n:7.0f} B/position  ({baseline / size:.2f}x)")
+        del held
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Polling Cadence — per-position next-check times from health factor and HF velocity"""
+import heapq
+import math
+import time
+from typing import Optional
+
+BUCKETS = ("emergency", "critical", "warning", "healthy", "safe")
+
+DEFAULT_INTERVALS = {
+    "emergency": 0.4,  # ~one slot
+    "critical": 2.0,
+    "warning": 10.0,
+    "healthy": 60.0,
+    "safe": 300.0,
+}
+
+
+class PollingCadence:
+    """
+    Schedules each position's next health-factor check.
+
+    The base interval comes from the position's bucket (emergency →
+    about a slot, HF above `safe` → every few minutes). A falling health
+    factor shortens it further: the position is checked at least
+    `lookahead` times before it could, at its current velocity, cross
+    into the next-worse bucket. `due()` pops positions whose time has
+    come; per-bucket poll counts show where the RPC budget is going.
+    """
+
+    def __init__(
+        self,
+        warn: float = 1.5,
+        critical: float = 1.2,
+        emergency: float = 1.05,
+        safe: float = 3.0,
+        intervals: Optional[dict[str, float]] = None,
+        lookahead: int = 4,
+    ):
+        self.bounds = (emergency, critical, warn, safe)
+        self.intervals = {**DEFAULT_INTERVALS, **(intervals or {})}
+        self.min_interval = min(self.intervals.values())
+        self.lookahead = lookahead
+
+        # obligation key → (health factor, monotonic time) of the last observation
+        self._last: dict[str, tuple[float, float]] = {}
+        self._next_due: dict[str, float] = {}
+        self._heap: list[tuple[float, str]] = []
+        self.polls = dict.fromkeys(BUCKETS, 0)
+
+    def __len__(self) -> int:
+        return len(self._next_due)
+
+    def bucket(self, health_factor: float) -> str:
+        for name, bound in zip(BUCKETS, self.bounds):
+            if health_factor < bound:
+                return name
+        return "safe"
+
+    def observe(self, obligation_key: str, health_factor: float, now: Optional[float] = None) -> float:
+        """Record a fresh health factor and schedule the next check; returns the interval"""
+        now = time.monotonic() if now is None else now
+        bucket = self.bucket(health_factor)
+        self.polls[bucket] += 1
+
+        interval = self.intervals[bucket]
+        previous = self._last.get(obligation_key)
+        if previous is not None and bucket != "emergency":
+            velocity = (health_factor - previous[0]) / max(now - previous[1], 1e-9)
+            if velocity < 0:
+                floor = self.bounds[BUCKETS.index(bucket) - 1]
+                time_to_cross = (health_factor - floor) / -velocity
+                interval = min(interval, max(self.min_interval, time_to_cross / self.lookahead))
+
+        self._last[obligation_key] = (health_factor, now)
+        due = now + interval
+        self._next_due[obligation_key] = due
+        heapq.heappush(self._heap, (due, obligation_key))
+        return interval
+
+    def retry(self, obligation_key: str, now: Optional[float] = None) -> float:
+        """Reschedule a check that couldn't be made at its current tier's interval
+
+        The last observed health factor picks the tier; history is left
+        alone so a failed read doesn't count as a poll or skew velocity.
+        """
+        now = time.monotonic() if now is None else now
+        previous = self._last.get(obligation_key)
+        if previous is None:
+            # Forgotten while the read was in flight; nothing to reschedule
+            return 0.0
+        interval = self.intervals[self.bucket(previous[0])]
+        due = now + interval
+        self._next_due[obligation_key] = due
+        heapq.heappush(self._heap, (due, obligation_key))
+        return interval
+
+    def due(self, now: Optional[float] = None) -> list[str]:
+        """Pop every position whose next check has arrived"""
+        now = time.monotonic() if now is None else now
+        keys = []
+        while self._heap and self._heap[0][0] <= now:
+            due, key = heapq.heappop(self._heap)
+            # Skip entries superseded by a later observe() or forget()
+            if self._next_due.get(key) == due:
+                del self._next_due[key]
+                keys.append(key)
+        return keys
+
+    def forget(self, obligation_key: str):
+        self._last.pop(obligation_key, None)
+        self._next_due.pop(obligation_key, None)
+
+    def next_due(self) -> float:
+        """Monotonic time of the earliest scheduled check (inf when idle)"""
+        while self._heap and self._next_due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else math.inf
+
+    def get_stats(self) -> dict:
+        scheduled = dict.fromkeys(BUCKETS, 0)
+        for key in self._next_due:
+            scheduled[self.bucket(self._last[key][0])] += 1
+        return {"polls": dict(self.polls), "scheduled": scheduled}
@@ -18,6 +18,23 @@ class SolanaConfig:
         "HELIUS_WS_URL",
         "wss://api.devnet.solana.com"
     )
+    # Optional comma-separated endpoint list for the RPC router
+    rpc_urls: list[str] = field(default_factory=lambda: [
+        url.strip() for url in os.getenv("HELIUS_RPC_URLS", "").split(",") if url.strip()
+    ])
+    rpc_hedge_reads: bool = os.getenv("RPC_HEDGE_READS", "false").lower() == "true"
+    rpc_max_connections: int = int(os.getenv("RPC_MAX_CONNECTIONS", "100"))
+    rpc_max_keepalive: int = int(os.getenv("RPC_MAX_KEEPALIVE", "20"))
+    rpc_keepalive_expiry_seconds: float = float(os.getenv("RPC_KEEPALIVE_EXPIRY_SECONDS", "30"))
+    rpc_http2: bool = os.getenv("RPC_HTTP2", "true").lower() == "true"
+    rpc_batch_window_ms: float = float(os.getenv("RPC_BATCH_WINDOW_MS", "0"))  # 0 = no batching
+    rpc_batch_max_size: int = int(os.getenv("RPC_BATCH_MAX_SIZE", "50"))
+
+    def __post_init__(self):
+        # The endpoint list wins over HELIUS_RPC_URL: its first entry is the
+        # primary, which is also where the router starts before it has scores
+        if self.rpc_urls:
+            self.rpc_url = self.rpc_urls[0]
 
 
 @dataclass
@@ -26,12 +43,21 @@ class AIConfig:
     model: str = os.getenv("CLAUDE_MODEL", "claude-sonnet-4-20250514")
     max_tokens: int = 4096
     temperature: float = 0.1  # Low temperature for consistent risk analysis
+    max_concurrent_analyses: int = int(os.getenv("MAX_CONCURRENT_ANALYSES", "8"))
+    analysis_timeout_seconds: float = float(os.getenv("ANALYSIS_TIMEOUT_SECONDS", "30"))
+    max_queued_analyses: int = int(os.getenv("MAX_QUEUED_ANALYSES", "100"))
+    analysis_batch_size: int = int(os.getenv("ANALYSIS_BATCH_SIZE", "1"))  # positions per request
+    analysis_cache_ttl_seconds: float = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "900"))  # 0 = no cache
+    analysis_cache_max_entries: int = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1024"))
+    analysis_cache_hf_bucket: float = float(os.getenv("ANALYSIS_CACHE_HF_BUCKET", "0.05"))
+    analysis_cache_hf_delta: float = float(os.getenv("ANALYSIS_CACHE_HF_DELTA", "0.05"))
 
 
 @dataclass
 class AgentWalletConfig:
     api_key: str = os.getenv("AGENT_WALLET_API_KEY", "")
     wallet_id: str = os.getenv("AGENT_WALLET_ID", "")
+    address: str = os.getenv("AGENT_WALLET_ADDRESS", "")
     base_url: str = "https://agentwallet.mcpay.tech/api"
 
 
@@ -41,8 +67,27 @@ class MonitoringConfig:
     health_factor_warn: float = float(os.getenv("HEALTH_FACTOR_WARN", "1.5"))
     health_factor_critical: float = float(os.getenv("HEALTH_FACTOR_CRITICAL", "1.2"))
     health_factor_emergency: float = float(os.getenv("HEALTH_FACTOR_EMERGENCY", "1.05"))
+    warn_drift_per_hour: float = float(os.getenv("WARN_DRIFT_PER_HOUR", "0.05"))
     max_rebalance_attempts: int = 3
     rebalance_cooldown_seconds: int = 60
+    max_inflight_fetches: int = int(os.getenv("MAX_INFLIGHT_FETCHES", "16"))
+    max_inflight_per_endpoint: int = int(os.getenv("MAX_INFLIGHT_PER_ENDPOINT", "16"))
+    adapter_timeout_seconds: float = float(os.getenv("ADAPTER_TIMEOUT_SECONDS", "10"))
+    analysis_workers: int = int(os.getenv("ANALYSIS_WORKERS", "8"))
+    execution_workers: int = int(os.getenv("EXECUTION_WORKERS", "2"))
+    snapshot_mode: bool = os.getenv("SNAPSHOT_MODE", "false").lower() == "true"
+    incremental_hf_delta: float = float(os.getenv("INCREMENTAL_HF_DELTA", "0.02"))
+    incremental_value_delta: float = float(os.getenv("INCREMENTAL_VALUE_DELTA", "0.05"))
+    incremental_max_age_seconds: float = float(os.getenv("INCREMENTAL_MAX_AGE_SECONDS", "300"))
+    adaptive_polling: bool = os.getenv("ADAPTIVE_POLLING", "false").lower() == "true"
+    discovery_interval_seconds: int = int(os.getenv("DISCOVERY_INTERVAL_SECONDS", "300"))
+    # "pyth" reads PYTH_ORACLES (reserve=price_account,...) in one batch; "static" is a local stub
+    price_feed: str = os.getenv("PRICE_FEED", "")
+    price_poll_seconds: float = float(os.getenv("PRICE_POLL_SECONDS", "1.0"))
+    pyth_oracles: dict[str, str] = field(default_factory=lambda: dict(
+        pair.strip().split("=", 1) for pair in os.getenv("PYTH_ORACLES", "").split(",") if "=" in pair
+    ))
+    streaming_mode: bool = os.getenv("STREAMING_MODE", "false").lower() == "true"
 
 
 @dataclass
@@ -86,6 +131,19 @@ class AppConfig:
     protocols: ProtocolAddresses = field(default_factory=ProtocolAddresses)
     colosseum: ColosseumConfig = field(default_factory=ColosseumConfig)
     log_dir: str = os.getenv("LOG_DIR", "agent/logs")
+    log_flush_interval_ms: float = float(os.getenv("LOG_FLUSH_INTERVAL_MS", "50"))
+    log_max_batch: int = int(os.getenv("LOG_MAX_BATCH", "256"))
+    log_fsync: bool = os.getenv("LOG_FSYNC", "true").lower() == "true"
+    log_segment_max_entries: int = int(os.getenv("LOG_SEGMENT_MAX_ENTRIES", "10000"))
+    log_segment_max_mb: int = int(os.getenv("LOG_SEGMENT_MAX_MB", "16"))
+    log_recent_entries: int = int(os.getenv("LOG_RECENT_ENTRIES", "1000"))
+    log_checkpoint_interval: int = int(os.getenv("LOG_CHECKPOINT_INTERVAL", "1000"))
+    log_checkpoint_key: str = os.getenv("LOG_CHECKPOINT_KEY", "")
+    log_hash_version: int = int(os.getenv("LOG_HASH_VERSION", "2"))
+    # "memo" anchors Merkle roots via the agent wallet, "stub" records them locally, empty disables
+    attestation_mode: str = os.getenv("ATTESTATION_MODE", "")
+    attestation_window_seconds: float = float(os.getenv("ATTESTATION_WINDOW_SECONDS", "300"))
+    attestation_max_entries: int = int(os.getenv("ATTESTATION_MAX_ENTRIES", "4096"))
 
 
 def get_config() -> AppConfig:
@@ -0,0 +1,138 @@
+"""Tiered Decision Engine — deterministic fast path in front of the AI analyzer"""
+import hashlib
+import time
+from collections import deque
+from typing import Optional
+
+import structlog
+
+from analyzer import AnalysisResult, ClaudeAnalyzer, RebalanceStrategy
+from protocols.base import PositionData
+from protocols.rpc import SAMPLE_WINDOW, percentile
+
+logger = structlog.get_logger()
+
+TIERS = ("rules", "llm")
+
+
+class TieredDecisionEngine:
+    """
+    Decides what to do about at-risk positions, cheapest tier first.
+
+    Tier "rules" settles clear-cut cases in-process: anything below the
+    emergency threshold gets the rule-based unwind/repay immediately, and
+    a warning-level position whose health factor is flat or improving
+    (falling slower than `warn_drift_per_hour`) gets no action. Everything
+    else — critical positions, fast-falling warnings, positions seen for
+    the first time — escalates to the LLM analyzer. Emergency reactions
+    therefore never wait on a network call.
+    """
+
+    def __init__(
+        self,
+        analyzer: ClaudeAnalyzer,
+        warn: float = 1.5,
+        critical: float = 1.2,
+        emergency: float = 1.05,
+        warn_drift_per_hour: float = 0.05,
+    ):
+        self.analyzer = analyzer
+        self.warn = warn
+        self.critical = critical
+        self.emergency = emergency
+        self.warn_drift_per_hour = warn_drift_per_hour
+
+        # obligation key → (health factor, monotonic time) at last decision
+        self._last_seen: dict[str, tuple[float, float]] = {}
+        self.counts = {tier: 0 for tier in TIERS}
+        self._latencies = {tier: deque(maxlen=SAMPLE_WINDOW) for tier in TIERS}
+
+    async def decide(
+        self, positions: list[PositionData], market_context: Optional[str] = None
+    ) -> list[AnalysisResult]:
+        """One result per position, in input order"""
+        results: list[Optional[AnalysisResult]] = [None] * len(positions)
+        escalate = []
+
+        for i, position in enumerate(positions):
+            start = time.perf_counter()
+            result = self._rule(position)
+            if result is not None:
+                results[i] = result
+                self._record("rules", time.perf_counter() - start)
+                logger.debug(
+                    "rule_decision",
+                    position=position.obligation_key[:16],
+                    health_factor=position.health_factor,
+                    strategy=result.strategy.value,
+                )
+            else:
+                escalate.append(i)
+
+        if escalate:
+            start = time.perf_counter()
+            analyses = await self.analyzer.analyze_positions(
+                [positions[i] for i in escalate], market_context
+            )
+            per_position = (time.perf_counter() - start) / len(escalate)
+            for i, analysis in zip(escalate, analyses):
+                results[i] = analysis
+                self._record("llm", per_position)
+
+        now = time.monotonic()
+        for position in positions:
+            self._last_seen[position.obligation_key] = (position.health_factor, now)
+        return results
+
+    def forget(self, obligation_key: str):
+        self._last_seen.pop(obligation_key, None)
+
+    def velocity(self, position: PositionData) -> Optional[float]:
+        """Health-factor change per hour since the last decision, None if unseen"""
+        previous = self._last_seen.get(position.obligation_key)
+        if previous is None:
+            return None
+        hf, seen_at = previous
+        elapsed = time.monotonic() - seen_at
+        if elapsed <= 0:
+            return None
+        return (position.health_factor - hf) / (elapsed / 3600)
+
+    def _rule(self, position: PositionData) -> Optional[AnalysisResult]:
+        hf = position.health_factor
+        if hf < self.emergency:
+            return self.analyzer._fallback_analysis(position)
+
+        if self.critical <= hf < self.warn:
+            velocity = self.velocity(position)
+            if velocity is not None and velocity > -self.warn_drift_per_hour:
+                reasoning = (
+                    f"WARNING: Health factor {hf:.4f} drifting {velocity:+.4f}/h, "
+                    f"slower than {self.warn_drift_per_hour}/h. No action needed."
+                )
+                return AnalysisResult(
+                    position_key=position.obligation_key,
+                    risk_level=position.risk_level,
+                    strategy=RebalanceStrategy.NO_ACTION,
+                    reasoning=reasoning,
+                    confidence=0.9,
+                    suggested_amount_usd=0.0,
+                    urgency_score=0.2,
+                    reasoning_hash=hashlib.sha256(reasoning.encode()).hexdigest(),
+                    timestamp=time.time(),
+                )
+        return None
+
+    def _record(self, tier: str, latency: float):
+        self.counts[tier] += 1
+        self._latencies[tier].append(latency)
+
+    def get_stats(self) -> dict:
+        return {
+            tier: {
+                "count": self.counts[tier],
+                "latency_p50_us": round(percentile(self._latencies[tier], 50) * 1e6, 1),
+                "latency_p99_us": round(percentile(self._latencies[tier], 99) * 1e6, 1),
+            }
+            for tier in TIERS
+        }
@@ -10,6 +10,7 @@ import structlog
 
 from analyzer import RebalanceStrategy, AnalysisResult
 from protocols.base import PositionData
+from protocols.rpc import RPCClient
 
 logger = structlog.get_logger()
 
@@ -59,12 +60,14 @@ class RebalanceExecutor:
         wallet_api_key: str,
         wallet_id: str,
         dry_run: bool = True,
+        client: Optional[RPCClient] = None,
     ):
         self.rpc_url = rpc_url
         self.wallet_api_key = wallet_api_key
         self.wallet_id = wallet_id
         self.dry_run = dry_run
-        self.client = httpx.AsyncClient(timeout=60)
+        self.client = client or httpx.AsyncClient(timeout=60)
+        self._owns_client = client is None
         self.execution_count = 0
 
     async def execute_rebalance(
@@ -371,4 +374,5 @@ class RebalanceExecutor:
             return None
 
     async def close(self):
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
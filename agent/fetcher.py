@@ -0,0 +1,209 @@
+"""Position Fetcher — Bounded-concurrency fan-out across wallets and adapters"""
+import asyncio
+import base64
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import structlog
+
+from protocols.accounts import AccountFetcher
+from protocols.base import Protocol, ProtocolAdapter, PositionData
+from protocols.rpc import percentile
+from protocols.scoring import score_accounts
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class FetchStats:
+    """Latency and outcome numbers for one fetch stage"""
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    positions: int = 0
+    wall_time_s: float = 0.0
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+
+    def record(self, protocol: str, latency_s: float):
+        self.latencies.setdefault(protocol, []).append(latency_s)
+
+    def to_dict(self) -> dict:
+        all_latencies = [s for samples in self.latencies.values() for s in samples]
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "positions": self.positions,
+            "wall_ms": round(self.wall_time_s * 1000, 2),
+            "p50_ms": round(percentile(all_latencies, 50) * 1000, 2),
+            "p99_ms": round(percentile(all_latencies, 99) * 1000, 2),
+            "max_ms": round(max(all_latencies, default=0.0) * 1000, 2),
+            "per_protocol": {
+                protocol: {
+                    "calls": len(samples),
+                    "p50_ms": round(percentile(samples, 50) * 1000, 2),
+                    "p99_ms": round(percentile(samples, 99) * 1000, 2),
+                }
+                for protocol, samples in self.latencies.items()
+            },
+        }
+
+
+class PositionFetcher:
+    """
+    Fans out get_positions() over every wallet × adapter pair concurrently.
+
+    At most `max_inflight` adapter calls run at once across all adapters
+    (a global cap; per-endpoint limits live in RPCRouter, which knows
+    which endpoint each request actually hits) and each call gets its own
+    timeout, so a cycle takes roughly as long as its slowest call rather
+    than the sum.
+    """
+
+    def __init__(self, max_inflight: int = 16, timeout_seconds: float = 10.0):
+        self.max_inflight = max_inflight
+        self.timeout_seconds = timeout_seconds
+        self._semaphore = asyncio.Semaphore(max_inflight)
+
+    async def fetch_all(
+        self,
+        wallets: list[str],
+        adapters: list[ProtocolAdapter],
+    ) -> tuple[list[PositionData], FetchStats]:
+        """Fetch positions for every wallet from every adapter"""
+        stats = FetchStats()
+        start = time.perf_counter()
+
+        results = await asyncio.gather(*(
+            self._fetch_one(wallet, adapter, stats)
+            for wallet in wallets
+            for adapter in adapters
+        ))
+
+        positions = [p for batch in results for p in batch]
+        stats.positions = len(positions)
+        stats.wall_time_s = time.perf_counter() - start
+        return positions, stats
+
+    async def _fetch_one(
+        self,
+        wallet: str,
+        adapter: ProtocolAdapter,
+        stats: FetchStats,
+    ) -> list[PositionData]:
+        protocol_name = await adapter.get_protocol_name()
+
+        async with self._semaphore:
+            stats.calls += 1
+            call_start = time.perf_counter()
+            try:
+                positions = await asyncio.wait_for(
+                    adapter.get_positions(wallet), timeout=self.timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                logger.warning(
+                    "adapter_timeout",
+                    protocol=protocol_name,
+                    wallet=wallet[:8] + "...",
+                    timeout_s=self.timeout_seconds,
+                )
+                return []
+            except Exception as e:
+                stats.errors += 1
+                logger.error("adapter_error", protocol=protocol_name, error=str(e))
+                return []
+            finally:
+                stats.record(protocol_name, time.perf_counter() - call_start)
+
+        if positions:
+            logger.info(
+                "positions_found",
+                protocol=protocol_name,
+                wallet=wallet[:8] + "...",
+                count=len(positions),
+            )
+        return positions
+
+
+async def refresh_positions(
+    account_fetcher: AccountFetcher,
+    adapters: dict[Protocol, ProtocolAdapter],
+    positions: list[PositionData],
+) -> tuple[dict[str, Optional[PositionData]], list[str]]:
+    """Re-read known positions' accounts in batched round trips
+
+    Accounts come back through getMultipleAccounts and are parsed by their
+    adapter's parse_account — the same parser the full fetch and the
+    stream use. Returns the refreshed positions, where accounts the RPC
+    confirmed missing (or that don't parse) map to None, and the keys whose
+    fetch failed, which are left out of the first mapping.
+    """
+    accounts, failed = await _read_accounts(account_fetcher, positions)
+
+    refreshed: dict[str, Optional[PositionData]] = {}
+    for position in positions:
+        key = position.obligation_key
+        if key not in accounts:
+            continue
+        data = accounts[key]
+        if data is None:
+            refreshed[key] = None
+            continue
+        account = {"data": [base64.b64encode(data).decode(), "base64"]}
+        refreshed[key] = await adapters[position.protocol].parse_account(
+            position.owner, {"pubkey": key, "account": account}
+        )
+    return refreshed, failed
+
+
+async def score_positions(
+    account_fetcher: AccountFetcher,
+    positions: list[PositionData],
+) -> tuple[dict[str, float], list[str]]:
+    """Re-read known positions' accounts and score them in one vectorized pass per protocol
+
+    Health factors equal parse_account's (see protocols.scoring) without
+    building a PositionData per account. Accounts the RPC confirmed
+    missing score 0.0; keys whose fetch failed are returned separately.
+    """
+    accounts, failed = await _read_accounts(account_fetcher, positions)
+
+    health_factors: dict[str, float] = {}
+    by_protocol: dict[Protocol, list[tuple[str, bytes]]] = {}
+    for position in positions:
+        key = position.obligation_key
+        if key not in accounts:
+            continue
+        data = accounts[key]
+        if data is None:
+            health_factors[key] = 0.0
+        else:
+            by_protocol.setdefault(position.protocol, []).append((key, data))
+
+    for protocol, batch in by_protocol.items():
+        scores = score_accounts(protocol, [data for _, data in batch])
+        health_factors.update(zip((key for key, _ in batch), scores.health_factor.tolist()))
+    return health_factors, failed
+
+
+async def _read_accounts(
+    account_fetcher: AccountFetcher,
+    positions: list[PositionData],
+) -> tuple[dict[str, Optional[bytes]], list[str]]:
+    """Fetch positions' accounts; failed reads are listed apart from missing (None) accounts"""
+    account_fetcher.start_cycle()
+    keys = [p.obligation_key for p in positions]
+    results = await asyncio.gather(*(account_fetcher.get_account(key) for key in keys), return_exceptions=True)
+
+    accounts: dict[str, Optional[bytes]] = {}
+    failed: list[str] = []
+    for key, data in zip(keys, results):
+        if isinstance(data, BaseException):
+            failed.append(key)
+        else:
+            accounts[key] = data
+    if failed:
+        logger.warning("refresh_fetch_failed", count=len(failed))
+    return accounts, failed
@@ -10,15 +10,28 @@ import signal
 import sys
 import time
 from pathlib import Path
+from typing import Optional
 
+import numpy as np
 import structlog
 
 from config import get_config, AppConfig
-from protocols import KaminoAdapter, MarginFiAdapter, SolendAdapter, PositionData
-from protocols.base import RiskLevel
+from protocols import (
+    AccountFetcher, KaminoAdapter, MarginFiAdapter, SolendAdapter, PositionData, RPCBatcher, RPCClient, RPCRouter,
+    PriceTracker, PythPriceFeed, StaticPriceFeed,
+)
+from protocols.base import HEALTHY_CODE, RISK_LEVELS, classify_risk_codes
+from analysis_cache import AnalysisCache
 from analyzer import ClaudeAnalyzer, AnalysisResult
+from decision import TieredDecisionEngine
+from scheduler import PriorityScheduler
+from position_store import PositionStore
+from cadence import PollingCadence
 from executor import RebalanceExecutor
+from fetcher import PositionFetcher, refresh_positions, score_positions
+from stream import AccountStream
 from activity_logger import ActivityLogger
+from attestation import AttestationBatcher, MemoAnchor, StubAnchor
 
 # Configure structured logging
 structlog.configure(
@@ -39,31 +52,208 @@ class SolShieldAgent:
         self.dry_run = dry_run
         self.running = False
 
+        # One pooled HTTP/2 transport shared by adapters and executor
+        self.rpc = RPCClient(
+            max_connections=config.solana.rpc_max_connections,
+            max_keepalive_connections=config.solana.rpc_max_keepalive,
+            keepalive_expiry=config.solana.rpc_keepalive_expiry_seconds,
+            http2=config.solana.rpc_http2,
+        )
+
+        # Solana RPC calls go through a router when several endpoints are configured
+        self.router = (
+            RPCRouter(
+                config.solana.rpc_urls,
+                client=self.rpc,
+                hedge_reads=config.solana.rpc_hedge_reads,
+                max_inflight_per_endpoint=config.monitoring.max_inflight_per_endpoint,
+            )
+            if len(config.solana.rpc_urls) > 1
+            else None
+        )
+        solana_client = self.router or self.rpc
+
+        # Optional JSON-RPC batching of concurrent adapter calls
+        self.batcher = (
+            RPCBatcher(
+                config.solana.rpc_url,
+                client=solana_client,
+                window_seconds=config.solana.rpc_batch_window_ms / 1000,
+                max_batch_size=config.solana.rpc_batch_max_size,
+            )
+            if config.solana.rpc_batch_window_ms > 0
+            else None
+        )
+
+        # Shared getMultipleAccounts engine for health-factor refreshes
+        self.account_fetcher = AccountFetcher(config.solana.rpc_url, client=solana_client)
+
+        # Snapshot mode scans each program once per interval instead of per wallet
+        snapshot_max_age = (
+            config.monitoring.check_interval_seconds
+            if config.monitoring.snapshot_mode
+            else None
+        )
+
         # Initialize protocol adapters
         self.adapters = [
-            KaminoAdapter(config.solana.rpc_url, config.solana.helius_api_key),
-            MarginFiAdapter(config.solana.rpc_url),
-            SolendAdapter(config.solana.rpc_url),
+            KaminoAdapter(
+                config.solana.rpc_url,
+                config.solana.helius_api_key,
+                client=solana_client,
+                account_fetcher=self.account_fetcher,
+                snapshot_max_age=snapshot_max_age,
+                batcher=self.batcher,
+            ),
+            MarginFiAdapter(
+                config.solana.rpc_url,
+                client=solana_client,
+                account_fetcher=self.account_fetcher,
+                snapshot_max_age=snapshot_max_age,
+                batcher=self.batcher,
+            ),
+            SolendAdapter(
+                config.solana.rpc_url,
+                client=solana_client,
+                account_fetcher=self.account_fetcher,
+                snapshot_max_age=snapshot_max_age,
+                batcher=self.batcher,
+            ),
         ]
+        self.adapters_by_protocol = {adapter.protocol: adapter for adapter in self.adapters}
+
+        # Optional websocket streaming of tracked accounts
+        self.stream = (
+            AccountStream(config.solana.ws_url, on_update=self._on_stream_update)
+            if config.monitoring.streaming_mode
+            else None
+        )
+        self._stream_task: asyncio.Task | None = None
+
+        # Bounded-concurrency fan-out over wallets × adapters
+        self.fetcher = PositionFetcher(
+            max_inflight=config.monitoring.max_inflight_fetches,
+            timeout_seconds=config.monitoring.adapter_timeout_seconds,
+        )
 
         # Initialize AI analyzer
         self.analyzer = ClaudeAnalyzer(
             api_key=config.ai.anthropic_api_key,
             model=config.ai.model,
+            max_concurrent=config.ai.max_concurrent_analyses,
+            timeout_seconds=config.ai.analysis_timeout_seconds,
+            max_queued=config.ai.max_queued_analyses,
+            batch_size=config.ai.analysis_batch_size,
+            warn=config.monitoring.health_factor_warn,
+            critical=config.monitoring.health_factor_critical,
+            emergency=config.monitoring.health_factor_emergency,
+            cache=(
+                AnalysisCache(
+                    ttl_seconds=config.ai.analysis_cache_ttl_seconds,
+                    max_entries=config.ai.analysis_cache_max_entries,
+                    hf_bucket=config.ai.analysis_cache_hf_bucket,
+                    hf_delta=config.ai.analysis_cache_hf_delta,
+                )
+                if config.ai.analysis_cache_ttl_seconds > 0
+                else None
+            ),
         )
 
-        # Initialize executor
+        # Deterministic rules settle clear-cut cases; only ambiguous ones reach the analyzer
+        self.decisions = TieredDecisionEngine(
+            self.analyzer,
+            warn=config.monitoring.health_factor_warn,
+            critical=config.monitoring.health_factor_critical,
+            emergency=config.monitoring.health_factor_emergency,
+            warn_drift_per_hour=config.monitoring.warn_drift_per_hour,
+        )
+
+        # Initialize executor; its client carries Jupiter and wallet-API
+        # traffic, not Solana JSON-RPC, so it stays on the raw pool
         self.executor = RebalanceExecutor(
             rpc_url=config.solana.rpc_url,
             wallet_api_key=config.wallet.api_key,
             wallet_id=config.wallet.wallet_id,
             dry_run=dry_run,
+            client=self.rpc,
+        )
+
+        # Previous fetch state; only new or changed positions go on to analysis
+        self.position_store = PositionStore(
+            hf_delta=config.monitoring.incremental_hf_delta,
+            value_delta=config.monitoring.incremental_value_delta,
+            max_age_seconds=config.monitoring.incremental_max_age_seconds,
+        )
+
+        # Adaptive mode re-polls each position on its own HF-driven schedule between full fetches
+        self.cadence = (
+            PollingCadence(
+                warn=config.monitoring.health_factor_warn,
+                critical=config.monitoring.health_factor_critical,
+                emergency=config.monitoring.health_factor_emergency,
+            )
+            if config.monitoring.adaptive_polling
+            else None
+        )
+
+        # Price-driven mode recomputes cached health factors when oracle prices move
+        if config.monitoring.price_feed:
+            self.price_tracker: Optional[PriceTracker] = PriceTracker()
+            self.price_feed = (
+                PythPriceFeed(self.account_fetcher, config.monitoring.pyth_oracles)
+                if config.monitoring.price_feed == "pyth"
+                else StaticPriceFeed()
+            )
+        else:
+            self.price_tracker = None
+            self.price_feed = None
+        self._next_price_read = 0.0
+
+        # Urgency-ordered analysis → execution pipeline for each cycle's at-risk positions
+        self.scheduler = PriorityScheduler(
+            analyze=self.decisions.decide,
+            execute=self._handle_at_risk,
+            analysis_workers=config.monitoring.analysis_workers,
+            execution_workers=config.monitoring.execution_workers,
+            batch_size=config.ai.analysis_batch_size,
+        )
+
+        # Merkle-batched on-chain attestation of durable log entries (stubbed in dry runs)
+        self.attestor = (
+            AttestationBatcher(
+                (
+                    MemoAnchor(
+                        config.solana.rpc_url,
+                        config.wallet.address,
+                        self.executor._sign_and_send,
+                        client=solana_client,
+                    )
+                    if config.attestation_mode == "memo" and not dry_run
+                    else StubAnchor()
+                ),
+                log_dir=config.log_dir,
+                agent_name="solshield",
+                window_seconds=config.attestation_window_seconds,
+                max_entries=config.attestation_max_entries,
+            )
+            if config.attestation_mode
+            else None
         )
 
         # Initialize activity logger
         self.activity_logger = ActivityLogger(
             log_dir=config.log_dir,
             agent_name="solshield",
+            flush_interval=config.log_flush_interval_ms / 1000,
+            max_batch=config.log_max_batch,
+            fsync=config.log_fsync,
+            segment_max_entries=config.log_segment_max_entries,
+            segment_max_bytes=config.log_segment_max_mb * 1024 * 1024,
+            recent_entries=config.log_recent_entries,
+            checkpoint_interval=config.log_checkpoint_interval,
+            checkpoint_key=config.log_checkpoint_key,
+            attestor=self.attestor,
+            hash_version=config.log_hash_version,
         )
 
         # Stats
@@ -74,6 +264,8 @@ class SolShieldAgent:
             "rebalances_executed": 0,
             "liquidations_prevented": 0,
             "total_value_protected": 0.0,
+            "last_fetch": {},
+            "last_diff": {},
             "start_time": time.time(),
         }
 
@@ -104,10 +296,16 @@ class SolShieldAgent:
 
         print(self._banner())
 
+        if self.stream is not None:
+            self._stream_task = asyncio.create_task(self.stream.run())
+
         try:
             while self.running:
                 await self._monitoring_cycle()
-                await asyncio.sleep(self.config.monitoring.check_interval_seconds)
+                if self.cadence is None and self.price_feed is None:
+                    await asyncio.sleep(self.config.monitoring.check_interval_seconds)
+                else:
+                    await self._poll_until(time.monotonic() + self.config.monitoring.discovery_interval_seconds)
         except asyncio.CancelledError:
             logger.info("agent_cancelled")
         finally:
@@ -120,70 +318,47 @@ class SolShieldAgent:
 
         logger.info("monitoring_cycle_start", cycle=self.stats["cycles"])
 
-        all_positions: list[PositionData] = []
-
         # 1. Fetch positions from all protocols
-        for wallet in self.watched_wallets:
-            for adapter in self.adapters:
-                try:
-                    positions = await adapter.get_positions(wallet)
-                    all_positions.extend(positions)
-                    protocol_name = await adapter.get_protocol_name()
-                    if positions:
-                        logger.info(
-                            "positions_found",
-                            protocol=protocol_name,
-                            wallet=wallet[:8] + "...",
-                            count=len(positions),
-                        )
-                except Exception as e:
-                    logger.error("adapter_error", error=str(e))
+        await self._refresh_snapshots()
+        all_positions, fetch_stats = await self.fetcher.fetch_all(
+            self.watched_wallets, self.adapters
+        )
+        self.stats["last_fetch"] = fetch_stats.to_dict()
 
         self.stats["positions_monitored"] = len(all_positions)
 
+        if self.stream is not None:
+            await self._track_streamed(all_positions)
+
         if not all_positions:
             logger.info("no_positions_found", wallets=len(self.watched_wallets))
             return
 
-        # 2. Analyze positions that need attention
-        at_risk = [
-            p for p in all_positions
-            if p.risk_level in (RiskLevel.WARNING, RiskLevel.CRITICAL, RiskLevel.EMERGENCY)
-        ]
+        # 2. Analyze positions that need attention — only those new or changed since last reported
+        diff = self.position_store.apply(all_positions)
+        self.stats["last_diff"] = diff.to_dict()
+        at_risk = self._select_at_risk(diff.dirty)
+        if self.cadence is not None:
+            for position in all_positions:
+                self.cadence.observe(position.obligation_key, position.health_factor)
+            for key in diff.removed:
+                self.cadence.forget(key)
+        if self.price_tracker is not None:
+            for position in all_positions:
+                self.price_tracker.track(position)
+            for key in diff.removed:
+                self.price_tracker.untrack(key)
+        if self.stream is not None:
+            for key in diff.removed:
+                await self.stream.untrack(key)
+        for key in diff.removed:
+            self.decisions.forget(key)
 
         if at_risk:
             logger.warning("at_risk_positions", count=len(at_risk))
 
-        for position in at_risk:
-            # 3. AI Analysis
-            analysis = await self.analyzer.analyze_position(position)
-            self.stats["analyses_performed"] += 1
-
-            await self.activity_logger.log_activity(
-                action="risk_analysis",
-                details=analysis.to_dict(),
-            )
-
-            # 4. Execute rebalance if needed
-            if analysis.needs_action and analysis.confidence >= 0.7:
-                result = await self.executor.execute_rebalance(position, analysis)
-
-                if result.success:
-                    self.stats["rebalances_executed"] += 1
-                    self.stats["liquidations_prevented"] += 1
-                    self.stats["total_value_protected"] += position.total_collateral_usd
-
-                    logger.info(
-                        "rebalance_executed",
-                        strategy=result.strategy.value,
-                        amount=result.amount_usd,
-                        tx=result.tx_signature,
-                    )
-
-                await self.activity_logger.log_activity(
-                    action="rebalance_execution",
-                    details=result.to_dict(),
-                )
+        # Most urgent first through the analysis and execution worker pools
+        await self.scheduler.run(at_risk)
 
         # Log cycle summary
         cycle_duration = time.time() - cycle_start
@@ -192,9 +367,177 @@ class SolShieldAgent:
             cycle=self.stats["cycles"],
             positions=len(all_positions),
             at_risk=len(at_risk),
+            diff=self.stats["last_diff"],
             duration_s=f"{cycle_duration:.2f}",
+            fetch=self.stats["last_fetch"],
+        )
+
+    async def _handle_at_risk(self, position: PositionData, analysis: Optional[AnalysisResult] = None):
+        """Analyze an at-risk position (unless already analyzed) and execute a rebalance if warranted"""
+        # 3. AI Analysis
+        if analysis is None:
+            analysis = (await self.decisions.decide([position]))[0]
+        self.stats["analyses_performed"] += 1
+
+        await self.activity_logger.log_activity(
+            action="risk_analysis",
+            details=analysis.to_dict(),
         )
 
+        # 4. Execute rebalance if needed
+        if analysis.needs_action and analysis.confidence >= 0.7:
+            result = await self.executor.execute_rebalance(position, analysis)
+
+            if result.success:
+                self.stats["rebalances_executed"] += 1
+                self.stats["liquidations_prevented"] += 1
+                self.stats["total_value_protected"] += position.total_collateral_usd
+
+                logger.info(
+                    "rebalance_executed",
+                    strategy=result.strategy.value,
+                    amount=result.amount_usd,
+                    tx=result.tx_signature,
+                )
+
+            await self.activity_logger.log_activity(
+                action="rebalance_execution",
+                details=result.to_dict(),
+            )
+
+    async def _poll_until(self, deadline: float):
+        """Run adaptive position checks and price reads until the next full fetch is due"""
+        while self.running:
+            now = time.monotonic()
+            if now >= deadline:
+                return
+            wake = deadline
+            if self.cadence is not None:
+                wake = min(wake, self.cadence.next_due())
+            if self.price_feed is not None:
+                wake = min(wake, self._next_price_read)
+            await asyncio.sleep(max(0.0, wake - now))
+
+            if self.price_feed is not None and time.monotonic() >= self._next_price_read:
+                self._next_price_read = time.monotonic() + self.config.monitoring.price_poll_seconds
+                await self._reprice()
+            if self.cadence is not None:
+                await self._poll_due()
+
+    async def _reprice(self):
+        """Recompute health factors of cached positions whose asset prices moved"""
+        try:
+            prices = await self.price_feed.read()
+        except Exception as e:
+            logger.error("price_feed_error", error=str(e))
+            return
+
+        monitoring = self.config.monitoring
+        table = self.position_store.table
+        repriced = []
+        for key in self.price_tracker.update(prices):
+            if key not in table:
+                continue
+            position = self.price_tracker.reprice(table[key].to_position())
+            position.risk_level = RISK_LEVELS[classify_risk_codes(
+                [position.health_factor],
+                warn=monitoring.health_factor_warn,
+                critical=monitoring.health_factor_critical,
+                emergency=monitoring.health_factor_emergency,
+            )[0]]
+            position.timestamp = time.time()
+            if self.cadence is not None:
+                self.cadence.observe(key, position.health_factor)
+            repriced.append(position)
+
+        diff = self.position_store.apply(repriced, complete=False)
+        await self.scheduler.run(self._select_at_risk(diff.dirty))
+
+    async def _poll_due(self):
+        """Re-read positions whose next check has arrived"""
+        table = self.position_store.table
+        positions = [table[key].to_position() for key in self.cadence.due() if key in table]
+        if not positions:
+            return
+
+        refreshed, failed = await refresh_positions(self.account_fetcher, self.adapters_by_protocol, positions)
+        for key in failed:
+            # The read failed, not the account — try again on the position's current tier
+            self.cadence.retry(key)
+        polled = []
+        for position in refreshed.values():
+            if position is None:
+                # Account missing — left for the next full fetch to confirm
+                continue
+            self.cadence.observe(position.obligation_key, position.health_factor)
+            if self.price_tracker is not None:
+                self.price_tracker.track(position)
+            polled.append(position)
+
+        diff = self.position_store.apply(polled, complete=False)
+        await self.scheduler.run(self._select_at_risk(diff.dirty))
+
+    async def _on_stream_update(self, position: PositionData):
+        """Handle a streamed account change without waiting for the next cycle"""
+        logger.debug(
+            "stream_position_update",
+            position=position.obligation_key[:16],
+            health_factor=position.health_factor,
+            risk=position.risk_level.value,
+        )
+        self.position_store.mark(position)
+        if self.cadence is not None:
+            self.cadence.observe(position.obligation_key, position.health_factor)
+        if self.price_tracker is not None:
+            self.price_tracker.track(position)
+        # Through the scheduler so a position the cycle is already handling isn't executed twice
+        await self.scheduler.run(self._select_at_risk([position]))
+
+    def _select_at_risk(self, positions: list[PositionData]) -> list[PositionData]:
+        """Classify all positions in one vectorized pass against the configured thresholds
+
+        Only positions below the warn threshold are picked out (and have
+        their risk level set); healthy ones are never touched.
+        """
+        monitoring = self.config.monitoring
+        health_factors = np.fromiter(
+            (p.health_factor for p in positions), dtype=np.float64, count=len(positions)
+        )
+        codes = classify_risk_codes(
+            health_factors,
+            warn=monitoring.health_factor_warn,
+            critical=monitoring.health_factor_critical,
+            emergency=monitoring.health_factor_emergency,
+        )
+
+        at_risk = []
+        for i in np.flatnonzero(codes < HEALTHY_CODE):
+            position = positions[i]
+            position.risk_level = RISK_LEVELS[codes[i]]
+            at_risk.append(position)
+        return at_risk
+
+    async def _track_streamed(self, positions: list[PositionData]):
+        """Subscribe to every position found by polling"""
+        for position in positions:
+            await self.stream.track(position, self.adapters_by_protocol[position.protocol])
+
+    async def _refresh_snapshots(self):
+        """Scan each program once up front so wallet lookups hit the index"""
+        await asyncio.gather(*(
+            a.snapshot.refresh_if_stale() for a in self.adapters if a.snapshot is not None
+        ))
+
+    async def refresh_health_factors(self, positions: list[PositionData]) -> dict[str, float]:
+        """Re-read health factors for known positions in batched round trips
+
+        Accounts are scored in one vectorized pass per protocol, with the
+        same result as a full parse; missing accounts score 0.0 and
+        accounts whose fetch failed are left out.
+        """
+        health_factors, _ = await score_positions(self.account_fetcher, positions)
+        return health_factors
+
     async def add_wallet(self, wallet_address: str):
         """Add a wallet to monitor"""
         if wallet_address not in self.watched_wallets:
@@ -214,6 +557,19 @@ class SolShieldAgent:
             **self.stats,
             "uptime_seconds": uptime,
             "uptime_human": f"{uptime/3600:.1f}h",
+            "rpc": self.rpc.get_metrics(),
+            "rpc_router": self.router.get_metrics() if self.router else {},
+            "analyzer": self.analyzer.get_stats(),
+            "decision_tiers": self.decisions.get_stats(),
+            "scheduler": self.scheduler.get_stats(),
+            "polling": self.cadence.get_stats() if self.cadence else {},
+            "attestation": self.attestor.get_stats() if self.attestor else {},
+            "prices": (
+                {**self.price_tracker.stats, "tracked": len(self.price_tracker)}
+                if self.price_tracker
+                else {}
+            ),
+            "analysis_cache": self.analyzer.cache.get_stats() if self.analyzer.cache else {},
         }
 
     async def shutdown(self):
@@ -225,10 +581,22 @@ class SolShieldAgent:
             action="agent_shutdown",
             details=self.get_stats(),
         )
+        await self.activity_logger.close()
+        if self.attestor is not None:
+            await self.attestor.close()
+
+        if self.stream is not None:
+            await self.stream.stop()
+        if self._stream_task is not None:
+            self._stream_task.cancel()
 
         for adapter in self.adapters:
             await adapter.close()
+        await self.account_fetcher.close()
+        if self.batcher is not None:
+            await self.batcher.close()
         await self.executor.close()
+        await self.rpc.aclose()
 
     def _banner(self) -> str:
         return """
@@ -0,0 +1,112 @@
+"""Position Store — incremental per-obligation state that diffs each fetch"""
+from dataclasses import dataclass, field
+
+import structlog
+
+from protocols.base import PositionData
+from protocols.table import PositionTable
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class PositionDiff:
+    """What changed between a fetch and the stored state"""
+    added: list[PositionData] = field(default_factory=list)
+    changed: list[PositionData] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def dirty(self) -> list[PositionData]:
+        """Positions that need analysis: new or materially changed"""
+        return self.added + self.changed
+
+    def to_dict(self) -> dict:
+        return {
+            "added": len(self.added),
+            "changed": len(self.changed),
+            "removed": len(self.removed),
+            "unchanged": self.unchanged,
+        }
+
+
+class PositionStore:
+    """
+    Last-reported state of every monitored obligation.
+
+    `apply()` diffs a full fetch against the store: a position is reported
+    (and its stored row replaced) only when it is new, its health factor
+    moved more than `hf_delta`, its risk level or asset set changed, its
+    collateral or debt value moved more than `value_delta` (relative), or
+    it hasn't been reported for `max_age_seconds`. Everything else keeps
+    its stored baseline, so slow drift accumulates until it crosses a
+    threshold, and steady-state cycles report nothing.
+    """
+
+    def __init__(
+        self,
+        hf_delta: float = 0.02,
+        value_delta: float = 0.05,
+        max_age_seconds: float = 300.0,
+    ):
+        self.hf_delta = hf_delta
+        self.value_delta = value_delta
+        self.max_age_seconds = max_age_seconds
+        self.table = PositionTable()
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def apply(self, positions: list[PositionData], complete: bool = True) -> PositionDiff:
+        """Diff a fetch against the store
+
+        A complete fetch drops stored positions missing from it; a partial
+        one (e.g. re-polling a few due positions) leaves the rest alone.
+        """
+        diff = PositionDiff()
+        seen = set()
+        for position in positions:
+            seen.add(position.obligation_key)
+            stored = self.table.get(position.obligation_key)
+            if stored is None:
+                diff.added.append(position)
+            elif self._changed(stored, position):
+                diff.changed.append(position)
+            else:
+                diff.unchanged += 1
+                continue
+            self.table.upsert(position)
+
+        for key in self.table.keys() if complete else ():
+            if key not in seen:
+                self.table.remove(key)
+                diff.removed.append(key)
+
+        logger.debug("position_diff", **diff.to_dict())
+        return diff
+
+    def mark(self, position: PositionData):
+        """Record a position handled outside a full fetch (e.g. a streamed update)"""
+        self.table.upsert(position)
+
+    def _changed(self, stored, position: PositionData) -> bool:
+        if abs(position.health_factor - stored.health_factor) > self.hf_delta:
+            return True
+        if position.risk_level != stored.risk_level:
+            return True
+        if position.timestamp - stored.timestamp > self.max_age_seconds:
+            return True
+        if not self._close(stored.total_collateral_usd, position.total_collateral_usd):
+            return True
+        if not self._close(stored.total_debt_usd, position.total_debt_usd):
+            return True
+        return _asset_mints(position) != stored.asset_mints
+
+    def _close(self, before: float, after: float) -> bool:
+        return abs(after - before) <= self.value_delta * max(abs(before), 1e-9)
+
+
+def _asset_mints(position: PositionData) -> tuple:
+    """Mints of the position's collaterals and debts, in order"""
+    return tuple(c.mint for c in position.collaterals) + tuple(d.mint for d in position.debts)
@@ -1,13 +1,31 @@
 """Solana DeFi Protocol Adapters"""
+from .accounts import AccountFetcher
 from .base import ProtocolAdapter, PositionData
 from .kamino import KaminoAdapter
 from .marginfi import MarginFiAdapter
+from .prices import PriceFeed, PriceTracker, PythPriceFeed, StaticPriceFeed
+from .router import RPCRouter
+from .rpc import RPCBatcher, RPCClient
+from .scoring import HealthScores, score_accounts
 from .solend import SolendAdapter
+from .table import PositionTable, PositionView
 
 __all__ = [
+    "AccountFetcher",
     "ProtocolAdapter",
     "PositionData",
     "KaminoAdapter",
     "MarginFiAdapter",
     "SolendAdapter",
+    "RPCClient",
+    "RPCBatcher",
+    "RPCRouter",
+    "HealthScores",
+    "score_accounts",
+    "PositionTable",
+    "PositionView",
+    "PriceFeed",
+    "PriceTracker",
+    "PythPriceFeed",
+    "StaticPriceFeed",
 ]
@@ -0,0 +1,164 @@
+"""Batched account fetch engine — coalesces getAccountInfo into getMultipleAccounts"""
+import asyncio
+import base64
+import time
+from typing import Optional
+
+import httpx
+import structlog
+
+from .rpc import RPCClient
+
+logger = structlog.get_logger()
+
+# Solana RPC limit for getMultipleAccounts
+MAX_KEYS_PER_REQUEST = 100
+
+
+class AccountFetcher:
+    """
+    Shared account-fetch engine for all protocol adapters.
+
+    Callers ask for single accounts; pending keys are grouped into
+    getMultipleAccounts requests of up to `max_keys` each. A key that is
+    already in flight or already fetched in the current cycle is never
+    requested twice — every caller waiting on it gets the same result.
+
+    A cycle ends at `start_cycle()` or, for readers that never call it,
+    after `cache_ttl` seconds; at most `max_cached` results are kept.
+    """
+
+    def __init__(
+        self,
+        rpc_url: str,
+        client: Optional[RPCClient] = None,
+        max_keys: int = MAX_KEYS_PER_REQUEST,
+        window_seconds: float = 0.005,
+        cache_ttl: float = 1.0,
+        max_cached: int = 4096,
+    ):
+        self.rpc_url = rpc_url
+        self.client = client or httpx.AsyncClient(timeout=30)
+        self._owns_client = client is None
+        self.max_keys = min(max_keys, MAX_KEYS_PER_REQUEST)
+        self.window_seconds = window_seconds
+        self.cache_ttl = cache_ttl
+        self.max_cached = max_cached
+
+        self._queue: list[str] = []
+        self._pending: dict[str, asyncio.Future] = {}
+        self._cycle_cache: dict[str, tuple[float, Optional[bytes]]] = {}  # key → (fetched_at, data)
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+        self.stats = {
+            "keys_requested": 0,
+            "keys_deduplicated": 0,
+            "rpc_requests": 0,
+        }
+
+    def start_cycle(self):
+        """Forget results from the previous cycle so keys are re-read"""
+        self._cycle_cache.clear()
+
+    async def get_account(self, account_key: str) -> Optional[bytes]:
+        """Fetch raw account data, batched with other concurrent callers"""
+        self.stats["keys_requested"] += 1
+
+        cached = self._cycle_cache.get(account_key)
+        if cached is not None:
+            fetched_at, data = cached
+            if time.monotonic() - fetched_at < self.cache_ttl:
+                self.stats["keys_deduplicated"] += 1
+                return data
+            del self._cycle_cache[account_key]
+
+        future = self._pending.get(account_key)
+        if future is not None:
+            self.stats["keys_deduplicated"] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[account_key] = future
+        self._queue.append(account_key)
+        self._schedule_flush()
+        return await asyncio.shield(future)
+
+    async def get_accounts(self, account_keys: list[str]) -> dict[str, Optional[bytes]]:
+        """Fetch many accounts at once; result is keyed by account key"""
+        results = await asyncio.gather(
+            *(self.get_account(key) for key in account_keys),
+            return_exceptions=True,
+        )
+        return {
+            key: (None if isinstance(data, BaseException) else data)
+            for key, data in zip(account_keys, results)
+        }
+
+    def _schedule_flush(self):
+        if len(self._queue) >= self.max_keys:
+            self._flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.window_seconds, self._flush)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        while self._queue:
+            chunk = self._queue[:self.max_keys]
+            del self._queue[:self.max_keys]
+            task = asyncio.get_running_loop().create_task(self._fetch_chunk(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch_chunk(self, keys: list[str]):
+        """Send one getMultipleAccounts request and resolve its waiters"""
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getMultipleAccounts",
+            "params": [keys, {"encoding": "base64"}],
+        }
+
+        try:
+            self.stats["rpc_requests"] += 1
+            response = await self.client.post(self.rpc_url, json=payload)
+            result = response.json()
+            if "error" in result:
+                raise RuntimeError(f"RPC error: {result['error']}")
+            values = result.get("result", {}).get("value") or []
+
+            fetched_at = time.monotonic()
+            for i, key in enumerate(keys):
+                value = values[i] if i < len(values) else None
+                data = base64.b64decode(value["data"][0]) if value else None
+                self._cache(key, fetched_at, data)
+                self._resolve(key, data)
+
+        except Exception as e:
+            logger.error("account_batch_error", keys=len(keys), error=str(e))
+            for key in keys:
+                future = self._pending.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+
+    def _cache(self, key: str, fetched_at: float, data: Optional[bytes]):
+        self._cycle_cache.pop(key, None)
+        self._cycle_cache[key] = (fetched_at, data)
+        while len(self._cycle_cache) > self.max_cached:
+            # Dicts keep insertion order: the first key is the oldest fetch
+            del self._cycle_cache[next(iter(self._cycle_cache))]
+
+    def _resolve(self, key: str, data: Optional[bytes]):
+        future = self._pending.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(data)
+
+    async def close(self):
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._owns_client:
+            await self.client.aclose()
@@ -5,6 +5,8 @@ from enum import Enum
 from typing import Optional
 import time
 
+import numpy as np
+
 
 class Protocol(str, Enum):
     KAMINO = "kamino"
@@ -19,7 +21,18 @@ class RiskLevel(str, Enum):
     EMERGENCY = "emergency"
 
 
-@dataclass
+# Bulk risk codes index this tuple, riskiest first (see classify_risk_codes)
+RISK_LEVELS = (RiskLevel.EMERGENCY, RiskLevel.CRITICAL, RiskLevel.WARNING, RiskLevel.HEALTHY)
+HEALTHY_CODE = RISK_LEVELS.index(RiskLevel.HEALTHY)
+
+
+def classify_risk_codes(health_factors, warn: float = 1.5, critical: float = 1.2, emergency: float = 1.05) -> np.ndarray:
+    """Bulk ProtocolAdapter.classify_risk: int8 codes into RISK_LEVELS, one per health factor"""
+    thresholds = [emergency, critical, warn]
+    return np.digitize(np.asarray(health_factors, dtype=np.float64), thresholds).astype(np.int8)
+
+
+@dataclass(slots=True)
 class CollateralPosition:
     """Individual collateral asset in a position"""
     mint: str
@@ -28,9 +41,10 @@ class CollateralPosition:
     value_usd: float
     ltv: float  # Loan-to-value ratio
     liquidation_threshold: float
+    reserve: str = ""  # Reserve/bank account holding the asset (base58)
 
 
-@dataclass
+@dataclass(slots=True)
 class DebtPosition:
     """Individual debt asset in a position"""
     mint: str
@@ -38,9 +52,10 @@ class DebtPosition:
     amount: float
     value_usd: float
     borrow_rate_apy: float
+    reserve: str = ""  # Reserve/bank account holding the asset (base58)
 
 
-@dataclass
+@dataclass(slots=True)
 class PositionData:
     """Unified position data across all protocols"""
     protocol: Protocol
@@ -79,6 +94,9 @@ class PositionData:
 class ProtocolAdapter(ABC):
     """Base class for DeFi protocol adapters"""
 
+    # Set by adapters that share an RPCBatcher (see protocols.rpc)
+    batcher = None
+
     @abstractmethod
     async def get_positions(self, wallet_address: str) -> list[PositionData]:
         """Fetch all positions for a wallet on this protocol"""
@@ -94,6 +112,18 @@ class ProtocolAdapter(ABC):
         """Return the protocol name"""
         ...
 
+    @abstractmethod
+    async def parse_account(self, owner: str, account: dict) -> Optional[PositionData]:
+        """Parse a raw {"pubkey", "account"} RPC entry into PositionData"""
+        ...
+
+    async def _rpc_request(self, payload: dict) -> dict:
+        """Send a JSON-RPC payload, through the batcher when one is configured"""
+        if self.batcher is not None:
+            return await self.batcher.call(payload["method"], payload["params"])
+        response = await self.client.post(self.rpc_url, json=payload)
+        return response.json()
+
     def classify_risk(self, health_factor: float, warn: float = 1.5, critical: float = 1.2, emergency: float = 1.05) -> RiskLevel:
         """Classify risk level based on health factor"""
         if health_factor < emergency:
@@ -1,19 +1,28 @@
 """Kamino Lending Protocol Adapter for Solana"""
-import struct
+import base64
 from typing import Optional
 import httpx
 import structlog
+from solders.pubkey import Pubkey
 
+from .accounts import AccountFetcher
 from .base import (
     ProtocolAdapter, PositionData, CollateralPosition,
     DebtPosition, Protocol, RiskLevel,
 )
+from .layouts import decode_kamino_obligation, decode_kamino_totals
+from .rpc import RPCBatcher, RPCClient
+from .snapshot import ProgramSnapshot
 
 logger = structlog.get_logger()
 
 # Kamino Lending program ID
 KAMINO_LENDING_PROGRAM = "KLend2g3cP87ber41GRRLYPqxQ1p57Y5MR8D68Lds"
 
+# Obligation account size and owner field offset
+OBLIGATION_SIZE = 1300
+OBLIGATION_OWNER_OFFSET = 8
+
 # Known token mints (devnet/mainnet)
 TOKEN_INFO = {
     "So11111111111111111111111111111111111111112": {"symbol": "SOL", "decimals": 9},
@@ -27,10 +36,31 @@ TOKEN_INFO = {
 class KaminoAdapter(ProtocolAdapter):
     """Adapter for Kamino Lending (KLend) protocol on Solana"""
 
-    def __init__(self, rpc_url: str, helius_api_key: Optional[str] = None):
+    protocol = Protocol.KAMINO
+
+    def __init__(
+        self,
+        rpc_url: str,
+        helius_api_key: Optional[str] = None,
+        client: Optional[RPCClient] = None,
+        account_fetcher: Optional[AccountFetcher] = None,
+        snapshot_max_age: Optional[float] = None,
+        batcher: Optional[RPCBatcher] = None,
+    ):
         self.rpc_url = rpc_url
         self.helius_api_key = helius_api_key
-        self.client = httpx.AsyncClient(timeout=30)
+        self.account_fetcher = account_fetcher
+        self.client = client or httpx.AsyncClient(timeout=30)
+        self._owns_client = client is None
+        self.batcher = batcher
+        self.snapshot = (
+            ProgramSnapshot(
+                self.client, rpc_url, KAMINO_LENDING_PROGRAM,
+                OBLIGATION_SIZE, OBLIGATION_OWNER_OFFSET, snapshot_max_age,
+            )
+            if snapshot_max_age
+            else None
+        )
 
     async def get_protocol_name(self) -> str:
         return "Kamino Lending"
@@ -65,6 +95,9 @@ class KaminoAdapter(ProtocolAdapter):
 
     async def _get_obligation_accounts(self, wallet_address: str) -> list[dict]:
         """Query Kamino obligation accounts for a wallet using getProgramAccounts"""
+        if self.snapshot is not None:
+            return await self.snapshot.accounts_for(wallet_address)
+
         payload = {
             "jsonrpc": "2.0",
             "id": 1,
@@ -74,10 +107,10 @@ class KaminoAdapter(ProtocolAdapter):
                 {
                     "encoding": "base64",
                     "filters": [
-                        {"dataSize": 1300},  # Obligation account size
+                        {"dataSize": OBLIGATION_SIZE},
                         {
                             "memcmp": {
-                                "offset": 8,  # Owner field offset
+                                "offset": OBLIGATION_OWNER_OFFSET,
                                 "bytes": wallet_address,
                             }
                         },
@@ -86,15 +119,20 @@ class KaminoAdapter(ProtocolAdapter):
             ],
         }
 
-        response = await self.client.post(self.rpc_url, json=payload)
-        result = response.json()
+        result = await self._rpc_request(payload)
 
         if "result" in result:
             return result["result"]
         return []
 
+    async def parse_account(self, owner: str, account: dict) -> Optional[PositionData]:
+        return await self._parse_obligation(owner, account)
+
     async def _get_account_data(self, account_key: str) -> Optional[bytes]:
         """Fetch raw account data"""
+        if self.account_fetcher is not None:
+            return await self.account_fetcher.get_account(account_key)
+
         payload = {
             "jsonrpc": "2.0",
             "id": 1,
@@ -105,11 +143,9 @@ class KaminoAdapter(ProtocolAdapter):
             ],
         }
 
-        response = await self.client.post(self.rpc_url, json=payload)
-        result = response.json()
+        result = await self._rpc_request(payload)
 
         if result.get("result", {}).get("value"):
-            import base64
             data = result["result"]["value"]["data"][0]
             return base64.b64decode(data)
         return None
@@ -119,7 +155,6 @@ class KaminoAdapter(ProtocolAdapter):
     ) -> Optional[PositionData]:
         """Parse a Kamino obligation account into PositionData"""
         try:
-            import base64
             pubkey = obligation_account["pubkey"]
             data = base64.b64decode(obligation_account["account"]["data"][0])
 
@@ -133,53 +168,36 @@ class KaminoAdapter(ProtocolAdapter):
             collaterals = []
             debts = []
 
-            # Parse deposit reserves (collateral)
-            # Each deposit: [32 bytes reserve][8 bytes deposited_amount][8 bytes market_value]
-            num_deposits = struct.unpack_from("<B", data, 72)[0] if len(data) > 72 else 0
-            offset = 73
-
-            for i in range(min(num_deposits, 8)):
-                if offset + 48 > len(data):
-                    break
-                reserve_key = base64.b64encode(data[offset:offset + 32]).decode()
-                deposited = struct.unpack_from("<Q", data, offset + 32)[0]
-                market_value = struct.unpack_from("<Q", data, offset + 40)[0]
+            deposits, borrows = decode_kamino_obligation(data)
 
+            # Deposit reserves (collateral)
+            for i, (reserve, deposited, market_value) in enumerate(deposits):
                 value_usd = market_value / 1e6  # 6 decimal USD
                 total_collateral += value_usd
 
                 collaterals.append(CollateralPosition(
-                    mint=reserve_key[:8] + "...",
+                    mint=base64.b64encode(reserve).decode()[:8] + "...",
+                    reserve=str(Pubkey.from_bytes(bytes(reserve))),
                     symbol=f"COLLATERAL_{i}",
                     amount=deposited / 1e9,
                     value_usd=value_usd,
                     ltv=0.75,  # Default LTV
                     liquidation_threshold=0.85,
                 ))
-                offset += 48
-
-            # Parse borrow reserves (debt)
-            num_borrows = struct.unpack_from("<B", data, offset)[0] if offset < len(data) else 0
-            offset += 1
-
-            for i in range(min(num_borrows, 8)):
-                if offset + 48 > len(data):
-                    break
-                reserve_key = base64.b64encode(data[offset:offset + 32]).decode()
-                borrowed = struct.unpack_from("<Q", data, offset + 32)[0]
-                market_value = struct.unpack_from("<Q", data, offset + 40)[0]
 
+            # Borrow reserves (debt)
+            for i, (reserve, borrowed, market_value) in enumerate(borrows):
                 value_usd = market_value / 1e6
                 total_debt += value_usd
 
                 debts.append(DebtPosition(
-                    mint=reserve_key[:8] + "...",
+                    mint=base64.b64encode(reserve).decode()[:8] + "...",
+                    reserve=str(Pubkey.from_bytes(bytes(reserve))),
                     symbol=f"DEBT_{i}",
                     amount=borrowed / 1e9,
                     value_usd=value_usd,
                     borrow_rate_apy=0.05,
                 ))
-                offset += 48
 
             # Calculate health factor
             health_factor = (
@@ -216,8 +234,9 @@ class KaminoAdapter(ProtocolAdapter):
 
             # These offsets are simplified — real implementation would use
             # the full Kamino IDL for precise deserialization
-            total_collateral = struct.unpack_from("<Q", account_data, 80)[0] / 1e6
-            total_debt = struct.unpack_from("<Q", account_data, 96)[0] / 1e6
+            raw_collateral, raw_debt = decode_kamino_totals(account_data)
+            total_collateral = raw_collateral / 1e6
+            total_debt = raw_debt / 1e6
 
             if total_debt == 0:
                 return float("inf")
@@ -228,4 +247,5 @@ class KaminoAdapter(ProtocolAdapter):
             return 0.0
 
     async def close(self):
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
@@ -0,0 +1,134 @@
+"""Precompiled account layouts — struct.Struct decoders over memoryviews
+
+Format strings are compiled once at import and applied directly to a
+memoryview of the base64-decoded account, so decoding an obligation does
+no per-field format parsing and no intermediate bytes copies.
+"""
+import struct
+from typing import Optional, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# ── Kamino obligation ────────────────────────────────────────────────
+# [8 discriminator][32 owner][32 lending_market][u8 deposits_len]
+# [deposit entries...][u8 borrows_len][borrow entries...]
+KAMINO_DEPOSITS_LEN_OFFSET = 72
+KAMINO_MAX_ENTRIES = 8
+# Each entry: [32 reserve][u64 amount][u64 market_value]
+KAMINO_ENTRY = struct.Struct("<32sQQ")
+# Simplified totals used by the health-factor fast path
+KAMINO_TOTALS = struct.Struct("<Q8xQ")
+KAMINO_TOTALS_OFFSET = 80
+
+# ── MarginFi account ─────────────────────────────────────────────────
+# [8 discriminator][32 group][32 authority][balances...]
+MARGINFI_BALANCES_OFFSET = 72
+MARGINFI_MAX_BALANCES = 16
+# Each balance: [u8 active][32 bank_pk][u128 asset_shares][u128 liability_shares]
+MARGINFI_BALANCE = struct.Struct("<B32sQQQQ")
+
+# ── Solend obligation (agent layout) ─────────────────────────────────
+SOLEND_VALUES_OFFSET = 66
+# [u128 deposited_value][u128 borrowed_value] as lo/hi u64 pairs
+SOLEND_VALUES = struct.Struct("<QQQQ")
+# Low u64 words only, used by the health-factor fast path
+SOLEND_TOTALS = struct.Struct("<Q8xQ")
+SOLEND_DEPOSITS_LEN_OFFSET = 130
+SOLEND_MAX_DEPOSITS = 10
+# Each deposit: [32 reserve][u64 deposited_amount][u64 market_value][8 padding]
+SOLEND_DEPOSIT = struct.Struct("<32sQQ8x")
+
+# ── Pyth price account (legacy push oracle) ──────────────────────────
+# [u32 magic][u32 version][u32 type][u32 size][u32 price_type][i32 exponent]...
+# [aggregate @208: i64 price][u64 confidence][u32 status]
+PYTH_MAGIC = 0xA1B2C3D4
+PYTH_MAGIC_FIELD = struct.Struct("<I")
+PYTH_EXPONENT = struct.Struct("<i")
+PYTH_EXPONENT_OFFSET = 20
+PYTH_AGGREGATE = struct.Struct("<qQI")
+PYTH_AGGREGATE_OFFSET = 208
+PYTH_STATUS_TRADING = 1
+
+
+def _entries(view: memoryview, offset: int, entry: struct.Struct, count: int, limit: int):
+    """Unpack up to `count` (capped at `limit`) fixed-size entries that fit in the buffer"""
+    fit = max(0, (len(view) - offset) // entry.size)
+    n = min(count, limit, fit)
+    return list(entry.iter_unpack(view[offset:offset + n * entry.size])), offset + n * entry.size
+
+
+def decode_kamino_obligation(data: Buffer) -> tuple[list[tuple], list[tuple]]:
+    """Return (deposits, borrows) as (reserve, amount, market_value) tuples"""
+    view = memoryview(data)
+    if len(view) <= KAMINO_DEPOSITS_LEN_OFFSET:
+        return [], []
+
+    deposits, offset = _entries(
+        view, KAMINO_DEPOSITS_LEN_OFFSET + 1, KAMINO_ENTRY,
+        view[KAMINO_DEPOSITS_LEN_OFFSET], KAMINO_MAX_ENTRIES,
+    )
+    if offset >= len(view):
+        return deposits, []
+
+    borrows, _ = _entries(view, offset + 1, KAMINO_ENTRY, view[offset], KAMINO_MAX_ENTRIES)
+    return deposits, borrows
+
+
+def decode_kamino_totals(data: Buffer) -> tuple[int, int]:
+    """Return raw (total_collateral, total_debt) from the simplified totals slots"""
+    return KAMINO_TOTALS.unpack_from(data, KAMINO_TOTALS_OFFSET)
+
+
+def decode_marginfi_balances(data: Buffer) -> list[tuple[int, bytes, int, int, int, int]]:
+    """Return (index, bank_pk, asset_lo, asset_hi, liability_lo, liability_hi) for active balances"""
+    view = memoryview(data)
+    balances, _ = _entries(
+        view, MARGINFI_BALANCES_OFFSET, MARGINFI_BALANCE,
+        MARGINFI_MAX_BALANCES, MARGINFI_MAX_BALANCES,
+    )
+    return [
+        (i, bank_pk, asset_lo, asset_hi, liability_lo, liability_hi)
+        for i, (active, bank_pk, asset_lo, asset_hi, liability_lo, liability_hi) in enumerate(balances)
+        if active
+    ]
+
+
+def decode_solend_values(data: Buffer) -> tuple[int, int]:
+    """Return raw u128 (deposited_value, borrowed_value), 0 where the buffer is short"""
+    if len(data) >= SOLEND_VALUES_OFFSET + SOLEND_VALUES.size:
+        dep_lo, dep_hi, bor_lo, bor_hi = SOLEND_VALUES.unpack_from(data, SOLEND_VALUES_OFFSET)
+        return (dep_hi << 64) | dep_lo, (bor_hi << 64) | bor_lo
+    if len(data) >= SOLEND_VALUES_OFFSET + 16:
+        dep_lo, dep_hi = struct.unpack_from("<QQ", data, SOLEND_VALUES_OFFSET)
+        return (dep_hi << 64) | dep_lo, 0
+    return 0, 0
+
+
+def decode_solend_totals(data: Buffer) -> tuple[int, int]:
+    """Return the low u64 words of (deposited_value, borrowed_value)"""
+    return SOLEND_TOTALS.unpack_from(data, SOLEND_VALUES_OFFSET)
+
+
+def decode_solend_deposits(data: Buffer) -> list[tuple[bytes, int, int]]:
+    """Return (reserve, deposited_amount, market_value) per deposit entry"""
+    view = memoryview(data)
+    if len(view) <= SOLEND_DEPOSITS_LEN_OFFSET:
+        return []
+    deposits, _ = _entries(
+        view, SOLEND_DEPOSITS_LEN_OFFSET + 1, SOLEND_DEPOSIT,
+        view[SOLEND_DEPOSITS_LEN_OFFSET], SOLEND_MAX_DEPOSITS,
+    )
+    return deposits
+
+
+def decode_pyth_price(data: Buffer) -> Optional[float]:
+    """Aggregate price of a Pyth price account, or None if invalid or not trading"""
+    view = memoryview(data)
+    if len(view) < PYTH_AGGREGATE_OFFSET + PYTH_AGGREGATE.size:
+        return None
+    if PYTH_MAGIC_FIELD.unpack_from(view, 0)[0] != PYTH_MAGIC:
+        return None
+    price, _, status = PYTH_AGGREGATE.unpack_from(view, PYTH_AGGREGATE_OFFSET)
+    if status != PYTH_STATUS_TRADING:
+        return None
+    return price * 10.0 ** PYTH_EXPONENT.unpack_from(view, PYTH_EXPONENT_OFFSET)[0]
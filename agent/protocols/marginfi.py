@@ -1,25 +1,54 @@
 """MarginFi Protocol Adapter for Solana"""
-import struct
+import base64
 from typing import Optional
 import httpx
 import structlog
+from solders.pubkey import Pubkey
 
+from .accounts import AccountFetcher
 from .base import (
     ProtocolAdapter, PositionData, CollateralPosition,
     DebtPosition, Protocol, RiskLevel,
 )
+from .layouts import decode_marginfi_balances
+from .rpc import RPCBatcher, RPCClient
+from .snapshot import ProgramSnapshot
 
 logger = structlog.get_logger()
 
 MARGINFI_PROGRAM = "MFv2hWf31Z9kbCa1snEPYctwafyhdJnV4QSdzCrRKg"
 
+# MarginfiAccount size and authority field offset
+MARGIN_ACCOUNT_SIZE = 2312
+MARGIN_ACCOUNT_AUTHORITY_OFFSET = 40
+
 
 class MarginFiAdapter(ProtocolAdapter):
     """Adapter for MarginFi lending protocol on Solana"""
 
-    def __init__(self, rpc_url: str):
+    protocol = Protocol.MARGINFI
+
+    def __init__(
+        self,
+        rpc_url: str,
+        client: Optional[RPCClient] = None,
+        account_fetcher: Optional[AccountFetcher] = None,
+        snapshot_max_age: Optional[float] = None,
+        batcher: Optional[RPCBatcher] = None,
+    ):
         self.rpc_url = rpc_url
-        self.client = httpx.AsyncClient(timeout=30)
+        self.account_fetcher = account_fetcher
+        self.client = client or httpx.AsyncClient(timeout=30)
+        self._owns_client = client is None
+        self.batcher = batcher
+        self.snapshot = (
+            ProgramSnapshot(
+                self.client, rpc_url, MARGINFI_PROGRAM,
+                MARGIN_ACCOUNT_SIZE, MARGIN_ACCOUNT_AUTHORITY_OFFSET, snapshot_max_age,
+            )
+            if snapshot_max_age
+            else None
+        )
 
     async def get_protocol_name(self) -> str:
         return "MarginFi"
@@ -54,6 +83,9 @@ class MarginFiAdapter(ProtocolAdapter):
 
     async def _get_margin_accounts(self, wallet_address: str) -> list[dict]:
         """Query MarginFi margin accounts using getProgramAccounts"""
+        if self.snapshot is not None:
+            return await self.snapshot.accounts_for(wallet_address)
+
         payload = {
             "jsonrpc": "2.0",
             "id": 1,
@@ -66,7 +98,7 @@ class MarginFiAdapter(ProtocolAdapter):
                         # MarginFi account discriminator + authority filter
                         {
                             "memcmp": {
-                                "offset": 40,  # Authority offset in MarginFi account
+                                "offset": MARGIN_ACCOUNT_AUTHORITY_OFFSET,
                                 "bytes": wallet_address,
                             }
                         },
@@ -75,15 +107,20 @@ class MarginFiAdapter(ProtocolAdapter):
             ],
         }
 
-        response = await self.client.post(self.rpc_url, json=payload)
-        result = response.json()
+        result = await self._rpc_request(payload)
 
         if "result" in result:
             return result["result"]
         return []
 
+    async def parse_account(self, owner: str, account: dict) -> Optional[PositionData]:
+        return await self._parse_margin_account(owner, account)
+
     async def _get_account_data(self, account_key: str) -> Optional[bytes]:
         """Fetch raw account data"""
+        if self.account_fetcher is not None:
+            return await self.account_fetcher.get_account(account_key)
+
         payload = {
             "jsonrpc": "2.0",
             "id": 1,
@@ -91,11 +128,9 @@ class MarginFiAdapter(ProtocolAdapter):
             "params": [account_key, {"encoding": "base64"}],
         }
 
-        response = await self.client.post(self.rpc_url, json=payload)
-        result = response.json()
+        result = await self._rpc_request(payload)
 
         if result.get("result", {}).get("value"):
-            import base64
             return base64.b64decode(result["result"]["value"]["data"][0])
         return None
 
@@ -104,7 +139,6 @@ class MarginFiAdapter(ProtocolAdapter):
     ) -> Optional[PositionData]:
         """Parse a MarginFi margin account into PositionData"""
         try:
-            import base64
             pubkey = account["pubkey"]
             data = base64.b64decode(account["account"]["data"][0])
 
@@ -117,28 +151,8 @@ class MarginFiAdapter(ProtocolAdapter):
             collaterals = []
             debts = []
 
-            # Parse active balances
-            # Each balance: [1 active][32 bank_pk][16 asset_shares][16 liability_shares]
-            balance_offset = 72  # After discriminator + group + authority
-            num_balances = min(16, (len(data) - balance_offset) // 65)
-
-            for i in range(num_balances):
-                offset = balance_offset + (i * 65)
-                if offset + 65 > len(data):
-                    break
-
-                active = data[offset]
-                if not active:
-                    continue
-
-                bank_pk = data[offset + 1:offset + 33]
-                # Asset shares (u128, but we read as two u64s)
-                asset_lo = struct.unpack_from("<Q", data, offset + 33)[0]
-                asset_hi = struct.unpack_from("<Q", data, offset + 41)[0]
-                # Liability shares
-                liability_lo = struct.unpack_from("<Q", data, offset + 49)[0]
-                liability_hi = struct.unpack_from("<Q", data, offset + 57)[0]
-
+            # Active balances: (index, bank_pk, asset u128 lo/hi, liability u128 lo/hi)
+            for i, bank_pk, asset_lo, asset_hi, liability_lo, liability_hi in decode_marginfi_balances(data):
                 asset_value = (asset_hi * (2**64) + asset_lo) / 1e15  # Approximate USD
                 liability_value = (liability_hi * (2**64) + liability_lo) / 1e15
 
@@ -146,6 +160,7 @@ class MarginFiAdapter(ProtocolAdapter):
                     total_collateral += asset_value
                     collaterals.append(CollateralPosition(
                         mint=bank_pk[:8].hex(),
+                        reserve=str(Pubkey.from_bytes(bytes(bank_pk))),
                         symbol=f"ASSET_{i}",
                         amount=asset_value,
                         value_usd=asset_value,
@@ -157,6 +172,7 @@ class MarginFiAdapter(ProtocolAdapter):
                     total_debt += liability_value
                     debts.append(DebtPosition(
                         mint=bank_pk[:8].hex(),
+                        reserve=str(Pubkey.from_bytes(bytes(bank_pk))),
                         symbol=f"DEBT_{i}",
                         amount=liability_value,
                         value_usd=liability_value,
@@ -194,18 +210,8 @@ class MarginFiAdapter(ProtocolAdapter):
 
             total_assets = 0.0
             total_liabilities = 0.0
-            balance_offset = 72
-
-            for i in range(16):
-                offset = balance_offset + (i * 65)
-                if offset + 65 > len(account_data):
-                    break
-                if not account_data[offset]:
-                    continue
-
-                asset_lo = struct.unpack_from("<Q", account_data, offset + 33)[0]
-                liability_lo = struct.unpack_from("<Q", account_data, offset + 49)[0]
 
+            for _, _, asset_lo, _, liability_lo, _ in decode_marginfi_balances(account_data):
                 total_assets += asset_lo / 1e15
                 total_liabilities += liability_lo / 1e15
 
@@ -218,4 +224,5 @@ class MarginFiAdapter(ProtocolAdapter):
             return 0.0
 
     async def close(self):
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
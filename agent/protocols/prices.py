@@ -0,0 +1,202 @@
+"""Price Feeds — oracle prices and health-factor repricing of cached positions"""
+import math
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import structlog
+
+from .accounts import AccountFetcher
+from .base import PositionData
+from .layouts import decode_pyth_price
+
+logger = structlog.get_logger()
+
+
+class PriceFeed(ABC):
+    """
+    Source of USD prices keyed by asset: the reserve/bank address each
+    collateral and debt entry carries (a reserve holds exactly one mint),
+    or its mint label for assets without one.
+    """
+
+    @abstractmethod
+    async def read(self) -> dict[str, float]:
+        """Current prices by asset key"""
+        ...
+
+
+class StaticPriceFeed(PriceFeed):
+    """Local stub feed: prices set in-process (tests, demos, devnet)"""
+
+    def __init__(self, prices: Optional[dict[str, float]] = None):
+        self.prices = dict(prices or {})
+
+    def set_price(self, asset: str, price: float):
+        self.prices[asset] = price
+
+    async def read(self) -> dict[str, float]:
+        return dict(self.prices)
+
+
+class PythPriceFeed(PriceFeed):
+    """Reads Pyth price accounts for all assets in one getMultipleAccounts round trip"""
+
+    def __init__(self, account_fetcher: AccountFetcher, oracles: dict[str, str]):
+        self.account_fetcher = account_fetcher
+        self.oracles = oracles  # reserve/bank address → Pyth price account
+
+    async def read(self) -> dict[str, float]:
+        self.account_fetcher.start_cycle()
+        accounts = await self.account_fetcher.get_accounts(list(self.oracles.values()))
+        prices = {}
+        for asset, oracle in self.oracles.items():
+            data = accounts.get(oracle)
+            price = decode_pyth_price(data) if data else None
+            if price is None:
+                logger.warning("oracle_price_unavailable", asset=asset[:8], oracle=oracle[:8])
+                continue
+            prices[asset] = price
+        return prices
+
+
+@dataclass(slots=True)
+class Exposure:
+    """A position's price sensitivity, captured when its obligation was last read"""
+    health_factor: float
+    total_collateral_usd: float
+    total_debt_usd: float
+    collateral: list[tuple[str, float, float]]  # (asset key, value_usd, liquidation threshold)
+    debt: list[tuple[str, float]]  # (asset key, value_usd)
+    reference_prices: dict[str, float]
+
+
+class PriceTracker:
+    """
+    Recomputes cached positions' health factors when prices move.
+
+    `track()` records a freshly read position together with the prices
+    current at that moment. When `update()` sees an asset's price move by
+    more than `min_move` (relative), every tracked position holding that
+    asset is repriced: each asset's value is scaled by its price change
+    and the read-time health factor by the resulting ratio of weighted
+    collateral to debt. `reprice()` applies the same scaling to a
+    position's asset values and totals. Obligations themselves are only
+    re-read when their own account changes.
+    """
+
+    def __init__(self, min_move: float = 0.001):
+        self.min_move = min_move
+        self.prices: dict[str, float] = {}
+        self._exposures: dict[str, Exposure] = {}
+        self._holders: dict[str, set[str]] = {}  # asset → obligation keys
+        self.stats = {"price_updates": 0, "repriced": 0}
+
+    def __len__(self) -> int:
+        return len(self._exposures)
+
+    def track(self, position: PositionData):
+        key = position.obligation_key
+        self.untrack(key)
+        exposure = Exposure(
+            health_factor=position.health_factor,
+            total_collateral_usd=position.total_collateral_usd,
+            total_debt_usd=position.total_debt_usd,
+            collateral=[(c.reserve or c.mint, c.value_usd, c.liquidation_threshold) for c in position.collaterals],
+            debt=[(d.reserve or d.mint, d.value_usd) for d in position.debts],
+            reference_prices={},
+        )
+        for asset, *_ in exposure.collateral + exposure.debt:
+            if asset in self.prices:
+                exposure.reference_prices[asset] = self.prices[asset]
+            self._holders.setdefault(asset, set()).add(key)
+        self._exposures[key] = exposure
+
+    def untrack(self, obligation_key: str):
+        exposure = self._exposures.pop(obligation_key, None)
+        if exposure is None:
+            return
+        for asset, *_ in exposure.collateral + exposure.debt:
+            holders = self._holders.get(asset)
+            if holders is not None:
+                holders.discard(obligation_key)
+                if not holders:
+                    del self._holders[asset]
+
+    def update(self, prices: dict[str, float]) -> dict[str, float]:
+        """Apply new prices; returns repriced health factors of affected positions"""
+        affected: set[str] = set()
+        for asset, price in prices.items():
+            previous = self.prices.get(asset)
+            if previous is not None and abs(price - previous) <= self.min_move * abs(previous):
+                continue
+            self.prices[asset] = price
+            self.stats["price_updates"] += 1
+            affected |= self._holders.get(asset, set())
+
+        repriced = {key: self.health_factor(key) for key in affected}
+        self.stats["repriced"] += len(repriced)
+        return repriced
+
+    def health_factor(self, obligation_key: str) -> float:
+        """Health factor of a tracked position at current prices"""
+        exposure = self._exposures[obligation_key]
+        weighted_before = weighted_now = debt_before = debt_now = 0.0
+        for asset, value, threshold in exposure.collateral:
+            weighted_before += value * threshold
+            weighted_now += value * threshold * self._scale(exposure, asset)
+        for asset, value in exposure.debt:
+            debt_before += value
+            debt_now += value * self._scale(exposure, asset)
+
+        if debt_now <= 0:
+            return float("inf")
+        if weighted_before <= 0 or debt_before <= 0 or math.isinf(exposure.health_factor):
+            return weighted_now / debt_now
+        return exposure.health_factor * (weighted_now / weighted_before) / (debt_now / debt_before)
+
+    def reprice(self, position: PositionData) -> PositionData:
+        """Copy of a tracked position with asset values, totals and health factor at current prices
+
+        Values are scaled from the read-time exposure, not from `position`,
+        so repricing an already-repriced copy doesn't compound. Totals move
+        by the same ratio as the per-asset sums; the risk level is left to
+        the caller, which owns the thresholds.
+        """
+        exposure = self._exposures[position.obligation_key]
+        collaterals = [
+            replace(c, value_usd=value * self._scale(exposure, asset))
+            for c, (asset, value, _) in zip(position.collaterals, exposure.collateral)
+        ]
+        debts = [
+            replace(d, value_usd=value * self._scale(exposure, asset))
+            for d, (asset, value) in zip(position.debts, exposure.debt)
+        ]
+        total_collateral = _scaled_total(
+            exposure.total_collateral_usd, [v for _, v, _ in exposure.collateral], collaterals
+        )
+        total_debt = _scaled_total(exposure.total_debt_usd, [v for _, v in exposure.debt], debts)
+        return replace(
+            position,
+            health_factor=self.health_factor(position.obligation_key),
+            total_collateral_usd=total_collateral,
+            total_debt_usd=total_debt,
+            net_value_usd=total_collateral - total_debt,
+            collaterals=collaterals,
+            debts=debts,
+        )
+
+    def _scale(self, exposure: Exposure, asset: str) -> float:
+        price = self.prices.get(asset)
+        if price is None:
+            return 1.0
+        # First price seen after the read becomes the reference
+        reference = exposure.reference_prices.setdefault(asset, price)
+        return price / reference if reference > 0 else 1.0
+
+
+def _scaled_total(total: float, values_before: list[float], assets_now: list) -> float:
+    before = sum(values_before)
+    if before <= 0:
+        return total
+    return total * sum(a.value_usd for a in assets_now) / before
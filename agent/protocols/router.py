@@ -0,0 +1,207 @@
+"""RPC Router — latency-aware endpoint selection, failover and hedged reads"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+import httpx
+import structlog
+
+from .rpc import SAMPLE_WINDOW, RPCClient, endpoint_key, percentile
+
+logger = structlog.get_logger()
+
+# Methods that are safe to send twice
+READ_ONLY_METHODS = {
+    "getAccountInfo",
+    "getMultipleAccounts",
+    "getProgramAccounts",
+    "getBalance",
+    "getSlot",
+}
+
+
+class EndpointUnavailable(Exception):
+    """Raised when an endpoint answers with a retryable HTTP status"""
+
+
+@dataclass
+class EndpointScore:
+    """Rolling latency and error score for one RPC endpoint"""
+    url: str
+    ewma_latency: Optional[float] = None
+    error_ewma: float = 0.0
+    consecutive_errors: int = 0
+    down_until: float = 0.0
+    requests: int = 0
+    errors: int = 0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=SAMPLE_WINDOW))
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def score(self, default_latency: float) -> float:
+        """Lower is better: smoothed latency inflated by recent error rate"""
+        latency = self.ewma_latency if self.ewma_latency is not None else default_latency
+        return latency * (1 + 10 * self.error_ewma)
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "healthy": self.healthy,
+            "ewma_ms": round((self.ewma_latency or 0.0) * 1000, 2),
+            "p95_ms": round(percentile(self.latencies, 95) * 1000, 2),
+            "error_rate": round(self.error_ewma, 4),
+        }
+
+
+class RPCRouter:
+    """
+    Routes Solana RPC calls across several endpoints.
+
+    Each call goes to the healthy endpoint with the best latency/error
+    score and fails over to the next one on connection errors, 429s or
+    5xx responses. An endpoint that fails `max_consecutive_errors` times
+    in a row is benched for `cooldown_seconds`. Read-only calls can be
+    hedged: if the first endpoint hasn't answered within its own p95
+    latency, a duplicate goes to the runner-up and the first reply wins.
+    In-flight requests are capped per endpoint at `max_inflight_per_endpoint`.
+
+    `post()` mirrors RPCClient.post so the router can be dropped in
+    wherever adapters expect a client; the url argument is ignored.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[str],
+        client: Optional[RPCClient] = None,
+        hedge_reads: bool = False,
+        hedge_min_delay: float = 0.05,
+        default_latency: float = 0.5,
+        ewma_alpha: float = 0.2,
+        max_consecutive_errors: int = 3,
+        cooldown_seconds: float = 30.0,
+        max_inflight_per_endpoint: int = 16,
+    ):
+        if not endpoints:
+            raise ValueError("RPCRouter needs at least one endpoint")
+        self.client = client or RPCClient()
+        self._owns_client = client is None
+        self.scores = {url: EndpointScore(url) for url in endpoints}
+        self.hedge_reads = hedge_reads
+        self.hedge_min_delay = hedge_min_delay
+        self.default_latency = default_latency
+        self.ewma_alpha = ewma_alpha
+        self.max_consecutive_errors = max_consecutive_errors
+        self.cooldown_seconds = cooldown_seconds
+        self.stats = {"failovers": 0, "hedges": 0, "hedge_wins": 0}
+        self._inflight = {url: asyncio.Semaphore(max_inflight_per_endpoint) for url in endpoints}
+
+    def ranked(self) -> list[str]:
+        """Endpoints best-first; benched endpoints go last, soonest-back first"""
+        healthy = [s for s in self.scores.values() if s.healthy]
+        benched = [s for s in self.scores.values() if not s.healthy]
+        healthy.sort(key=lambda s: s.score(self.default_latency))
+        benched.sort(key=lambda s: s.down_until)
+        return [s.url for s in healthy + benched]
+
+    def hedge_delay(self, url: str) -> float:
+        samples = self.scores[url].latencies
+        if len(samples) < 10:
+            return max(self.hedge_min_delay, self.default_latency)
+        return max(self.hedge_min_delay, percentile(samples, 95))
+
+    async def post(self, _url=None, json=None, **kwargs) -> httpx.Response:
+        """Send a JSON-RPC payload (single or batch) to the best endpoint"""
+        order = self.ranked()
+        if self.hedge_reads and len(order) > 1 and self._is_read_only(json):
+            return await self._hedged(order, json, **kwargs)
+        return await self._with_failover(order, json, **kwargs)
+
+    async def _with_failover(self, order: list[str], payload, **kwargs) -> httpx.Response:
+        last_error: Optional[Exception] = None
+        for attempt, url in enumerate(order):
+            if attempt:
+                self.stats["failovers"] += 1
+            try:
+                return await self._send(url, payload, **kwargs)
+            except Exception as e:
+                last_error = e
+                logger.warning("rpc_endpoint_failed", endpoint=endpoint_key(url), error=str(e))
+        raise last_error
+
+    async def _hedged(self, order: list[str], payload, **kwargs) -> httpx.Response:
+        primary = asyncio.create_task(self._send(order[0], payload, **kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay(order[0]))
+        if done and primary.exception() is None:
+            return primary.result()
+
+        self.stats["hedges"] += 1
+        backup = asyncio.create_task(self._with_failover(order[1:], payload, **kwargs))
+        pending = {backup} if done else {primary, backup}
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+            # Both legs failed; surface the backup's error (it tried every other endpoint)
+            raise backup.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _send(self, url: str, payload, **kwargs) -> httpx.Response:
+        score = self.scores[url]
+        async with self._inflight[url]:
+            score.requests += 1
+            start = time.perf_counter()
+            try:
+                response = await self.client.post(url, json=payload, **kwargs)
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise EndpointUnavailable(f"HTTP {response.status_code}")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._record_error(score)
+                raise
+            self._record_success(score, time.perf_counter() - start)
+        return response
+
+    def _record_success(self, score: EndpointScore, latency: float):
+        a = self.ewma_alpha
+        score.latencies.append(latency)
+        score.ewma_latency = latency if score.ewma_latency is None else a * latency + (1 - a) * score.ewma_latency
+        score.error_ewma *= 1 - a
+        score.consecutive_errors = 0
+
+    def _record_error(self, score: EndpointScore):
+        a = self.ewma_alpha
+        score.errors += 1
+        score.error_ewma = a + (1 - a) * score.error_ewma
+        score.consecutive_errors += 1
+        if score.consecutive_errors >= self.max_consecutive_errors:
+            score.down_until = time.monotonic() + self.cooldown_seconds
+            score.consecutive_errors = 0
+            logger.warning("rpc_endpoint_benched", endpoint=endpoint_key(score.url), cooldown_s=self.cooldown_seconds)
+
+    @staticmethod
+    def _is_read_only(payload) -> bool:
+        calls = payload if isinstance(payload, list) else [payload]
+        return all(isinstance(c, dict) and c.get("method") in READ_ONLY_METHODS for c in calls)
+
+    def get_metrics(self) -> dict:
+        return {
+            **self.stats,
+            "endpoints": {endpoint_key(url): s.to_dict() for url, s in self.scores.items()},
+        }
+
+    async def aclose(self):
+        if self._owns_client:
+            await self.client.aclose()
@@ -0,0 +1,224 @@
+"""Shared RPC transport — one pooled HTTP/2 client for adapters and executor"""
+import asyncio
+import importlib.util
+import itertools
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+import httpx
+import structlog
+
+logger = structlog.get_logger()
+
+# Latency/queue-wait samples kept per endpoint for percentile reporting
+SAMPLE_WINDOW = 1024
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile of a list of samples (0 when empty)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def endpoint_key(url) -> str:
+    """Metrics key for a URL — scheme and host only, so API keys never leak into stats"""
+    parsed = httpx.URL(str(url))
+    return f"{parsed.scheme}://{parsed.host}"
+
+
+@dataclass
+class EndpointMetrics:
+    """Request counters and rolling latency for one RPC endpoint"""
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=SAMPLE_WINDOW))
+    queue_waits: deque = field(default_factory=lambda: deque(maxlen=SAMPLE_WINDOW))
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_wait_p50_ms": round(percentile(self.queue_waits, 50) * 1000, 2),
+            "queue_wait_p99_ms": round(percentile(self.queue_waits, 99) * 1000, 2),
+            "latency_p50_ms": round(percentile(self.latencies, 50) * 1000, 2),
+            "latency_p99_ms": round(percentile(self.latencies, 99) * 1000, 2),
+        }
+
+
+class RPCClient:
+    """
+    Pooled HTTP transport shared by every adapter and the executor.
+
+    Wraps a single httpx.AsyncClient with explicit pool limits, keep-alive
+    and (when `h2` is installed) HTTP/2 multiplexing. Requests per endpoint
+    are capped at `max_connections`; time spent waiting for a slot is
+    recorded as queue wait alongside in-flight counts and p50/p99 latency.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        timeout: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("http2_unavailable", reason="h2 package not installed")
+            http2 = False
+
+        self.max_connections = max_connections
+        self.http2 = http2
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+            timeout=timeout,
+            transport=transport,
+        )
+        self.metrics: dict[str, EndpointMetrics] = {}
+        self._slots: dict[str, asyncio.Semaphore] = {}
+
+    async def request(self, method: str, url, **kwargs) -> httpx.Response:
+        key = endpoint_key(url)
+        metrics = self.metrics.setdefault(key, EndpointMetrics())
+        slots = self._slots.setdefault(key, asyncio.Semaphore(self.max_connections))
+
+        queued_at = time.perf_counter()
+        async with slots:
+            started_at = time.perf_counter()
+            metrics.queue_waits.append(started_at - queued_at)
+            metrics.requests += 1
+            metrics.in_flight += 1
+            metrics.max_in_flight = max(metrics.max_in_flight, metrics.in_flight)
+            try:
+                return await self.client.request(method, url, **kwargs)
+            except Exception:
+                metrics.errors += 1
+                raise
+            finally:
+                metrics.in_flight -= 1
+                metrics.latencies.append(time.perf_counter() - started_at)
+
+    async def post(self, url, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def get(self, url, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    def get_metrics(self) -> dict:
+        """Per-endpoint metrics, keyed by scheme://host"""
+        return {key: m.to_dict() for key, m in self.metrics.items()}
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class RPCBatcher:
+    """
+    Coalesces concurrent JSON-RPC calls into batch requests.
+
+    Calls made within `window_seconds` of each other (up to
+    `max_batch_size`) are sent as one JSON-RPC batch array; each caller
+    gets back its own response envelope, matched by request id. Cuts
+    HTTP request count on providers that bill per request.
+    """
+
+    def __init__(
+        self,
+        rpc_url: str,
+        client: Optional[RPCClient] = None,
+        window_seconds: float = 0.002,
+        max_batch_size: int = 50,
+    ):
+        self.rpc_url = rpc_url
+        self.client = client or httpx.AsyncClient(timeout=30)
+        self._owns_client = client is None
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+
+        self._ids = itertools.count(1)
+        self._queue: list[tuple[int, dict, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+        self.stats = {"calls": 0, "batches": 0, "largest_batch": 0}
+
+    async def call(self, method: str, params: list) -> dict:
+        """Send one JSON-RPC call as part of the next batch; returns its envelope"""
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((
+            request_id,
+            {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params},
+            future,
+        ))
+        self.stats["calls"] += 1
+
+        if len(self._queue) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.window_seconds, self._flush
+            )
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        while self._queue:
+            batch = self._queue[:self.max_batch_size]
+            del self._queue[:self.max_batch_size]
+            task = asyncio.get_running_loop().create_task(self._send_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, batch: list[tuple[int, dict, asyncio.Future]]):
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+        waiters = {request_id: future for request_id, _, future in batch}
+
+        try:
+            response = await self.client.post(
+                self.rpc_url, json=[payload for _, payload, _ in batch]
+            )
+            replies = response.json()
+            if not isinstance(replies, list):
+                raise RuntimeError(f"RPC batch rejected: {replies}")
+
+            for reply in replies:
+                future = waiters.pop(reply.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+
+            for future in waiters.values():
+                if not future.done():
+                    future.set_exception(RuntimeError("No response for batched RPC call"))
+
+        except Exception as e:
+            logger.error("rpc_batch_error", calls=len(batch), error=str(e))
+            for future in waiters.values():
+                if not future.done():
+                    future.set_exception(e)
+
+    async def close(self):
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._owns_client:
+            await self.client.aclose()
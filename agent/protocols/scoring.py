@@ -0,0 +1,228 @@
+"""Vectorized health scoring — NumPy batch path over raw obligation accounts
+
+The adapters' `parse_account` decodes one account at a time. Here N
+accounts of one protocol are laid end to end and viewed as a NumPy
+structured array (`np.frombuffer` with a record dtype built from the
+layouts in `protocols.layouts`), so collateral, debt, health factor and
+risk bucket for the whole batch come out of a handful of array
+operations. Every rule of the scalar decoders — entry counts capped by
+the declared length and by what fits in the buffer, MarginFi's dust
+filter, Solend's short-account fallbacks — is applied as a mask, so the
+scores equal `parse_account`'s totals and health factor.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Sequence
+
+import numpy as np
+
+from .base import RISK_LEVELS, Protocol, RiskLevel, classify_risk_codes
+from .layouts import (
+    KAMINO_DEPOSITS_LEN_OFFSET, KAMINO_ENTRY, KAMINO_MAX_ENTRIES,
+    MARGINFI_BALANCE, MARGINFI_BALANCES_OFFSET, MARGINFI_MAX_BALANCES,
+    SOLEND_VALUES, SOLEND_VALUES_OFFSET, Buffer,
+)
+
+# Same liquidation threshold the scalar adapters apply
+LIQUIDATION_THRESHOLD = 0.85
+
+# Kamino entry: [32 reserve][u64 amount][u64 market_value]
+KAMINO_ENTRY_DTYPE = np.dtype([("reserve", "V32"), ("amount", "<u8"), ("market_value", "<u8")])
+KAMINO_MARKET_VALUE_OFFSET = 40
+KAMINO_DEPOSITS_OFFSET = KAMINO_DEPOSITS_LEN_OFFSET + 1
+# Borrows follow the deposits actually present, so their offset varies per account;
+# the span covers a full deposits array, the borrows length byte and a full borrows array
+KAMINO_SPAN = KAMINO_DEPOSITS_OFFSET + 2 * KAMINO_MAX_ENTRIES * KAMINO_ENTRY.size + 1
+
+MARGINFI_BALANCE_DTYPE = np.dtype([
+    ("active", "u1"),
+    ("bank_pk", "V32"),
+    ("asset_lo", "<u8"),
+    ("asset_hi", "<u8"),
+    ("liability_lo", "<u8"),
+    ("liability_hi", "<u8"),
+])
+# parse_account skips balances worth this much or less
+MARGINFI_DUST_USD = 0.01
+
+U64_SPAN = 2.0 ** 64
+
+
+@dataclass(frozen=True)
+class RecordLayout:
+    """Fixed-offset fields of one account type and the bytes a record copies"""
+    fields: tuple[tuple[str, object, int], ...]  # (name, dtype, offset)
+    span: int
+
+    def dtype(self) -> np.dtype:
+        return _record_dtype(self.fields, self.span)
+
+
+@lru_cache(maxsize=32)
+def _record_dtype(fields: tuple, itemsize: int) -> np.dtype:
+    names, formats, offsets = zip(*fields)
+    return np.dtype({
+        "names": list(names),
+        "formats": list(formats),
+        "offsets": list(offsets),
+        "itemsize": itemsize,
+    })
+
+
+LAYOUTS = {
+    Protocol.KAMINO: RecordLayout(
+        fields=(
+            ("deposits_len", "u1", KAMINO_DEPOSITS_LEN_OFFSET),
+            ("deposits", (KAMINO_ENTRY_DTYPE, (KAMINO_MAX_ENTRIES,)), KAMINO_DEPOSITS_OFFSET),
+        ),
+        span=KAMINO_SPAN,
+    ),
+    Protocol.MARGINFI: RecordLayout(
+        fields=(
+            ("balances", (MARGINFI_BALANCE_DTYPE, (MARGINFI_MAX_BALANCES,)), MARGINFI_BALANCES_OFFSET),
+        ),
+        span=MARGINFI_BALANCES_OFFSET + MARGINFI_MAX_BALANCES * MARGINFI_BALANCE.size,
+    ),
+    Protocol.SOLEND: RecordLayout(
+        fields=(
+            ("deposited_lo", "<u8", SOLEND_VALUES_OFFSET),
+            ("deposited_hi", "<u8", SOLEND_VALUES_OFFSET + 8),
+            ("borrowed_lo", "<u8", SOLEND_VALUES_OFFSET + 16),
+            ("borrowed_hi", "<u8", SOLEND_VALUES_OFFSET + 24),
+        ),
+        span=SOLEND_VALUES_OFFSET + SOLEND_VALUES.size,
+    ),
+}
+
+
+@dataclass
+class HealthScores:
+    """Per-account arrays, aligned with the input buffers"""
+    collateral: np.ndarray
+    debt: np.ndarray
+    health_factor: np.ndarray
+    risk: np.ndarray  # index into RISK_LEVELS
+
+    def __len__(self) -> int:
+        return len(self.health_factor)
+
+    def risk_level(self, i: int) -> RiskLevel:
+        return RISK_LEVELS[self.risk[i]]
+
+
+def pack_records(buffers: Sequence[Buffer], layout: RecordLayout) -> np.ndarray:
+    """View N raw accounts as one structured array
+
+    Only the first `layout.span` bytes of each account are copied; short
+    accounts are zero-padded so every record has the same size. Pass the
+    real account sizes to `score_records` so padding is never read as data.
+    """
+    span = layout.span
+    joined = b"".join([
+        b[:span] if len(b) >= span else bytes(b).ljust(span, b"\0")
+        for b in buffers
+    ])
+    return np.frombuffer(joined, dtype=layout.dtype())
+
+
+def score_accounts(
+    protocol: Protocol,
+    buffers: Sequence[Buffer],
+    warn: float = 1.5,
+    critical: float = 1.2,
+    emergency: float = 1.05,
+) -> HealthScores:
+    """Collateral, debt, health factor and risk bucket for N raw accounts"""
+    layout = LAYOUTS[protocol]
+    sizes = np.fromiter(map(len, buffers), dtype=np.int64, count=len(buffers))
+    return score_records(protocol, pack_records(buffers, layout), sizes, warn, critical, emergency)
+
+
+def score_records(
+    protocol: Protocol,
+    records: np.ndarray,
+    sizes: np.ndarray,
+    warn: float = 1.5,
+    critical: float = 1.2,
+    emergency: float = 1.05,
+) -> HealthScores:
+    """Score an already-packed record array (see pack_records); fully vectorized"""
+    collateral, debt = _TOTALS[protocol](records, np.asarray(sizes, dtype=np.int64))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        health_factor = np.where(debt > 0, collateral * LIQUIDATION_THRESHOLD / debt, np.inf)
+
+    return HealthScores(
+        collateral=collateral,
+        debt=debt,
+        health_factor=health_factor,
+        risk=classify_risk_codes(health_factor, warn, critical, emergency),
+    )
+
+
+def _fit(sizes: np.ndarray, offset, entry_size: int) -> np.ndarray:
+    """Whole entries that fit in each buffer from `offset` on (layouts._entries)"""
+    return np.maximum(0, (sizes - offset) // entry_size)
+
+
+def _u128(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    return hi.astype(np.float64) * U64_SPAN + lo.astype(np.float64)
+
+
+def _kamino_totals(records: np.ndarray, sizes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    slots = np.arange(KAMINO_MAX_ENTRIES)
+    entry = KAMINO_ENTRY.size
+
+    n_deposits = np.minimum(
+        np.minimum(records["deposits_len"], KAMINO_MAX_ENTRIES),
+        _fit(sizes, KAMINO_DEPOSITS_OFFSET, entry),
+    )
+    deposit_values = records["deposits"]["market_value"] / 1e6
+    collateral = np.where(slots < n_deposits[:, None], deposit_values, 0.0).sum(axis=1)
+
+    # Borrows start right after the deposits present; gather their bytes per account
+    raw = records.view(np.uint8).reshape(len(records), records.dtype.itemsize)
+    rows = np.arange(len(records))
+    borrows_len_offset = KAMINO_DEPOSITS_OFFSET + n_deposits * entry
+    n_borrows = np.where(
+        borrows_len_offset < sizes,
+        np.minimum(
+            np.minimum(raw[rows, borrows_len_offset], KAMINO_MAX_ENTRIES),
+            _fit(sizes, borrows_len_offset + 1, entry),
+        ),
+        0,
+    )
+    value_offsets = borrows_len_offset[:, None] + 1 + slots * entry + KAMINO_MARKET_VALUE_OFFSET
+    value_bytes = raw[rows[:, None, None], value_offsets[:, :, None] + np.arange(8)]
+    borrow_values = np.ascontiguousarray(value_bytes).view("<u8")[..., 0] / 1e6
+    debt = np.where(slots < n_borrows[:, None], borrow_values, 0.0).sum(axis=1)
+    return collateral, debt
+
+
+def _marginfi_totals(records: np.ndarray, sizes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    balances = records["balances"]
+    slots = np.arange(MARGINFI_MAX_BALANCES)
+    present = slots < _fit(sizes, MARGINFI_BALANCES_OFFSET, MARGINFI_BALANCE.size)[:, None]
+    active = present & (balances["active"] != 0)
+
+    assets = _u128(balances["asset_lo"], balances["asset_hi"]) / 1e15
+    liabilities = _u128(balances["liability_lo"], balances["liability_hi"]) / 1e15
+    collateral = np.where(active & (assets > MARGINFI_DUST_USD), assets, 0.0).sum(axis=1)
+    debt = np.where(active & (liabilities > MARGINFI_DUST_USD), liabilities, 0.0).sum(axis=1)
+    return collateral, debt
+
+
+def _solend_totals(records: np.ndarray, sizes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # decode_solend_values: both values need the full block, deposited alone its first 16 bytes
+    has_deposited = sizes >= SOLEND_VALUES_OFFSET + 16
+    has_borrowed = sizes >= SOLEND_VALUES_OFFSET + SOLEND_VALUES.size
+    collateral = np.where(has_deposited, _u128(records["deposited_lo"], records["deposited_hi"]), 0.0) / 1e18
+    debt = np.where(has_borrowed, _u128(records["borrowed_lo"], records["borrowed_hi"]), 0.0) / 1e18
+    return collateral, debt
+
+
+_TOTALS: dict[Protocol, Callable[[np.ndarray, np.ndarray], tuple[np.ndarray, np.ndarray]]] = {
+    Protocol.KAMINO: _kamino_totals,
+    Protocol.MARGINFI: _marginfi_totals,
+    Protocol.SOLEND: _solend_totals,
+}
@@ -0,0 +1,115 @@
+"""Market-wide program snapshots — one getProgramAccounts scan answers every wallet"""
+import asyncio
+import base64
+import time
+from typing import Optional
+
+import httpx
+import structlog
+from solders.pubkey import Pubkey
+
+logger = structlog.get_logger()
+
+
+class ProgramSnapshot:
+    """
+    Owner → accounts index built from a single dataSize-filtered scan.
+
+    Instead of one owner-filtered getProgramAccounts per watched wallet,
+    the program is scanned once per `max_age_seconds` and every wallet
+    lookup is answered from the in-memory index. Concurrent callers share
+    the same in-flight scan.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        rpc_url: str,
+        program_id: str,
+        data_size: int,
+        owner_offset: int,
+        max_age_seconds: float = 30,
+    ):
+        self.client = client
+        self.rpc_url = rpc_url
+        self.program_id = program_id
+        self.data_size = data_size
+        self.owner_offset = owner_offset
+        self.max_age_seconds = max_age_seconds
+
+        self.index: dict[str, list[dict]] = {}
+        self.refreshed_at: Optional[float] = None
+        self.scan_count = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_stale(self) -> bool:
+        return (
+            self.refreshed_at is None
+            or time.monotonic() - self.refreshed_at >= self.max_age_seconds
+        )
+
+    async def accounts_for(self, owner: str) -> list[dict]:
+        """Return the program accounts owned by `owner`, refreshing if stale"""
+        await self.refresh_if_stale()
+        return self.index.get(owner, [])
+
+    async def refresh_if_stale(self):
+        if not self.is_stale:
+            return
+        async with self._lock:
+            # Another caller may have refreshed while we waited
+            if not self.is_stale:
+                return
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep serving the previous index until the next interval
+                # rather than letting every wallet lookup retry the scan
+                logger.error("program_snapshot_error", program=self.program_id[:8], error=str(e))
+                self.refreshed_at = time.monotonic()
+
+    async def refresh(self):
+        """Scan the whole program and rebuild the owner index"""
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getProgramAccounts",
+            "params": [
+                self.program_id,
+                {
+                    "encoding": "base64",
+                    "filters": [{"dataSize": self.data_size}],
+                },
+            ],
+        }
+
+        start = time.perf_counter()
+        response = await self.client.post(self.rpc_url, json=payload)
+        result = response.json()
+        self.scan_count += 1
+
+        if "error" in result:
+            raise RuntimeError(f"RPC error: {result['error']}")
+
+        index: dict[str, list[dict]] = {}
+        end = self.owner_offset + 32
+        for account in result.get("result", []):
+            # Only the bytes up to the owner field need decoding
+            encoded = account["account"]["data"][0][:((end + 2) // 3) * 4]
+            data = base64.b64decode(encoded)
+            if len(data) < end:
+                continue
+            owner = str(Pubkey(data[self.owner_offset:end]))
+            index.setdefault(owner, []).append(account)
+
+        self.index = index
+        self.refreshed_at = time.monotonic()
+
+        logger.info(
+            "program_snapshot_refreshed",
+            program=self.program_id[:8] + "...",
+            accounts=sum(len(v) for v in index.values()),
+            owners=len(index),
+            duration_s=f"{time.perf_counter() - start:.2f}",
+        )
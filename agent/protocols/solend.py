@@ -1,25 +1,54 @@
 """Solend Protocol Adapter for Solana"""
-import struct
+import base64
 from typing import Optional
 import httpx
 import structlog
+from solders.pubkey import Pubkey
 
+from .accounts import AccountFetcher
 from .base import (
     ProtocolAdapter, PositionData, CollateralPosition,
     DebtPosition, Protocol, RiskLevel,
 )
+from .layouts import decode_solend_deposits, decode_solend_totals, decode_solend_values
+from .rpc import RPCBatcher, RPCClient
+from .snapshot import ProgramSnapshot
 
 logger = structlog.get_logger()
 
 SOLEND_PROGRAM = "So1endDq2YkqhipRh3WViPa8hFMqRV1JimkXg5H2RGD"
 
+# Obligation account size and owner field offset
+OBLIGATION_SIZE = 916
+OBLIGATION_OWNER_OFFSET = 2
+
 
 class SolendAdapter(ProtocolAdapter):
     """Adapter for Solend V2 lending protocol on Solana"""
 
-    def __init__(self, rpc_url: str):
+    protocol = Protocol.SOLEND
+
+    def __init__(
+        self,
+        rpc_url: str,
+        client: Optional[RPCClient] = None,
+        account_fetcher: Optional[AccountFetcher] = None,
+        snapshot_max_age: Optional[float] = None,
+        batcher: Optional[RPCBatcher] = None,
+    ):
         self.rpc_url = rpc_url
-        self.client = httpx.AsyncClient(timeout=30)
+        self.account_fetcher = account_fetcher
+        self.client = client or httpx.AsyncClient(timeout=30)
+        self._owns_client = client is None
+        self.batcher = batcher
+        self.snapshot = (
+            ProgramSnapshot(
+                self.client, rpc_url, SOLEND_PROGRAM,
+                OBLIGATION_SIZE, OBLIGATION_OWNER_OFFSET, snapshot_max_age,
+            )
+            if snapshot_max_age
+            else None
+        )
 
     async def get_protocol_name(self) -> str:
         return "Solend"
@@ -51,6 +80,9 @@ class SolendAdapter(ProtocolAdapter):
 
     async def _get_obligations(self, wallet_address: str) -> list[dict]:
         """Query Solend obligation accounts"""
+        if self.snapshot is not None:
+            return await self.snapshot.accounts_for(wallet_address)
+
         payload = {
             "jsonrpc": "2.0",
             "id": 1,
@@ -60,10 +92,10 @@ class SolendAdapter(ProtocolAdapter):
                 {
                     "encoding": "base64",
                     "filters": [
-                        {"dataSize": 916},  # Solend obligation size
+                        {"dataSize": OBLIGATION_SIZE},
                         {
                             "memcmp": {
-                                "offset": 2,  # Owner offset
+                                "offset": OBLIGATION_OWNER_OFFSET,
                                 "bytes": wallet_address,
                             }
                         },
@@ -72,12 +104,17 @@ class SolendAdapter(ProtocolAdapter):
             ],
         }
 
-        response = await self.client.post(self.rpc_url, json=payload)
-        result = response.json()
+        result = await self._rpc_request(payload)
         return result.get("result", [])
 
+    async def parse_account(self, owner: str, account: dict) -> Optional[PositionData]:
+        return await self._parse_obligation(owner, account)
+
     async def _get_account_data(self, account_key: str) -> Optional[bytes]:
         """Fetch raw account data"""
+        if self.account_fetcher is not None:
+            return await self.account_fetcher.get_account(account_key)
+
         payload = {
             "jsonrpc": "2.0",
             "id": 1,
@@ -85,11 +122,9 @@ class SolendAdapter(ProtocolAdapter):
             "params": [account_key, {"encoding": "base64"}],
         }
 
-        response = await self.client.post(self.rpc_url, json=payload)
-        result = response.json()
+        result = await self._rpc_request(payload)
 
         if result.get("result", {}).get("value"):
-            import base64
             return base64.b64decode(result["result"]["value"]["data"][0])
         return None
 
@@ -98,7 +133,6 @@ class SolendAdapter(ProtocolAdapter):
     ) -> Optional[PositionData]:
         """Parse Solend obligation into PositionData"""
         try:
-            import base64
             pubkey = account["pubkey"]
             data = base64.b64decode(account["account"]["data"][0])
 
@@ -108,48 +142,24 @@ class SolendAdapter(ProtocolAdapter):
             # [u128 unhealthy_borrow_value]
             # [deposits_count][deposits...][borrows_count][borrows...]
 
-            total_collateral = 0.0
-            total_debt = 0.0
+            deposited_value, borrowed_value = decode_solend_values(data)
+            total_collateral = deposited_value / 1e18
+            total_debt = borrowed_value / 1e18
             collaterals = []
             debts = []
 
-            # Parse deposited_value (u128 at offset ~66)
-            offset = 66
-            if len(data) >= offset + 16:
-                deposited_lo = struct.unpack_from("<Q", data, offset)[0]
-                deposited_hi = struct.unpack_from("<Q", data, offset + 8)[0]
-                total_collateral = (deposited_hi * (2**64) + deposited_lo) / 1e18
-
-            # Parse borrowed_value (u128)
-            offset += 16
-            if len(data) >= offset + 16:
-                borrowed_lo = struct.unpack_from("<Q", data, offset)[0]
-                borrowed_hi = struct.unpack_from("<Q", data, offset + 8)[0]
-                total_debt = (borrowed_hi * (2**64) + borrowed_lo) / 1e18
-
-            # Parse individual deposits
-            deposits_offset = 130  # Approximate
-            if len(data) > deposits_offset:
-                num_deposits = data[deposits_offset]
-                dep_offset = deposits_offset + 1
-
-                for i in range(min(num_deposits, 10)):
-                    if dep_offset + 56 > len(data):
-                        break
-                    reserve_key = data[dep_offset:dep_offset + 32]
-                    deposited_amount = struct.unpack_from("<Q", dep_offset + 32, data)[0] if dep_offset + 40 <= len(data) else 0
-                    value = struct.unpack_from("<Q", data, dep_offset + 40)[0] / 1e6 if dep_offset + 48 <= len(data) else 0
-
-                    if value > 0:
-                        collaterals.append(CollateralPosition(
-                            mint=reserve_key[:4].hex(),
-                            symbol=f"COL_{i}",
-                            amount=deposited_amount / 1e9,
-                            value_usd=value,
-                            ltv=0.75,
-                            liquidation_threshold=0.85,
-                        ))
-                    dep_offset += 56
+            for i, (reserve_key, deposited_amount, market_value) in enumerate(decode_solend_deposits(data)):
+                value = market_value / 1e6
+                if value > 0:
+                    collaterals.append(CollateralPosition(
+                        mint=reserve_key[:4].hex(),
+                        reserve=str(Pubkey.from_bytes(bytes(reserve_key))),
+                        symbol=f"COL_{i}",
+                        amount=deposited_amount / 1e9,
+                        value_usd=value,
+                        ltv=0.75,
+                        liquidation_threshold=0.85,
+                    ))
 
             health_factor = (
                 total_collateral * 0.85 / total_debt
@@ -177,12 +187,8 @@ class SolendAdapter(ProtocolAdapter):
     def _calculate_health_factor(self, data: bytes) -> float:
         """Calculate health factor from raw obligation data"""
         try:
-            offset = 66
-            deposited_lo = struct.unpack_from("<Q", data, offset)[0]
+            deposited_lo, borrowed_lo = decode_solend_totals(data)
             total_collateral = deposited_lo / 1e18
-
-            offset += 16
-            borrowed_lo = struct.unpack_from("<Q", data, offset)[0]
             total_debt = borrowed_lo / 1e18
 
             if total_debt == 0:
@@ -192,4 +198,5 @@ class SolendAdapter(ProtocolAdapter):
             return 0.0
 
     async def close(self):
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
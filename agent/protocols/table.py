@@ -0,0 +1,263 @@
+"""Position Table — columnar, array-backed store of positions keyed by obligation"""
+import sys
+from array import array
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from .base import (
+    RISK_LEVELS, CollateralPosition, DebtPosition, PositionData, Protocol, RiskLevel,
+)
+
+PROTOCOLS = tuple(Protocol)
+_PROTOCOL_CODES = {protocol: i for i, protocol in enumerate(PROTOCOLS)}
+_RISK_CODES = {level: i for i, level in enumerate(RISK_LEVELS)}
+
+FLOAT_COLUMNS = (
+    "health_factor",
+    "total_collateral_usd",
+    "total_debt_usd",
+    "net_value_usd",
+    "liquidation_price",  # NaN when unknown
+    "timestamp",
+)
+
+
+def _float_field(name: str) -> property:
+    def fget(self) -> float:
+        return float(self._table._floats[name][self._row()])
+
+    def fset(self, value: float):
+        self._table._floats[name][self._row()] = value
+
+    return property(fget, fset)
+
+
+class PositionView:
+    """
+    Lazy, PositionData-compatible view of one PositionTable row.
+
+    Scalar fields are read from (and written to) the table's columns on
+    access; collaterals/debts are rebuilt as dataclasses only when asked
+    for. A view follows its obligation across table compaction and raises
+    KeyError once the position is removed.
+    """
+
+    __slots__ = ("_table", "obligation_key")
+
+    def __init__(self, table: "PositionTable", obligation_key: str):
+        self._table = table
+        self.obligation_key = obligation_key
+
+    def _row(self) -> int:
+        return self._table._rows[self.obligation_key]
+
+    @property
+    def protocol(self) -> Protocol:
+        return PROTOCOLS[self._table._protocol[self._row()]]
+
+    @property
+    def owner(self) -> str:
+        return self._table._owners[self._row()]
+
+    @property
+    def risk_level(self) -> RiskLevel:
+        return RISK_LEVELS[self._table._risk[self._row()]]
+
+    @risk_level.setter
+    def risk_level(self, level: RiskLevel):
+        self._table._risk[self._row()] = _RISK_CODES[level]
+
+    health_factor = _float_field("health_factor")
+    total_collateral_usd = _float_field("total_collateral_usd")
+    total_debt_usd = _float_field("total_debt_usd")
+    net_value_usd = _float_field("net_value_usd")
+    timestamp = _float_field("timestamp")
+
+    @property
+    def liquidation_price(self) -> Optional[float]:
+        price = self._table._floats["liquidation_price"][self._row()]
+        return None if np.isnan(price) else float(price)
+
+    @property
+    def collaterals(self) -> list[CollateralPosition]:
+        assets = self._table._assets[self._row()]
+        if assets is None:
+            return []
+        count, labels, values = assets
+        return [
+            CollateralPosition(labels[3 * i], labels[3 * i + 1], *values[4 * i:4 * i + 4], labels[3 * i + 2])
+            for i in range(count)
+        ]
+
+    @property
+    def debts(self) -> list[DebtPosition]:
+        assets = self._table._assets[self._row()]
+        if assets is None:
+            return []
+        count, labels, values = assets
+        base = 4 * count
+        return [
+            DebtPosition(labels[3 * i], labels[3 * i + 1], *values[base + 3 * j:base + 3 * j + 3], labels[3 * i + 2])
+            for j, i in enumerate(range(count, len(labels) // 3))
+        ]
+
+    @property
+    def asset_mints(self) -> tuple:
+        """Collateral then debt mints, without rebuilding the asset dataclasses"""
+        assets = self._table._assets[self._row()]
+        return assets[1][0::3] if assets is not None else ()
+
+    ltv_ratio = PositionData.ltv_ratio
+    to_risk_summary = PositionData.to_risk_summary
+
+    def to_position(self) -> PositionData:
+        """Materialize a standalone PositionData copy"""
+        return PositionData(
+            protocol=self.protocol,
+            owner=self.owner,
+            obligation_key=self.obligation_key,
+            health_factor=self.health_factor,
+            total_collateral_usd=self.total_collateral_usd,
+            total_debt_usd=self.total_debt_usd,
+            net_value_usd=self.net_value_usd,
+            risk_level=self.risk_level,
+            collaterals=self.collaterals,
+            debts=self.debts,
+            liquidation_price=self.liquidation_price,
+            timestamp=self.timestamp,
+        )
+
+    def __repr__(self) -> str:
+        return f"PositionView({self.obligation_key!r}, hf={self.health_factor:.4f})"
+
+
+class PositionTable:
+    """
+    Columnar position store for whole-market monitoring.
+
+    Scalar fields live in NumPy columns (float64, int8 codes for protocol
+    and risk level), owners and asset labels are interned, and per-asset
+    numbers are packed into one float array per row — a row costs a few
+    hundred bytes instead of a dict-backed dataclass graph. Rows are
+    addressed by obligation key; removal swaps the last row in so live
+    rows stay contiguous and `health_factors()` is a zero-copy slice
+    ready for vectorized scoring.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        capacity = max(1, capacity)
+        self._size = 0
+        self._rows: dict[str, int] = {}
+        self._keys: list[str] = []
+        self._owners: list[str] = []
+        self._assets: list[Optional[tuple]] = []
+        self._protocol = np.zeros(capacity, dtype=np.int8)
+        self._risk = np.zeros(capacity, dtype=np.int8)
+        self._floats = {name: np.zeros(capacity) for name in FLOAT_COLUMNS}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, obligation_key: str) -> bool:
+        return obligation_key in self._rows
+
+    def __getitem__(self, obligation_key: str) -> PositionView:
+        if obligation_key not in self._rows:
+            raise KeyError(obligation_key)
+        return PositionView(self, obligation_key)
+
+    def __iter__(self) -> Iterator[PositionView]:
+        return (PositionView(self, key) for key in list(self._keys))
+
+    def get(self, obligation_key: str) -> Optional[PositionView]:
+        return PositionView(self, obligation_key) if obligation_key in self._rows else None
+
+    def keys(self) -> list[str]:
+        return list(self._keys)
+
+    @property
+    def capacity(self) -> int:
+        return len(self._protocol)
+
+    def upsert(self, position: PositionData) -> PositionView:
+        """Insert or overwrite the row for position.obligation_key"""
+        key = position.obligation_key
+        row = self._rows.get(key)
+        if row is None:
+            if self._size == self.capacity:
+                self._grow()
+            row = self._size
+            self._size += 1
+            self._rows[key] = row
+            self._keys.append(key)
+            self._owners.append(sys.intern(position.owner))
+            self._assets.append(None)
+        else:
+            self._owners[row] = sys.intern(position.owner)
+
+        self._protocol[row] = _PROTOCOL_CODES[position.protocol]
+        self._risk[row] = _RISK_CODES[position.risk_level]
+        floats = self._floats
+        floats["health_factor"][row] = position.health_factor
+        floats["total_collateral_usd"][row] = position.total_collateral_usd
+        floats["total_debt_usd"][row] = position.total_debt_usd
+        floats["net_value_usd"][row] = position.net_value_usd
+        floats["liquidation_price"][row] = (
+            np.nan if position.liquidation_price is None else position.liquidation_price
+        )
+        floats["timestamp"][row] = position.timestamp
+
+        # Per-asset detail: (collateral count, interned mint/symbol/reserve labels, packed floats)
+        labels = []
+        values = array("d")
+        for c in position.collaterals:
+            labels += (sys.intern(c.mint), sys.intern(c.symbol), sys.intern(c.reserve))
+            values.extend((c.amount, c.value_usd, c.ltv, c.liquidation_threshold))
+        for d in position.debts:
+            labels += (sys.intern(d.mint), sys.intern(d.symbol), sys.intern(d.reserve))
+            values.extend((d.amount, d.value_usd, d.borrow_rate_apy))
+        self._assets[row] = (len(position.collaterals), tuple(labels), values) if labels else None
+        return PositionView(self, key)
+
+    def update(self, positions: Iterable[PositionData]):
+        for position in positions:
+            self.upsert(position)
+
+    def remove(self, obligation_key: str) -> bool:
+        """Drop a row, moving the last row into its slot"""
+        row = self._rows.pop(obligation_key, None)
+        if row is None:
+            return False
+
+        last = self._size - 1
+        if row != last:
+            moved = self._keys[last]
+            self._rows[moved] = row
+            self._keys[row] = moved
+            self._owners[row] = self._owners[last]
+            self._assets[row] = self._assets[last]
+            self._protocol[row] = self._protocol[last]
+            self._risk[row] = self._risk[last]
+            for column in self._floats.values():
+                column[row] = column[last]
+
+        self._keys.pop()
+        self._owners.pop()
+        self._assets.pop()
+        self._size = last
+        return True
+
+    def health_factors(self) -> np.ndarray:
+        """Live health-factor column, row-aligned with keys()"""
+        return self._floats["health_factor"][:self._size]
+
+    def views(self, rows: Iterable[int]) -> list[PositionView]:
+        """Views for row indices, e.g. from np.flatnonzero over a column"""
+        return [PositionView(self, self._keys[row]) for row in rows]
+
+    def _grow(self):
+        capacity = self.capacity * 2
+        self._protocol = np.resize(self._protocol, capacity)
+        self._risk = np.resize(self._risk, capacity)
+        self._floats = {name: np.resize(column, capacity) for name, column in self._floats.items()}
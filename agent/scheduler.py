@@ -0,0 +1,135 @@
+"""Priority Scheduler — urgency-ordered analysis and execution worker pools"""
+import asyncio
+import itertools
+import math
+from typing import Awaitable, Callable
+
+import structlog
+
+from analyzer import AnalysisResult
+from protocols.base import RISK_LEVELS, PositionData
+
+logger = structlog.get_logger()
+
+AnalyzeFn = Callable[[list[PositionData]], Awaitable[list[AnalysisResult]]]
+ExecuteFn = Callable[[PositionData, AnalysisResult], Awaitable[None]]
+
+
+def distance_to_liquidation(position: PositionData) -> float:
+    """Fractional collateral-value drop that would bring the health factor to 1.0"""
+    hf = position.health_factor
+    if math.isinf(hf):
+        return 1.0
+    return 1.0 - 1.0 / hf if hf > 0 else -1.0
+
+
+def priority(position: PositionData) -> tuple:
+    """Sort key: risk level, then closeness to liquidation, then debt size (largest first)"""
+    return (
+        RISK_LEVELS.index(position.risk_level),
+        distance_to_liquidation(position),
+        -position.total_debt_usd,
+    )
+
+
+class PriorityScheduler:
+    """
+    Runs at-risk positions through analysis and then execution, most urgent first.
+
+    Both stages pull from a priority queue ordered by `priority()`, so a
+    large emergency position is analyzed and executed ahead of a small
+    warning whatever order the wallets were fetched in. Analysis workers
+    take up to `batch_size` positions at a time (the analyzer packs them
+    into one request); execution workers are a separate pool so slow
+    transactions never hold up analyses.
+
+    Runs may overlap (a streamed update arrives mid-cycle); a position
+    already in flight in another run is skipped rather than analyzed and
+    executed twice.
+    """
+
+    def __init__(
+        self,
+        analyze: AnalyzeFn,
+        execute: ExecuteFn,
+        analysis_workers: int = 8,
+        execution_workers: int = 2,
+        batch_size: int = 1,
+    ):
+        self.analyze = analyze
+        self.execute = execute
+        self.analysis_workers = max(1, analysis_workers)
+        self.execution_workers = max(1, execution_workers)
+        self.batch_size = max(1, batch_size)
+        self._seq = itertools.count()
+        self._inflight: set[str] = set()
+        self.stats = {"scheduled": 0, "analyzed": 0, "executed": 0, "errors": 0, "skipped_inflight": 0}
+
+    async def run(self, positions: list[PositionData]):
+        """Schedule positions and wait until every one has been analyzed and executed"""
+        fresh = [p for p in positions if p.obligation_key not in self._inflight]
+        self.stats["skipped_inflight"] += len(positions) - len(fresh)
+        if not fresh:
+            return
+
+        keys = {p.obligation_key for p in fresh}
+        self._inflight |= keys
+        try:
+            await self._run(fresh)
+        finally:
+            self._inflight -= keys
+
+    async def _run(self, positions: list[PositionData]):
+        analysis_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        execution_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        for position in positions:
+            analysis_queue.put_nowait((priority(position), next(self._seq), position))
+        self.stats["scheduled"] += len(positions)
+
+        workers = [
+            asyncio.create_task(self._analysis_worker(analysis_queue, execution_queue))
+            for _ in range(min(self.analysis_workers, len(positions)))
+        ] + [
+            asyncio.create_task(self._execution_worker(execution_queue))
+            for _ in range(min(self.execution_workers, len(positions)))
+        ]
+        try:
+            # Executions are queued before their analysis is marked done
+            await analysis_queue.join()
+            await execution_queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _analysis_worker(self, queue: asyncio.PriorityQueue, execution_queue: asyncio.PriorityQueue):
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                analyses = await self.analyze([position for _, _, position in batch])
+                for (key, seq, position), analysis in zip(batch, analyses):
+                    execution_queue.put_nowait((key, seq, position, analysis))
+                self.stats["analyzed"] += len(batch)
+            except Exception as e:
+                self.stats["errors"] += len(batch)
+                logger.error("analysis_batch_error", positions=len(batch), error=str(e))
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _execution_worker(self, queue: asyncio.PriorityQueue):
+        while True:
+            _, _, position, analysis = await queue.get()
+            try:
+                await self.execute(position, analysis)
+                self.stats["executed"] += 1
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error("at_risk_handling_error", position=position.obligation_key[:16], error=str(e))
+            finally:
+                queue.task_done()
+
+    def get_stats(self) -> dict:
+        return dict(self.stats)
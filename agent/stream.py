@@ -0,0 +1,218 @@
+"""Account Stream — WebSocket accountSubscribe monitor for tracked obligations"""
+import asyncio
+import itertools
+import json
+from typing import Awaitable, Callable, Optional
+
+import structlog
+import websockets
+
+from protocols.base import ProtocolAdapter, PositionData
+
+logger = structlog.get_logger()
+
+PositionCallback = Callable[[PositionData], Awaitable[None]]
+
+
+class AccountStream:
+    """
+    Streams obligation/margin account changes over Solana's websocket API.
+
+    Every tracked account gets an accountSubscribe; programs can also be
+    watched wholesale with programSubscribe. Only accounts whose data
+    actually changed are re-parsed, and the resulting PositionData goes
+    straight to `on_update` — reaction time is slot latency rather than
+    the polling interval. The connection is re-established (and all
+    subscriptions replayed) if it drops.
+
+    `on_update` runs in a task per account, never in the receive loop, so
+    a slow handler does not hold up other notifications or pings. Changes
+    arriving while an account's handler is busy collapse into one call
+    with the newest position.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        on_update: PositionCallback,
+        commitment: str = "confirmed",
+        reconnect_delay: float = 1.0,
+    ):
+        self.ws_url = ws_url
+        self.on_update = on_update
+        self.commitment = commitment
+        self.reconnect_delay = reconnect_delay
+        self.running = False
+
+        # account key → (adapter, owner)
+        self._tracked: dict[str, tuple[ProtocolAdapter, str]] = {}
+        # program id → dataSize/memcmp filters
+        self._programs: dict[str, list[dict]] = {}
+        # subscription id → account key or program id
+        self._subscriptions: dict[int, str] = {}
+        # request id → (method, account key or program id)
+        self._requests: dict[int, tuple[str, str]] = {}
+        self._last_data: dict[str, str] = {}
+        # account key → newest position awaiting on_update, and its delivery task
+        self._latest: dict[str, PositionData] = {}
+        self._deliveries: dict[str, asyncio.Task] = {}
+        self._ids = itertools.count(1)
+        self._ws = None
+        self.connected = asyncio.Event()
+
+        self.stats = {
+            "notifications": 0,
+            "unchanged_skipped": 0,
+            "positions_updated": 0,
+            "updates_coalesced": 0,
+            "reconnects": 0,
+        }
+
+    async def track(self, position: PositionData, adapter: ProtocolAdapter):
+        """Start streaming updates for a position's account"""
+        key = position.obligation_key
+        if key in self._tracked:
+            return
+        self._tracked[key] = (adapter, position.owner)
+        if self._ws is not None:
+            await self._subscribe_account(key)
+
+    async def untrack(self, account_key: str):
+        """Stop streaming updates for an account"""
+        self._tracked.pop(account_key, None)
+        self._last_data.pop(account_key, None)
+        self._latest.pop(account_key, None)
+        for sub_id, key in list(self._subscriptions.items()):
+            if key == account_key:
+                del self._subscriptions[sub_id]
+                if self._ws is not None:
+                    await self._send("accountUnsubscribe", [sub_id])
+
+    async def track_program(self, program_id: str, filters: Optional[list[dict]] = None):
+        """Watch a whole program; updates for tracked accounts are forwarded"""
+        self._programs[program_id] = filters or []
+        if self._ws is not None:
+            await self._subscribe_program(program_id)
+
+    async def run(self):
+        """Connect, subscribe and dispatch notifications until stopped"""
+        self.running = True
+        while self.running:
+            try:
+                async with websockets.connect(self.ws_url, ping_interval=20) as ws:
+                    self._ws = ws
+                    self._subscriptions.clear()
+                    self._requests.clear()
+                    for key in list(self._tracked):
+                        await self._subscribe_account(key)
+                    for program_id in list(self._programs):
+                        await self._subscribe_program(program_id)
+                    self.connected.set()
+                    logger.info("stream_connected", accounts=len(self._tracked), programs=len(self._programs))
+
+                    async for raw in ws:
+                        await self._handle_message(json.loads(raw))
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("stream_disconnected", error=str(e))
+            finally:
+                self._ws = None
+                self.connected.clear()
+
+            if self.running:
+                self.stats["reconnects"] += 1
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def stop(self):
+        self.running = False
+        if self._ws is not None:
+            await self._ws.close()
+        deliveries = list(self._deliveries.values())
+        for task in deliveries:
+            task.cancel()
+        await asyncio.gather(*deliveries, return_exceptions=True)
+
+    async def _send(self, method: str, params: list, target: str = "") -> int:
+        request_id = next(self._ids)
+        self._requests[request_id] = (method, target)
+        await self._ws.send(json.dumps({
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": method,
+            "params": params,
+        }))
+        return request_id
+
+    async def _subscribe_account(self, key: str):
+        await self._send(
+            "accountSubscribe",
+            [key, {"encoding": "base64", "commitment": self.commitment}],
+            key,
+        )
+
+    async def _subscribe_program(self, program_id: str):
+        config = {"encoding": "base64", "commitment": self.commitment}
+        if self._programs[program_id]:
+            config["filters"] = self._programs[program_id]
+        await self._send("programSubscribe", [program_id, config], program_id)
+
+    async def _handle_message(self, message: dict):
+        # Subscription confirmation
+        if "id" in message:
+            method, target = self._requests.pop(message["id"], ("", ""))
+            if "error" in message:
+                logger.warning("stream_subscribe_error", method=method, target=target[:8], error=message["error"])
+            elif method in ("accountSubscribe", "programSubscribe"):
+                self._subscriptions[message["result"]] = target
+            return
+
+        method = message.get("method")
+        params = message.get("params", {})
+        value = params.get("result", {}).get("value")
+        if not value:
+            return
+
+        if method == "accountNotification":
+            key = self._subscriptions.get(params.get("subscription"))
+            if key is not None:
+                await self._on_account_change(key, value)
+        elif method == "programNotification":
+            await self._on_account_change(value["pubkey"], value["account"])
+
+    async def _on_account_change(self, key: str, account: dict):
+        self.stats["notifications"] += 1
+        tracked = self._tracked.get(key)
+        if tracked is None:
+            return
+
+        data = account.get("data", [""])[0]
+        if self._last_data.get(key) == data:
+            self.stats["unchanged_skipped"] += 1
+            return
+        self._last_data[key] = data
+
+        adapter, owner = tracked
+        position = await adapter.parse_account(owner, {"pubkey": key, "account": account})
+        if position is None:
+            return
+
+        self.stats["positions_updated"] += 1
+        if key in self._latest:
+            self.stats["updates_coalesced"] += 1
+        self._latest[key] = position
+        if key not in self._deliveries:
+            self._deliveries[key] = asyncio.create_task(self._deliver(key))
+
+    async def _deliver(self, key: str):
+        """Hand an account's newest position to on_update until none is waiting"""
+        try:
+            while key in self._latest:
+                position = self._latest.pop(key)
+                try:
+                    await self.on_update(position)
+                except Exception as e:
+                    logger.error("stream_callback_error", position=key[:16], error=str(e))
+        finally:
+            del self._deliveries[key]
@@ -0,0 +1,145 @@
+"""Tests for the batched getMultipleAccounts engine"""
+import asyncio
+import base64
+import json
+import pytest
+import sys
+import os
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from protocols.accounts import AccountFetcher
+from protocols.kamino import KaminoAdapter
+
+
+class FakeRPC:
+    """httpx transport answering getMultipleAccounts from an in-memory store"""
+
+    def __init__(self, accounts: dict[str, bytes]):
+        self.accounts = accounts
+        self.requests: list[dict] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append(body)
+        assert body["method"] == "getMultipleAccounts"
+        keys = body["params"][0]
+        value = [
+            {"data": [base64.b64encode(self.accounts[k]).decode(), "base64"]}
+            if k in self.accounts else None
+            for k in keys
+        ]
+        return httpx.Response(200, json={"jsonrpc": "2.0", "id": body["id"], "result": {"value": value}})
+
+
+def make_fetcher(rpc: FakeRPC, **kwargs) -> AccountFetcher:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(rpc))
+    return AccountFetcher("http://rpc.test", client=client, **kwargs)
+
+
+class TestAccountFetcher:
+    """Test key batching, deduplication and result routing"""
+
+    @pytest.mark.asyncio
+    async def test_batches_into_chunks_of_100(self):
+        rpc = FakeRPC({f"Key{i}": bytes([i % 256]) * 4 for i in range(250)})
+        fetcher = make_fetcher(rpc)
+
+        results = await fetcher.get_accounts([f"Key{i}" for i in range(250)])
+        assert len(rpc.requests) == 3
+        assert max(len(r["params"][0]) for r in rpc.requests) == 100
+        assert results["Key7"] == bytes([7]) * 4
+        await fetcher.close()
+
+    @pytest.mark.asyncio
+    async def test_duplicate_keys_requested_once(self):
+        rpc = FakeRPC({"A": b"a", "B": b"b"})
+        fetcher = make_fetcher(rpc)
+
+        results = await asyncio.gather(
+            fetcher.get_account("A"),
+            fetcher.get_account("A"),
+            fetcher.get_account("B"),
+        )
+        assert results == [b"a", b"a", b"b"]
+        assert len(rpc.requests) == 1
+        assert rpc.requests[0]["params"][0] == ["A", "B"]
+        assert fetcher.stats["keys_deduplicated"] == 1
+        await fetcher.close()
+
+    @pytest.mark.asyncio
+    async def test_cycle_cache_reset(self):
+        rpc = FakeRPC({"A": b"a"})
+        fetcher = make_fetcher(rpc)
+
+        await fetcher.get_account("A")
+        await fetcher.get_account("A")
+        assert len(rpc.requests) == 1
+
+        fetcher.start_cycle()
+        await fetcher.get_account("A")
+        assert len(rpc.requests) == 2
+        await fetcher.close()
+
+    @pytest.mark.asyncio
+    async def test_cache_expires_without_cycle(self):
+        rpc = FakeRPC({"A": b"a"})
+        fetcher = make_fetcher(rpc, cache_ttl=0.05)
+
+        await fetcher.get_account("A")
+        await fetcher.get_account("A")
+        assert len(rpc.requests) == 1
+
+        await asyncio.sleep(0.06)
+        await fetcher.get_account("A")
+        assert len(rpc.requests) == 2
+        await fetcher.close()
+
+    @pytest.mark.asyncio
+    async def test_cache_size_bounded(self):
+        rpc = FakeRPC({f"Key{i}": b"x" for i in range(10)})
+        fetcher = make_fetcher(rpc, max_cached=4)
+
+        await fetcher.get_accounts([f"Key{i}" for i in range(10)])
+        assert list(fetcher._cycle_cache) == ["Key6", "Key7", "Key8", "Key9"]
+        await fetcher.close()
+
+    @pytest.mark.asyncio
+    async def test_missing_account_is_none(self):
+        fetcher = make_fetcher(FakeRPC({}))
+        assert await fetcher.get_account("Nope") is None
+        await fetcher.close()
+
+    @pytest.mark.asyncio
+    async def test_rpc_error_propagates_to_waiters(self):
+        def failing(request):
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": 1, "error": {"code": -32005}})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(failing))
+        fetcher = AccountFetcher("http://rpc.test", client=client)
+        with pytest.raises(RuntimeError):
+            await fetcher.get_account("A")
+        results = await fetcher.get_accounts(["B"])
+        assert results == {"B": None}
+        await fetcher.close()
+
+    @pytest.mark.asyncio
+    async def test_adapter_health_factor_routed_through_fetcher(self):
+        data = bytearray(1300)
+        data[80:88] = int(2000e6).to_bytes(8, "little")
+        data[96:104] = int(1000e6).to_bytes(8, "little")
+        rpc = FakeRPC({f"Obligation{i}": bytes(data) for i in range(10)})
+        fetcher = make_fetcher(rpc)
+        adapter = KaminoAdapter("http://rpc.test", account_fetcher=fetcher)
+
+        hfs = await asyncio.gather(*(adapter.get_health_factor(f"Obligation{i}") for i in range(10)))
+        assert all(hf == pytest.approx(1.7) for hf in hfs)
+        assert len(rpc.requests) == 1
+        await adapter.close()
+        await fetcher.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,13 +1,14 @@
 """Tests for the Activity Logger — hash chain integrity"""
 import pytest
 import asyncio
+import json
 import os
 import sys
 import tempfile
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from activity_logger import ActivityLogger, ActivityEntry
+from activity_logger import ActivityLogger, ActivityEntry, LogCorruptedError, canonical_bytes
 
 
 class TestActivityLogger:
@@ -71,6 +72,495 @@ class TestActivityLogger:
         assert summary["actions"]["analyze"] == 1
 
 
+class TestGroupCommit:
+    """Test the background batched writer"""
+
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    @pytest.mark.asyncio
+    async def test_entries_share_one_commit(self):
+        logger = ActivityLogger(log_dir=self.tmpdir, agent_name="test", flush_interval=10)
+        for i in range(20):
+            await logger.log_activity("scan", {"i": i})
+        await logger.flush()
+
+        assert logger.stats["batches"] == 1
+        assert logger.stats["entries_written"] == 20
+        await logger.close()
+
+    @pytest.mark.asyncio
+    async def test_size_window_triggers_commit(self):
+        logger = ActivityLogger(log_dir=self.tmpdir, agent_name="test", flush_interval=10, max_batch=5)
+        for i in range(5):
+            await logger.log_activity("scan", {"i": i})
+        for _ in range(100):
+            if logger.stats["batches"]:
+                break
+            await asyncio.sleep(0.01)
+
+        assert logger.stats["entries_written"] == 5
+        await logger.close()
+
+    @pytest.mark.asyncio
+    async def test_logging_does_not_wait_for_disk(self):
+        logger = ActivityLogger(log_dir=self.tmpdir, agent_name="test", flush_interval=10)
+        await logger.log_activity("scan", {})
+        assert logger.stats["entries_written"] == 0
+        await logger.close()
+        assert logger.stats["entries_written"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_retried_before_later_entries(self):
+        logger = ActivityLogger(log_dir=self.tmpdir, agent_name="test", flush_interval=0.01, retry_delay=0.01)
+        append = logger._append
+        failures = []
+
+        def flaky_append(chunk):
+            if len(failures) < 2:
+                failures.append(len(chunk))
+                raise OSError("disk full")
+            append(chunk)
+
+        logger._append = flaky_append
+        await logger.log_activity("a", {})
+        await asyncio.sleep(0.02)
+        assert logger._durable_sequence == -1
+        await logger.log_activity("b", {})
+        await logger.flush()
+
+        assert len(failures) == 2
+        assert logger.stats["write_errors"] >= 2 and logger.stats["entries_written"] == 2
+        assert await logger.verify_integrity(full=True) == (True, 2)
+        await logger.close()
+
+    @pytest.mark.asyncio
+    async def test_partial_write_cut_before_retry(self, monkeypatch):
+        logger = ActivityLogger(log_dir=self.tmpdir, agent_name="test", retry_delay=0.01)
+        await logger.log_activity("a", {})
+        await logger.flush()
+
+        real_fsync = os.fsync
+        calls = []
+
+        def failing_fsync(fd):
+            calls.append(fd)
+            if len(calls) == 1:
+                raise OSError("I/O error")
+            real_fsync(fd)
+
+        monkeypatch.setattr(os, "fsync", failing_fsync)
+        await logger.log_activity("b", {})
+        await logger.flush()
+
+        assert len(calls) >= 2
+        assert await logger.verify_integrity(full=True) == (True, 2)
+        await logger.close()
+
+    @pytest.mark.asyncio
+    async def test_reopen_continues_chain(self):
+        logger = ActivityLogger(log_dir=self.tmpdir, agent_name="test")
+        await logger.log_activity("a", {})
+        last = await logger.log_activity("b", {})
+        await logger.close()
+
+        reopened = ActivityLogger(log_dir=self.tmpdir, agent_name="test")
+        entry = await reopened.log_activity("c", {})
+        assert entry.sequence == 2
+        assert entry.previous_hash == last.entry_hash
+        assert await reopened.verify_integrity() == (True, 3)
+        await reopened.close()
+
+
+class TestSegmentedLog:
+    """Test segment rotation, sidecar indexes and startup resume"""
+
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def make_logger(self, **kwargs):
+        return ActivityLogger(log_dir=self.tmpdir, agent_name="test", segment_max_entries=4, index_stride=2, **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_rotates_and_indexes_segments(self):
+        logger = self.make_logger()
+        entries = [await logger.log_activity("scan", {"i": i}) for i in range(10)]
+        await logger.close()
+
+        assert logger.segments() == [0, 1, 2]
+        first = logger.read_index(0)
+        assert first["sealed"] and first["count"] == 4
+        assert first["tail_hash"] == entries[3].entry_hash
+        assert [seq for seq, _ in first["offsets"]] == [0, 2]
+
+        with open(logger.segment_path(0), "rb") as f:
+            f.seek(first["offsets"][1][1])
+            assert json.loads(f.readline())["sequence"] == 2
+
+        last = logger.read_index(2)
+        assert last["first_sequence"] == 8 and last["count"] == 2
+        assert last["head_previous_hash"] == entries[7].entry_hash
+        assert await logger.verify_integrity() == (True, 10)
+
+    @pytest.mark.asyncio
+    async def test_resume_reads_only_last_index(self):
+        logger = self.make_logger()
+        for i in range(6):
+            last = await logger.log_activity("scan", {"i": i})
+        await logger.close()
+
+        # Earlier segments are never read on startup
+        with open(logger.segment_path(0), "w") as f:
+            f.write("not json\n")
+        reopened = self.make_logger()
+        assert reopened.sequence == 6
+        assert reopened.last_hash == last.entry_hash
+
+    @pytest.mark.asyncio
+    async def test_resume_scans_entries_after_index(self):
+        logger = self.make_logger()
+        await logger.log_activity("a", {})
+        await logger.close()
+        index = logger.read_index(0)
+
+        # Simulate a crash after the data commit but before the index update
+        entry = ActivityEntry(timestamp=1.0, action="b", details={}, previous_hash=index["tail_hash"], sequence=1)
+        entry.entry_hash = entry.compute_hash()
+        with open(logger.segment_path(0), "a") as f:
+            f.write(json.dumps(entry.to_dict()) + "\n" + '{"torn": ')
+
+        reopened = self.make_logger()
+        assert reopened.sequence == 2
+        assert reopened.last_hash == entry.entry_hash
+        assert await reopened.verify_integrity() == (True, 2)
+
+    def write_legacy_log(self, count: int) -> list[str]:
+        lines, previous_hash = [], "genesis"
+        for i in range(count):
+            entry = ActivityEntry(timestamp=1.0, action="a", details={"i": i}, previous_hash=previous_hash, sequence=i)
+            entry.entry_hash = previous_hash = entry.compute_hash()
+            lines.append(json.dumps(entry.to_dict()) + "\n")
+        return lines
+
+    @pytest.mark.asyncio
+    async def test_corrupt_line_refuses_to_resume(self):
+        lines = self.write_legacy_log(5)
+        lines[2] = "garbled\n"
+        with open(os.path.join(self.tmpdir, "test_activity.jsonl"), "w") as f:
+            f.writelines(lines)
+
+        with pytest.raises(LogCorruptedError):
+            self.make_logger()
+        # Nothing after the bad line was cut
+        with open(os.path.join(self.tmpdir, "test_activity.000000.jsonl")) as f:
+            assert f.readlines() == lines
+
+    @pytest.mark.asyncio
+    async def test_shifted_segment_refuses_to_resume(self):
+        logger = self.make_logger()
+        for i in range(3):
+            await logger.log_activity("scan", {"i": i})
+        await logger.close()
+
+        path = logger.segment_path(0)
+        data = path.read_bytes()
+        path.write_bytes(b"x" + data)  # earlier bytes shifted; index offsets now land mid-line
+        index = logger.read_index(0)
+        index["bytes"] -= 20
+        index["count"] -= 1
+        with open(logger.index_path(0), "w") as f:
+            json.dump(index, f)
+
+        with pytest.raises(LogCorruptedError):
+            self.make_logger()
+        assert path.read_bytes() == b"x" + data
+
+    @pytest.mark.asyncio
+    async def test_unchained_tail_entry_refuses_to_resume(self):
+        logger = self.make_logger()
+        await logger.log_activity("a", {})
+        await logger.close()
+
+        forked = ActivityEntry(timestamp=1.0, action="b", details={}, previous_hash="other", sequence=1)
+        forked.entry_hash = forked.compute_hash()
+        with open(logger.segment_path(0), "a") as f:
+            f.write(json.dumps(forked.to_dict()) + "\n")
+
+        with pytest.raises(LogCorruptedError):
+            self.make_logger()
+
+    @pytest.mark.asyncio
+    async def test_migrates_single_file_log(self):
+        entry = ActivityEntry(timestamp=1.0, action="a", details={}, previous_hash="genesis", sequence=0)
+        entry.entry_hash = entry.compute_hash()
+        with open(os.path.join(self.tmpdir, "test_activity.jsonl"), "w") as f:
+            f.write(json.dumps(entry.to_dict()) + "\n")
+
+        logger = self.make_logger()
+        assert logger.segments() == [0]
+        assert logger.sequence == 1 and logger.last_hash == entry.entry_hash
+        assert logger.read_index(0)["count"] == 1
+        await logger.log_activity("b", {})
+        assert await logger.verify_integrity() == (True, 2)
+        await logger.close()
+
+    @pytest.mark.asyncio
+    async def test_memory_holds_recent_window(self):
+        logger = self.make_logger(recent_entries=3)
+        for i in range(10):
+            await logger.log_activity("scan" if i % 2 else "analyze", {"i": i})
+        await logger.close()
+
+        assert [e.sequence for e in logger.entries] == [7, 8, 9]
+        assert logger.action_counts == {"analyze": 5, "scan": 5}
+
+
+class TestCheckpointedVerification:
+    """Test checkpointed and parallel hash-chain verification"""
+
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    async def make_log(self, entries: int, **kwargs) -> ActivityLogger:
+        logger = ActivityLogger(
+            log_dir=self.tmpdir, agent_name="test", segment_max_entries=5,
+            checkpoint_interval=3, checkpoint_key="secret", **kwargs,
+        )
+        for i in range(entries):
+            await logger.log_activity("scan", {"i": i})
+        await logger.flush()
+        return logger
+
+    def tamper(self, logger: ActivityLogger, segment: int, line_no: int):
+        path = logger.segment_path(segment)
+        with open(path) as f:
+            lines = f.readlines()
+        data = json.loads(lines[line_no])
+        data["details"] = {"tampered": True}
+        lines[line_no] = json.dumps(data) + "\n"
+        with open(path, "w") as f:
+            f.writelines(lines)
+
+    @pytest.mark.asyncio
+    async def test_records_signed_checkpoints(self):
+        logger = await self.make_log(12)
+        assert await logger.verify_integrity() == (True, 12)
+
+        checkpoint = logger.last_checkpoint()
+        assert checkpoint["sequence"] == 11
+        assert checkpoint["segment"] == 2
+        await logger.close()
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_checkpoint(self):
+        logger = await self.make_log(12)
+        await logger.verify_integrity()
+        # Tampering before the checkpoint isn't re-read incrementally...
+        self.tamper(logger, 0, 1)
+        for i in range(4):
+            await logger.log_activity("scan", {"i": i})
+
+        assert await logger.verify_integrity() == (True, 16)
+        # ...but a full audit still catches it
+        assert await logger.verify_integrity(full=True) == (False, 1)
+        await logger.close()
+
+    @pytest.mark.asyncio
+    async def test_resume_reports_verified_separately(self):
+        logger = await self.make_log(12)
+        await logger.verify_integrity()
+        for i in range(4):
+            await logger.log_activity("scan", {"i": i})
+
+        assert await logger.verify_integrity() == (True, 16)
+        assert logger.last_verification == {"entries": 16, "verified": 4, "resumed_from": 11}
+        summary = await logger.get_summary()
+        assert summary["entries_covered"] == 16
+        assert summary["entries_verified"] == 1  # resumes from the checkpoint at 14
+        await logger.close()
+
+    def plant_checkpoint(self, logger: ActivityLogger, offset: int):
+        checkpoint = {"sequence": 7, "entry_hash": "x", "segment": 1, "offset": offset}
+        with open(logger.checkpoint_path, "a") as f:
+            f.write(json.dumps({**checkpoint, "signature": logger._sign_checkpoint(checkpoint)}) + "\n")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("offset", [10**6, 7])
+    async def test_checkpoint_offset_off_a_line_boundary_falls_back_to_full(self, offset):
+        logger = await self.make_log(12)
+        # Past the end of the segment, or in the middle of its first line
+        self.plant_checkpoint(logger, offset)
+        assert logger.last_checkpoint()["offset"] == offset
+
+        assert await logger.verify_integrity() == (True, 12)
+        assert logger.last_verification["verified"] == 12
+        assert logger.last_verification["resumed_from"] is None
+
+        self.tamper(logger, 0, 1)
+        self.plant_checkpoint(logger, offset)
+        assert await logger.verify_integrity() == (False, 1)
+        await logger.close()
+
+    @pytest.mark.asyncio
+    async def test_detects_tampering_after_checkpoint(self):
+        logger = await self.make_log(12)
+        await logger.verify_integrity()
+        await logger.log_activity("scan", {})
+        await logger.flush()
+        self.tamper(logger, 2, 2)
+
+        assert await logger.verify_integrity() == (False, 12)
+        await logger.close()
+
+    @pytest.mark.asyncio
+    async def test_default_config_detects_tampering(self):
+        logger = ActivityLogger(log_dir=self.tmpdir, agent_name="test", segment_max_entries=5, checkpoint_interval=3)
+        for i in range(6):
+            await logger.log_activity("scan", {"i": i})
+        assert await logger.verify_integrity() == (True, 6)
+        assert not logger.checkpoint_path.exists()
+
+        # An unsigned checkpoint planted past the tampered entry is not trusted
+        with open(logger.checkpoint_path, "w") as f:
+            f.write(json.dumps({"sequence": 4, "entry_hash": "x", "segment": 0, "offset": 0, "signature": ""}) + "\n")
+        self.tamper(logger, 0, 1)
+        assert logger.last_checkpoint() is None
+        assert await logger.verify_integrity() == (False, 1)
+        await logger.close()
+
+    @pytest.mark.asyncio
+    async def test_forged_checkpoint_ignored(self):
+        logger = await self.make_log(12)
+        await logger.verify_integrity()
+        logger.checkpoint_key = "other"
+        assert logger.last_checkpoint() is None
+        assert await logger.verify_integrity() == (True, 12)
+        await logger.close()
+
+    @pytest.mark.asyncio
+    async def test_parallel_matches_sequential(self):
+        logger = await self.make_log(12)
+        assert await logger.verify_integrity(full=True, parallel=True, workers=2) == (True, 12)
+
+        self.tamper(logger, 1, 0)
+        assert await logger.verify_integrity(full=True, parallel=True, workers=2) == (False, 5)
+        await logger.close()
+
+    @pytest.mark.asyncio
+    async def test_parallel_checks_segment_boundaries(self):
+        logger = await self.make_log(12)
+        os.remove(logger.segment_path(1))
+        logger.segment_path(1).touch()
+
+        valid, count = await logger.verify_integrity(full=True, parallel=True, workers=2)
+        assert not valid and count == 5
+        await logger.close()
+
+
+class TestHashVersions:
+    """Test the canonical entry encodings and mixed-version chains"""
+
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def golden_entry(self, hash_version: int) -> ActivityEntry:
+        return ActivityEntry(
+            timestamp=1700000000.25,
+            action="risk_analysis",
+            details={"z": [1, 2.5, None, True], "a": {"y": "é", "b": 1e16, "c": -0.1}},
+            previous_hash="genesis",
+            sequence=42,
+            hash_version=hash_version,
+        )
+
+    def test_golden_hashes(self):
+        # Pinned: a change here means existing logs no longer verify
+        assert self.golden_entry(1).compute_hash() == (
+            "31e77eba8e1bec49139ca1e75d9fc09b88ee824107929b961a62b27a28be187b"
+        )
+        assert self.golden_entry(2).compute_hash() == (
+            "2aff0a51e4a14c86197f6bde28f826d77d3f8d5e1a0bcb3a99b476ba4927b51f"
+        )
+
+    def test_canonical_bytes_sorted_and_compact(self):
+        payload = {"b": {"d": 1, "c": [0.1, "é"]}, "a": 1e16}
+        assert canonical_bytes(payload) == b'{"a":1e16,"b":{"c":[0.1,"\xc3\xa9"],"d":1}}'
+        assert canonical_bytes(payload) == canonical_bytes(dict(reversed(payload.items())))
+        with pytest.raises(ValueError):
+            canonical_bytes(payload, version=3)
+
+    def test_version_is_hashed(self):
+        assert self.golden_entry(1).compute_hash() != self.golden_entry(2).compute_hash()
+        assert "hash_version" not in self.golden_entry(1).to_dict()
+        assert self.golden_entry(2).to_dict()["hash_version"] == 2
+
+    def test_stored_line_rehashes_identically(self):
+        entry = self.golden_entry(2)
+        entry.details[7] = float("inf")  # non-str key, non-finite float
+        entry.entry_hash = entry.compute_hash()
+        data = json.loads(entry.to_line())
+        reread = ActivityEntry(
+            timestamp=data["timestamp"], action=data["action"], details=data["details"],
+            previous_hash=data["previous_hash"], sequence=data["sequence"],
+            hash_version=data["hash_version"],
+        )
+        assert reread.details["7"] is None
+        assert reread.compute_hash() == entry.entry_hash
+
+    @pytest.mark.asyncio
+    async def test_legacy_chain_continues_under_new_version(self):
+        legacy = ActivityLogger(log_dir=self.tmpdir, agent_name="test", hash_version=1)
+        for i in range(3):
+            await legacy.log_activity("scan", {"i": i, "hf": float("nan")})
+        await legacy.close()
+
+        logger = ActivityLogger(log_dir=self.tmpdir, agent_name="test")
+        for i in range(3):
+            await logger.log_activity("scan", {"i": i})
+        await logger.close()
+
+        with open(logger.segment_path(0)) as f:
+            versions = [json.loads(line).get("hash_version", 1) for line in f]
+        assert versions == [1, 1, 1, 2, 2, 2]
+        assert await logger.verify_integrity(full=True) == (True, 6)
+
+    @pytest.mark.asyncio
+    async def test_u128_amount_falls_back_to_v1(self):
+        u128 = 2**128 - 1
+        logger = ActivityLogger(log_dir=self.tmpdir, agent_name="test")
+        await logger.log_activity("scan", {"i": 0})
+        entry = await logger.log_activity("rebalance", {"amount_raw": u128, "negative": -(2**70)})
+        await logger.log_activity("scan", {"i": 1})
+        await logger.close()
+
+        assert entry.hash_version == 1
+        with open(logger.segment_path(0)) as f:
+            lines = [json.loads(line) for line in f]
+        assert [line.get("hash_version", 1) for line in lines] == [2, 1, 2]
+        # Stored exactly, not rounded through a float
+        assert lines[1]["details"]["amount_raw"] == u128
+
+        reopened = ActivityLogger(log_dir=self.tmpdir, agent_name="test")
+        assert await reopened.verify_integrity(full=True) == (True, 3)
+        await reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_detects_version_downgrade(self):
+        logger = ActivityLogger(log_dir=self.tmpdir, agent_name="test")
+        await logger.log_activity("scan", {"i": 0})
+        await logger.close()
+
+        path = logger.segment_path(0)
+        data = json.loads(path.read_text())
+        del data["hash_version"]
+        path.write_text(json.dumps(data) + "\n")
+        assert await logger.verify_integrity(full=True) == (False, 0)
+
+    def test_rejects_unknown_version(self):
+        with pytest.raises(ValueError):
+            ActivityLogger(log_dir=self.tmpdir, agent_name="test", hash_version=9)
+
+
 class TestActivityEntry:
     """Test the ActivityEntry model"""
 
@@ -0,0 +1,138 @@
+"""Tests for the analysis result cache"""
+import json
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from analysis_cache import AnalysisCache
+from analyzer import ClaudeAnalyzer, RebalanceStrategy
+from tests.test_analyzer import make_position
+
+
+class FakeMessages:
+    """Stands in for anthropic's messages API and counts calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        text = json.dumps({
+            "strategy": "collateral_top_up",
+            "reasoning": "HF drifting toward warning",
+            "confidence": 0.8,
+            "suggested_amount_usd": 500,
+            "urgency_score": 0.4,
+        })
+        return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+
+class TestAnalysisCache:
+    def test_hit_while_inputs_unchanged(self):
+        cache = AnalysisCache()
+        position = make_position(health_factor=1.32)
+        cache.put(position, "result")
+
+        assert cache.get(make_position(health_factor=1.33)) == "result"
+        assert cache.stats["hits"] == 1
+
+    def test_miss_when_hf_moves_beyond_delta(self):
+        cache = AnalysisCache(hf_bucket=1.0, hf_delta=0.05)
+        cache.put(make_position(health_factor=1.30), "result")
+
+        assert cache.get(make_position(health_factor=1.40)) is None
+        assert cache.stats["hf_moved"] == 1
+        assert len(cache) == 0
+
+    def test_miss_when_composition_changes(self):
+        cache = AnalysisCache()
+        cache.put(make_position(health_factor=1.3, collateral=10000, debt=5000), "result")
+
+        assert cache.get(make_position(health_factor=1.3, collateral=10000, debt=8000)) is None
+        assert cache.stats["changed"] == 1
+
+    def test_miss_when_market_context_changes(self):
+        cache = AnalysisCache()
+        position = make_position(health_factor=1.3)
+        cache.put(position, "result", market_context="SOL -2%")
+
+        assert cache.get(position, market_context="SOL -2%") == "result"
+        assert cache.get(position, market_context="SOL -15%") is None
+
+    def test_ttl_expiry(self, monkeypatch):
+        import analysis_cache
+        now = [1000.0]
+        monkeypatch.setattr(analysis_cache.time, "monotonic", lambda: now[0])
+
+        cache = AnalysisCache(ttl_seconds=60)
+        position = make_position(health_factor=1.3)
+        cache.put(position, "result")
+        now[0] += 61
+
+        assert cache.get(position) is None
+        assert cache.stats["expired"] == 1
+
+    def test_lru_eviction(self):
+        cache = AnalysisCache(max_entries=2)
+        positions = []
+        for i in range(3):
+            position = make_position(health_factor=1.3)
+            position.obligation_key = f"ob{i}"
+            positions.append(position)
+
+        cache.put(positions[0], "r0")
+        cache.put(positions[1], "r1")
+        cache.get(positions[0])  # ob0 is now most recent
+        cache.put(positions[2], "r2")
+
+        assert cache.get(positions[1]) is None
+        assert cache.get(positions[0]) == "r0"
+        assert cache.stats["evictions"] == 1
+
+    def test_zero_debt_position(self):
+        cache = AnalysisCache()
+        position = make_position(health_factor=float("inf"), debt=0)
+        cache.put(position, "result")
+        assert cache.get(position) == "result"
+
+
+class TestAnalyzerCaching:
+    @pytest.mark.asyncio
+    async def test_unchanged_position_skips_api(self):
+        analyzer = ClaudeAnalyzer(api_key="test-key", cache=AnalysisCache())
+        analyzer.client = SimpleNamespace(messages=FakeMessages())
+        position = make_position(health_factor=1.35)
+
+        first = await analyzer.analyze_position(position)
+        second = await analyzer.analyze_position(make_position(health_factor=1.36))
+
+        assert first.strategy == RebalanceStrategy.COLLATERAL_TOP_UP
+        assert second is first
+        assert analyzer.client.messages.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_singleton_batch_counts_one_miss(self):
+        analyzer = ClaudeAnalyzer(api_key="test-key", cache=AnalysisCache())
+        analyzer.client = SimpleNamespace(messages=FakeMessages())
+
+        await analyzer.analyze_positions([make_position(health_factor=1.35)])
+        assert analyzer.cache.stats["misses"] == 1
+        assert analyzer.client.messages.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_call_not_cached(self):
+        analyzer = ClaudeAnalyzer(api_key="test-key", cache=AnalysisCache())
+
+        async def fail(**kwargs):
+            raise RuntimeError("overloaded")
+
+        analyzer.client = SimpleNamespace(messages=SimpleNamespace(create=fail))
+        await analyzer.analyze_position(make_position(health_factor=1.35))
+        assert len(analyzer.cache) == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
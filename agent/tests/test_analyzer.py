@@ -1,12 +1,16 @@
 """Tests for the Claude AI Risk Analyzer"""
+import asyncio
+import json
 import pytest
 import sys
 import os
+import time
+from types import SimpleNamespace
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from protocols.base import PositionData, Protocol, RiskLevel, CollateralPosition, DebtPosition
-from analyzer import ClaudeAnalyzer, RebalanceStrategy, AnalysisResult
+from analyzer import ClaudeAnalyzer, RebalanceStrategy, AnalysisResult, thresholds_block
 
 
 def make_position(health_factor: float, collateral: float = 10000, debt: float = 5000) -> PositionData:
@@ -145,5 +149,192 @@ class TestRiskClassification:
         assert position.risk_level == RiskLevel.EMERGENCY
 
 
+class SlowMessages:
+    """Async messages API stand-in that takes `delay` seconds per call"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def create(self, **kwargs):
+        await asyncio.sleep(self.delay)
+        text = json.dumps({"strategy": "no_action", "reasoning": "ok", "confidence": 0.9})
+        return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+
+class TestAsyncAnalysis:
+    """Test concurrency, timeouts and backpressure of the async analyzer"""
+
+    @pytest.mark.asyncio
+    async def test_analyses_overlap_up_to_limit(self):
+        analyzer = ClaudeAnalyzer(api_key="test-key", max_concurrent=10)
+        analyzer.client = SimpleNamespace(messages=SlowMessages(0.05))
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            analyzer.analyze_position(make_position(health_factor=1.3)) for _ in range(50)
+        ))
+        elapsed = time.perf_counter() - start
+
+        assert len(results) == 50
+        assert all(r.strategy == RebalanceStrategy.NO_ACTION for r in results)
+        assert analyzer.stats["max_in_flight"] == 10
+        assert elapsed < 1.0  # sequential would take 2.5s
+
+    @pytest.mark.asyncio
+    async def test_timeout_falls_back(self):
+        analyzer = ClaudeAnalyzer(api_key="test-key", timeout_seconds=0.05)
+        analyzer.client = SimpleNamespace(messages=SlowMessages(1.0))
+
+        result = await analyzer.analyze_position(make_position(health_factor=1.02))
+
+        assert result.strategy == RebalanceStrategy.EMERGENCY_UNWIND
+        assert analyzer.stats["timeouts"] == 1
+        assert analyzer.get_stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_sheds_when_queue_full(self):
+        analyzer = ClaudeAnalyzer(api_key="test-key", max_concurrent=1, max_queued=1)
+        analyzer.client = SimpleNamespace(messages=SlowMessages(0.05))
+
+        await asyncio.gather(*(
+            analyzer.analyze_position(make_position(health_factor=1.3)) for _ in range(3)
+        ))
+
+        assert analyzer.stats["shed"] == 1
+        assert analyzer.analysis_count == 2
+        assert analyzer.get_stats()["queued"] == 0
+
+
+class BatchMessages:
+    """Answers batch prompts with recommendations for the given keys only"""
+
+    def __init__(self, answer_keys=None, text=None):
+        self.answer_keys = answer_keys
+        self.text = text
+        self.requests = []
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        if self.text is not None:
+            return SimpleNamespace(content=[SimpleNamespace(text=self.text)])
+        entries = [
+            {"position_key": key, "strategy": "debt_repayment", "reasoning": f"repay {key}",
+             "confidence": 0.85, "suggested_amount_usd": 100, "urgency_score": 0.7}
+            for key in self.answer_keys
+        ]
+        return SimpleNamespace(content=[SimpleNamespace(text="Here you go:\n" + json.dumps(entries))])
+
+
+def keyed_positions(n: int, health_factor: float = 1.15) -> list[PositionData]:
+    positions = []
+    for i in range(n):
+        position = make_position(health_factor=health_factor)
+        position.obligation_key = f"Obligation{i}"
+        positions.append(position)
+    return positions
+
+
+class TestBatchAnalysis:
+    """Test multi-position batch prompts"""
+
+    @pytest.mark.asyncio
+    async def test_packs_positions_into_batches(self):
+        positions = keyed_positions(5)
+        messages = BatchMessages(answer_keys=[p.obligation_key for p in positions])
+        analyzer = ClaudeAnalyzer(api_key="test-key", batch_size=3)
+        analyzer.client = SimpleNamespace(messages=messages)
+
+        results = await analyzer.analyze_positions(positions)
+
+        assert len(messages.requests) == 2
+        assert [r.position_key for r in results] == [p.obligation_key for p in positions]
+        assert all(r.strategy == RebalanceStrategy.DEBT_REPAYMENT for r in results)
+        assert "position_key" in "".join(block["text"] for block in messages.requests[0]["system"])
+        assert "Obligation2" in messages.requests[0]["messages"][0]["content"]
+        assert analyzer.stats["batches"] == 2
+
+    @pytest.mark.asyncio
+    async def test_missing_entry_falls_back(self):
+        positions = keyed_positions(3, health_factor=1.02)
+        analyzer = ClaudeAnalyzer(api_key="test-key", batch_size=3)
+        analyzer.client = SimpleNamespace(messages=BatchMessages(answer_keys=["Obligation0", "Obligation2"]))
+
+        results = await analyzer.analyze_positions(positions)
+
+        assert results[0].strategy == RebalanceStrategy.DEBT_REPAYMENT
+        assert results[1].strategy == RebalanceStrategy.EMERGENCY_UNWIND
+        assert results[1].confidence == 0.9  # rule-based
+        assert results[2].reasoning == "repay Obligation2"
+        assert analyzer.stats["batch_missing"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unparseable_reply_falls_back_per_position(self):
+        positions = keyed_positions(2, health_factor=1.3)
+        analyzer = ClaudeAnalyzer(api_key="test-key", batch_size=5)
+        analyzer.client = SimpleNamespace(messages=BatchMessages(text="[not json"))
+
+        results = await analyzer.analyze_positions(positions)
+
+        assert [r.strategy for r in results] == [RebalanceStrategy.COLLATERAL_TOP_UP] * 2
+
+    @pytest.mark.asyncio
+    async def test_single_position_uses_regular_prompt(self):
+        analyzer = ClaudeAnalyzer(api_key="test-key", batch_size=5)
+        analyzer.client = SimpleNamespace(messages=SlowMessages(0))
+
+        results = await analyzer.analyze_positions(keyed_positions(1))
+
+        assert results[0].strategy == RebalanceStrategy.NO_ACTION
+        assert analyzer.stats["batches"] == 0
+
+
+class UsageMessages:
+    """Records requests and reports token usage like the real API"""
+
+    def __init__(self):
+        self.requests = []
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        usage = SimpleNamespace(input_tokens=300, output_tokens=150)
+        text = json.dumps({"strategy": "no_action", "reasoning": "ok", "confidence": 0.9})
+        return SimpleNamespace(content=[SimpleNamespace(text=text)], usage=usage)
+
+
+class TestSystemPrompt:
+    """Test the system prompt blocks and usage accounting"""
+
+    @pytest.mark.asyncio
+    async def test_thresholds_come_from_config(self):
+        messages = UsageMessages()
+        analyzer = ClaudeAnalyzer(api_key="test-key", warn=1.6, critical=1.25, emergency=1.08)
+        analyzer.client = SimpleNamespace(messages=messages)
+
+        await analyzer.analyze_position(make_position(health_factor=1.3))
+
+        system = messages.requests[0]["system"]
+        assert system[-1]["text"] == thresholds_block(1.6, 1.25, 1.08)
+        assert "Warning: Health Factor < 1.6" in system[-1]["text"]
+        assert "Emergency: Health Factor < 1.08" in system[-1]["text"]
+        # Per-position prompt carries only dynamic content
+        assert "## Thresholds" not in messages.requests[0]["messages"][0]["content"]
+        # The prefix is below the minimum cacheable length, so no breakpoint is set
+        assert all("cache_control" not in block for block in system)
+
+    @pytest.mark.asyncio
+    async def test_records_tokens_and_latency(self):
+        analyzer = ClaudeAnalyzer(api_key="test-key")
+        analyzer.client = SimpleNamespace(messages=UsageMessages())
+
+        for hf in (1.3, 1.2, 1.1):
+            await analyzer.analyze_position(make_position(health_factor=hf))
+
+        usage = analyzer.get_stats()["usage"]
+        assert usage["calls"] == 3
+        assert usage["input_tokens"] == 900
+        assert usage["output_tokens"] == 450
+        assert usage["latency_p50_ms"] >= 0
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
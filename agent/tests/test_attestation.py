@@ -0,0 +1,174 @@
+"""Tests for Merkle-batched attestation"""
+import asyncio
+import base64
+import hashlib
+import json
+import pytest
+import sys
+import os
+import tempfile
+from types import SimpleNamespace
+
+import httpx
+from solders.hash import Hash
+from solders.transaction import Transaction
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from activity_logger import ActivityLogger
+from attestation import (
+    MEMO_PROGRAM_ID, AttestationBatcher, MemoAnchor, StubAnchor,
+    merkle_proof, merkle_root, verify_proof,
+)
+
+
+def hashes(n: int) -> list[str]:
+    return [hashlib.sha256(str(i).encode()).hexdigest() for i in range(n)]
+
+
+class FailingAnchor:
+    def __init__(self):
+        self.calls = 0
+
+    async def anchor(self, memo: str):
+        self.calls += 1
+        raise RuntimeError("blockhash not found")
+
+
+class TestMerkleTree:
+    def test_proofs_verify_for_every_leaf(self):
+        for n in range(1, 10):
+            leaves = hashes(n)
+            root = merkle_root(leaves)
+            for i, leaf in enumerate(leaves):
+                assert verify_proof(leaf, merkle_proof(leaves, i), root)
+
+    def test_wrong_leaf_or_root_rejected(self):
+        leaves = hashes(5)
+        proof = merkle_proof(leaves, 2)
+        assert not verify_proof(leaves[3], proof, merkle_root(leaves))
+        assert not verify_proof(leaves[2], proof, merkle_root(hashes(6)))
+
+    def test_root_depends_on_order(self):
+        leaves = hashes(4)
+        assert merkle_root(leaves) != merkle_root(leaves[::-1])
+
+
+class TestAttestationBatcher:
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def entries(self, start: int, n: int):
+        return [SimpleNamespace(sequence=start + i, entry_hash=h) for i, h in enumerate(hashes(start + n)[start:])]
+
+    @pytest.mark.asyncio
+    async def test_anchors_one_root_per_window(self):
+        anchor = StubAnchor()
+        batcher = AttestationBatcher(anchor, log_dir=self.tmpdir, window_seconds=0.01)
+        batcher.add(self.entries(0, 3))
+        batcher.add(self.entries(3, 2))
+        await asyncio.sleep(0.05)
+
+        assert len(anchor.anchored) == 1
+        assert anchor.anchored[0] == f"solshield:merkle:{merkle_root(hashes(5))}:0-4"
+        assert batcher.get_stats() == {"batches": 1, "entries_anchored": 5, "anchor_failures": 0, "pending": 0}
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_serves_inclusion_proofs_from_index(self):
+        batcher = AttestationBatcher(StubAnchor(), log_dir=self.tmpdir)
+        batcher.add(self.entries(0, 4))
+        first = await batcher.seal()
+        batcher.add(self.entries(4, 3))
+        await batcher.seal()
+        await batcher.close()
+
+        reloaded = AttestationBatcher(StubAnchor(), log_dir=self.tmpdir)
+        proof = reloaded.proof(5)
+        assert proof["batch"] == 1
+        assert verify_proof(proof["entry_hash"], proof["proof"], proof["root"])
+        assert reloaded.proof(2)["tx_signature"] == first["tx_signature"]
+        assert reloaded.proof(7) is None
+
+    @pytest.mark.asyncio
+    async def test_size_trigger(self):
+        anchor = StubAnchor()
+        batcher = AttestationBatcher(anchor, log_dir=self.tmpdir, window_seconds=60, max_entries=4)
+        batcher.add(self.entries(0, 4))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert len(anchor.anchored) == 1
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_anchor_rolls_into_next_batch(self):
+        batcher = AttestationBatcher(FailingAnchor(), log_dir=self.tmpdir)
+        batcher.add(self.entries(0, 2))
+        assert await batcher.seal() is None
+        assert batcher.proof(0) is None
+
+        batcher.anchor = StubAnchor()
+        batcher.add(self.entries(2, 1))
+        batch = await batcher.seal()
+        assert (batch["first_sequence"], batch["last_sequence"]) == (0, 2)
+        assert batcher.stats["anchor_failures"] == 1
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_window_retried_without_new_entries(self):
+        anchor = FailingAnchor()
+        batcher = AttestationBatcher(anchor, log_dir=self.tmpdir, window_seconds=0.01)
+        batcher.add(self.entries(0, 2))
+        await asyncio.sleep(0.05)
+        assert anchor.calls >= 2
+
+        batcher.anchor = StubAnchor()
+        await asyncio.sleep(0.05)
+        assert batcher.proof(1) is not None
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_fed_by_activity_logger(self):
+        anchor = StubAnchor()
+        batcher = AttestationBatcher(anchor, log_dir=self.tmpdir, window_seconds=60)
+        log = ActivityLogger(log_dir=self.tmpdir, agent_name="test", attestor=batcher)
+        entries = [await log.log_activity("scan", {"i": i}) for i in range(3)]
+        await log.close()
+        await batcher.close()
+
+        proof = batcher.proof(1)
+        assert proof["entry_hash"] == entries[1].entry_hash
+        assert anchor.anchored[0].startswith(f"solshield:merkle:{proof['root']}")
+
+
+class TestMemoAnchor:
+    @pytest.mark.asyncio
+    async def test_builds_unsigned_memo_transaction(self):
+        blockhash = str(Hash.default())
+
+        def rpc(request: httpx.Request) -> httpx.Response:
+            assert json.loads(request.content)["method"] == "getLatestBlockhash"
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": 1, "result": {"value": {"blockhash": blockhash}}})
+
+        sent = []
+
+        async def sign_and_send(transaction_base64: str):
+            sent.append(Transaction.from_bytes(base64.b64decode(transaction_base64)))
+            return "SIG"
+
+        payer = "So11111111111111111111111111111111111111112"
+        client = httpx.AsyncClient(transport=httpx.MockTransport(rpc))
+        anchor = MemoAnchor("http://rpc.test", payer, sign_and_send, client=client)
+
+        assert await anchor.anchor("solshield:merkle:abc:0-1") == "SIG"
+        message = sent[0].message
+        assert str(message.account_keys[0]) == payer
+        assert message.account_keys[message.instructions[0].program_id_index] == MEMO_PROGRAM_ID
+        assert bytes(message.instructions[0].data) == b"solshield:merkle:abc:0-1"
+        assert str(message.recent_blockhash) == blockhash
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,68 @@
+"""Tests for adaptive polling cadence"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from cadence import DEFAULT_INTERVALS, PollingCadence
+
+
+class TestPollingCadence:
+    def test_bucket_intervals(self):
+        cadence = PollingCadence()
+        assert cadence.observe("emergency", 1.01, now=0) == DEFAULT_INTERVALS["emergency"]
+        assert cadence.observe("critical", 1.1, now=0) == DEFAULT_INTERVALS["critical"]
+        assert cadence.observe("warning", 1.3, now=0) == DEFAULT_INTERVALS["warning"]
+        assert cadence.observe("healthy", 2.0, now=0) == DEFAULT_INTERVALS["healthy"]
+        assert cadence.observe("safe", 3.5, now=0) == DEFAULT_INTERVALS["safe"]
+        assert cadence.get_stats()["polls"] == dict.fromkeys(DEFAULT_INTERVALS, 1)
+
+    def test_falling_hf_shortens_interval(self):
+        cadence = PollingCadence(lookahead=4)
+        cadence.observe("ob1", 2.5, now=0)
+        # Falling 0.01/s, the warn bound at 1.5 is 99s away; check 4x before then
+        interval = cadence.observe("ob1", 2.49, now=1)
+        assert interval == pytest.approx(99 / 4)
+
+    def test_rising_hf_keeps_bucket_interval(self):
+        cadence = PollingCadence()
+        cadence.observe("ob1", 1.3, now=0)
+        assert cadence.observe("ob1", 1.35, now=10) == DEFAULT_INTERVALS["warning"]
+
+    def test_interval_floor(self):
+        cadence = PollingCadence()
+        cadence.observe("ob1", 1.5, now=0)
+        assert cadence.observe("ob1", 1.3, now=1) == DEFAULT_INTERVALS["emergency"]
+
+    def test_due_pops_in_time_order(self):
+        cadence = PollingCadence()
+        cadence.observe("slow", 3.5, now=0)
+        cadence.observe("fast", 1.01, now=0)
+
+        assert cadence.due(now=0.1) == []
+        assert cadence.next_due() == pytest.approx(0.4)
+        assert cadence.due(now=1) == ["fast"]
+        assert cadence.due(now=1) == []
+        assert cadence.due(now=301) == ["slow"]
+        assert len(cadence) == 0
+
+    def test_reobserve_supersedes_schedule(self):
+        cadence = PollingCadence()
+        cadence.observe("ob1", 3.5, now=0)
+        cadence.observe("ob1", 1.01, now=1)
+
+        assert cadence.due(now=2) == ["ob1"]
+        assert cadence.due(now=400) == []
+
+    def test_forget(self):
+        cadence = PollingCadence()
+        cadence.observe("ob1", 1.01, now=0)
+        cadence.forget("ob1")
+        assert cadence.due(now=10) == []
+        assert cadence.next_due() == float("inf")
+        assert cadence.get_stats()["scheduled"]["emergency"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,86 @@
+"""Tests for the tiered decision engine"""
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import decision
+from analyzer import ClaudeAnalyzer, RebalanceStrategy
+from decision import TieredDecisionEngine
+from tests.test_analyzer import BatchMessages, keyed_positions, make_position
+
+
+def make_engine(answer_keys=()):
+    messages = BatchMessages(answer_keys=list(answer_keys))
+    analyzer = ClaudeAnalyzer(api_key="test-key", batch_size=8)
+    analyzer.client = SimpleNamespace(messages=messages)
+    return TieredDecisionEngine(analyzer), messages
+
+
+class TestTieredDecisions:
+    @pytest.mark.asyncio
+    async def test_emergency_settled_by_rules(self):
+        engine, messages = make_engine()
+        result, = await engine.decide([make_position(health_factor=1.02)])
+
+        assert result.strategy == RebalanceStrategy.EMERGENCY_UNWIND
+        assert messages.requests == []
+        assert engine.counts == {"rules": 1, "llm": 0}
+
+    @pytest.mark.asyncio
+    async def test_unseen_warning_escalates(self):
+        engine, messages = make_engine(answer_keys=["Obligation0"])
+        result, = await engine.decide(keyed_positions(1, health_factor=1.35))
+
+        assert result.strategy == RebalanceStrategy.DEBT_REPAYMENT
+        assert len(messages.requests) == 1
+        assert engine.counts == {"rules": 0, "llm": 1}
+
+    @pytest.mark.asyncio
+    async def test_slow_drifting_warning_needs_no_action(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(decision.time, "monotonic", lambda: now[0])
+        engine, messages = make_engine(answer_keys=["Obligation0"])
+
+        await engine.decide(keyed_positions(1, health_factor=1.35))
+        now[0] += 3600
+        result, = await engine.decide(keyed_positions(1, health_factor=1.34))
+
+        assert result.strategy == RebalanceStrategy.NO_ACTION
+        assert not result.needs_action
+        assert len(messages.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_fast_falling_warning_escalates(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(decision.time, "monotonic", lambda: now[0])
+        engine, messages = make_engine(answer_keys=["Obligation0"])
+
+        await engine.decide(keyed_positions(1, health_factor=1.45))
+        now[0] += 600
+        await engine.decide(keyed_positions(1, health_factor=1.35))
+
+        assert len(messages.requests) == 2
+        assert engine.counts["llm"] == 2
+
+    @pytest.mark.asyncio
+    async def test_mixed_batch_keeps_order(self):
+        positions = keyed_positions(3, health_factor=1.15)
+        positions[1].health_factor = 1.01
+        engine, messages = make_engine(answer_keys=["Obligation0", "Obligation2"])
+
+        results = await engine.decide(positions)
+
+        assert [r.position_key for r in results] == ["Obligation0", "Obligation1", "Obligation2"]
+        assert results[1].strategy == RebalanceStrategy.EMERGENCY_UNWIND
+        assert len(messages.requests) == 1
+        stats = engine.get_stats()
+        assert stats["rules"]["count"] == 1
+        assert stats["llm"]["count"] == 2
+        assert stats["rules"]["latency_p50_us"] >= 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,235 @@
+"""Tests for the concurrent position fetcher"""
+import asyncio
+import base64
+import json
+import pytest
+import sys
+import os
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from protocols.accounts import AccountFetcher
+from protocols.base import ProtocolAdapter, PositionData, Protocol, RiskLevel
+from protocols.kamino import OBLIGATION_SIZE, KaminoAdapter
+from protocols.scoring import score_accounts
+from cadence import DEFAULT_INTERVALS, PollingCadence
+from fetcher import PositionFetcher, percentile, refresh_positions, score_positions
+
+
+def make_position(owner: str, key: str) -> PositionData:
+    return PositionData(
+        protocol=Protocol.KAMINO,
+        owner=owner,
+        obligation_key=key,
+        health_factor=1.8,
+        total_collateral_usd=1000,
+        total_debt_usd=400,
+        net_value_usd=600,
+        risk_level=RiskLevel.HEALTHY,
+    )
+
+
+class FakeAdapter(ProtocolAdapter):
+    """Adapter that sleeps instead of calling RPC and tracks concurrency"""
+
+    def __init__(self, name: str, delay: float = 0.05, rpc_url: str = "http://rpc-a", fail: bool = False):
+        self.name = name
+        self.delay = delay
+        self.rpc_url = rpc_url
+        self.fail = fail
+        self.inflight = 0
+        self.max_inflight = 0
+
+    async def get_positions(self, wallet_address: str) -> list[PositionData]:
+        self.inflight += 1
+        self.max_inflight = max(self.max_inflight, self.inflight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("rpc down")
+            return [make_position(wallet_address, f"{self.name}-{wallet_address}")]
+        finally:
+            self.inflight -= 1
+
+    async def get_health_factor(self, obligation_key: str) -> float:
+        return 1.8
+
+    async def get_protocol_name(self) -> str:
+        return self.name
+
+    async def parse_account(self, owner: str, account: dict) -> PositionData:
+        return make_position(owner, account["pubkey"])
+
+
+class TestPositionFetcher:
+    """Test bounded fan-out over wallets × adapters"""
+
+    @pytest.mark.asyncio
+    async def test_fetches_every_pair(self):
+        fetcher = PositionFetcher(max_inflight=8, timeout_seconds=1)
+        adapters = [FakeAdapter("kamino", delay=0.01), FakeAdapter("marginfi", delay=0.01)]
+        wallets = [f"Wallet{i}" for i in range(5)]
+
+        positions, stats = await fetcher.fetch_all(wallets, adapters)
+        assert len(positions) == 10
+        assert stats.calls == 10
+        assert stats.positions == 10
+        assert {p.obligation_key for p in positions} == {
+            f"{a.name}-{w}" for a in adapters for w in wallets
+        }
+
+    @pytest.mark.asyncio
+    async def test_cycle_time_tracks_slowest_call(self):
+        fetcher = PositionFetcher(max_inflight=64, timeout_seconds=1)
+        adapters = [FakeAdapter("kamino", delay=0.05)]
+        wallets = [f"Wallet{i}" for i in range(20)]
+
+        _, stats = await fetcher.fetch_all(wallets, adapters)
+        # Serial would be 20 × 50ms = 1s
+        assert stats.wall_time_s < 0.5
+
+    @pytest.mark.asyncio
+    async def test_inflight_bounded_globally(self):
+        fetcher = PositionFetcher(max_inflight=3, timeout_seconds=1)
+        a = FakeAdapter("kamino", delay=0.02, rpc_url="http://rpc-a")
+        b = FakeAdapter("marginfi", delay=0.02, rpc_url="http://rpc-a")
+        c = FakeAdapter("solend", delay=0.02, rpc_url="http://rpc-b")
+        wallets = [f"Wallet{i}" for i in range(10)]
+
+        peak = 0
+
+        def tracked(adapter):
+            inner = adapter.get_positions
+
+            async def get_positions(wallet):
+                nonlocal peak
+                result = asyncio.ensure_future(inner(wallet))
+                await asyncio.sleep(0)
+                peak = max(peak, a.inflight + b.inflight + c.inflight)
+                return await result
+            adapter.get_positions = get_positions
+
+        for adapter in (a, b, c):
+            tracked(adapter)
+
+        await fetcher.fetch_all(wallets, [a, b, c])
+        # Adapters on different rpc_urls still share the one cap
+        assert peak == 3
+        assert a.inflight == b.inflight == c.inflight == 0
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_error_isolated(self):
+        fetcher = PositionFetcher(max_inflight=8, timeout_seconds=0.05)
+        adapters = [
+            FakeAdapter("kamino", delay=0.01),
+            FakeAdapter("slow", delay=1.0),
+            FakeAdapter("broken", delay=0.0, fail=True),
+        ]
+
+        positions, stats = await fetcher.fetch_all(["Wallet1"], adapters)
+        assert len(positions) == 1
+        assert stats.timeouts == 1
+        assert stats.errors == 1
+
+    @pytest.mark.asyncio
+    async def test_stats_dict(self):
+        fetcher = PositionFetcher()
+        _, stats = await fetcher.fetch_all(["Wallet1"], [FakeAdapter("kamino", delay=0.0)])
+        d = stats.to_dict()
+        assert d["calls"] == 1
+        assert "kamino" in d["per_protocol"]
+        assert d["p99_ms"] >= d["p50_ms"] >= 0
+
+
+class TestPercentile:
+    """Test nearest-rank percentile helper"""
+
+    def test_empty(self):
+        assert percentile([], 50) == 0.0
+
+    def test_nearest_rank(self):
+        samples = [float(i) for i in range(1, 101)]
+        assert percentile(samples, 50) == 50.0
+        assert percentile(samples, 99) == 99.0
+        assert percentile(samples, 100) == 100.0
+
+
+def kamino_obligation(collateral_usd: float, debt_usd: float) -> bytes:
+    data = bytearray(OBLIGATION_SIZE)
+    data[72] = 1
+    data[73:105] = bytes(range(1, 33))  # deposit reserve pubkey
+    data[73 + 40:73 + 48] = int(collateral_usd * 1e6).to_bytes(8, "little")
+    data[121] = 1
+    data[122:154] = bytes(range(33, 65))  # borrow reserve pubkey
+    data[122 + 40:122 + 48] = int(debt_usd * 1e6).to_bytes(8, "little")
+    return bytes(data)
+
+
+class TestRefreshPositions:
+    """Test re-polling known positions through the adapters' parsers"""
+
+    @pytest.mark.asyncio
+    async def test_poll_matches_full_fetch(self):
+        raw = kamino_obligation(1000, 750)
+        accounts = {"Obligation1": raw}
+
+        def rpc(request: httpx.Request) -> httpx.Response:
+            keys = json.loads(request.content)["params"][0]
+            value = [
+                {"data": [base64.b64encode(accounts[k]).decode(), "base64"]} if k in accounts else None
+                for k in keys
+            ]
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": 1, "result": {"value": value}})
+
+        adapter = KaminoAdapter("http://rpc.test")
+        account_fetcher = AccountFetcher("http://rpc.test", client=httpx.AsyncClient(transport=httpx.MockTransport(rpc)))
+        full = await adapter.parse_account(
+            "Owner1", {"pubkey": "Obligation1", "account": {"data": [base64.b64encode(raw).decode(), "base64"]}},
+        )
+        known = [full, make_position("Owner1", "Gone")]
+
+        refreshed, failed = await refresh_positions(account_fetcher, {Protocol.KAMINO: adapter}, known)
+
+        assert refreshed["Obligation1"].health_factor == pytest.approx(full.health_factor)
+        assert full.health_factor == pytest.approx(1000 * 0.85 / 750)
+        assert refreshed["Gone"] is None
+        assert failed == []
+        assert score_accounts(Protocol.KAMINO, [raw]).health_factor[0] == pytest.approx(full.health_factor)
+
+        health_factors, failed = await score_positions(account_fetcher, known)
+        assert health_factors == {"Obligation1": pytest.approx(full.health_factor), "Gone": 0.0}
+        assert failed == []
+        await account_fetcher.close()
+        await adapter.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_is_not_missing_and_comes_due_again(self):
+        def rpc(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": 1, "error": {"code": -32005, "message": "busy"}})
+
+        adapter = KaminoAdapter("http://rpc.test")
+        account_fetcher = AccountFetcher("http://rpc.test", client=httpx.AsyncClient(transport=httpx.MockTransport(rpc)))
+        cadence = PollingCadence()
+        cadence.observe("Obligation1", 1.1, now=0)
+        due = cadence.due(now=DEFAULT_INTERVALS["critical"])
+        assert due == ["Obligation1"]
+
+        refreshed, failed = await refresh_positions(
+            account_fetcher, {Protocol.KAMINO: adapter}, [make_position("Owner1", "Obligation1")]
+        )
+        assert refreshed == {}
+        assert failed == ["Obligation1"]
+
+        # Retried on the critical tier, not dropped until the next discovery
+        now = DEFAULT_INTERVALS["critical"]
+        assert cadence.retry("Obligation1", now=now) == DEFAULT_INTERVALS["critical"]
+        assert cadence.due(now=now + DEFAULT_INTERVALS["critical"]) == ["Obligation1"]
+        assert cadence.get_stats()["polls"]["critical"] == 1
+        await account_fetcher.close()
+        await adapter.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,105 @@
+"""Tests for precompiled account layouts"""
+import base64
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from protocols.layouts import (
+    decode_kamino_obligation, decode_kamino_totals, decode_marginfi_balances,
+    decode_solend_deposits, decode_solend_values,
+)
+from protocols.kamino import OBLIGATION_SIZE as KAMINO_SIZE
+from protocols.marginfi import MARGIN_ACCOUNT_SIZE
+from protocols.solend import SolendAdapter, OBLIGATION_SIZE as SOLEND_SIZE
+
+
+def u64(value: int) -> bytes:
+    return value.to_bytes(8, "little")
+
+
+def u128(value: int) -> bytes:
+    return value.to_bytes(16, "little")
+
+
+class TestKaminoLayout:
+    def test_decodes_deposits_and_borrows(self):
+        data = bytearray(KAMINO_SIZE)
+        data[72] = 2
+        data[73:105] = b"\x01" * 32
+        data[105:121] = u64(5) + u64(2_000_000)
+        data[153:169] = u64(7) + u64(3_000_000)
+        data[169] = 1
+        data[170 + 32:170 + 48] = u64(9) + u64(1_000_000)
+
+        deposits, borrows = decode_kamino_obligation(bytes(data))
+        assert deposits == [(b"\x01" * 32, 5, 2_000_000), (bytes(32), 7, 3_000_000)]
+        assert borrows == [(bytes(32), 9, 1_000_000)]
+
+    def test_truncated_entries_are_dropped(self):
+        data = bytearray(73 + 48 + 20)
+        data[72] = 3
+        deposits, borrows = decode_kamino_obligation(bytes(data))
+        assert len(deposits) == 1
+        assert borrows == []
+
+    def test_short_buffer(self):
+        assert decode_kamino_obligation(b"\x00" * 40) == ([], [])
+
+    def test_totals(self):
+        data = bytearray(KAMINO_SIZE)
+        data[80:88] = u64(11)
+        data[96:104] = u64(22)
+        assert decode_kamino_totals(memoryview(data)) == (11, 22)
+
+
+class TestMarginFiLayout:
+    def test_only_active_balances(self):
+        data = bytearray(MARGIN_ACCOUNT_SIZE)
+        second = 72 + 65
+        data[second] = 1
+        data[second + 33:second + 65] = u64(1) + u64(2) + u64(3) + u64(4)
+
+        assert decode_marginfi_balances(bytes(data)) == [(1, bytes(32), 1, 2, 3, 4)]
+
+    def test_short_buffer(self):
+        assert decode_marginfi_balances(b"\x00" * 50) == []
+
+
+class TestSolendLayout:
+    def test_u128_values_and_deposits(self):
+        data = bytearray(SOLEND_SIZE)
+        data[66:98] = u64(5) + u64(1) + u64(7) + u64(0)
+        data[130] = 1
+        data[131:131 + 4] = b"\xaa\xbb\xcc\xdd"
+        data[163:179] = u64(4_000_000_000) + u64(250_000_000)
+
+        assert decode_solend_values(bytes(data)) == ((1 << 64) + 5, 7)
+        assert decode_solend_deposits(bytes(data)) == [
+            (b"\xaa\xbb\xcc\xdd" + bytes(28), 4_000_000_000, 250_000_000),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_parse_obligation_reads_deposit_amount(self):
+        """Deposit amounts decode instead of failing the whole obligation"""
+        data = bytearray(SOLEND_SIZE)
+        data[66:98] = u128(2000 * 10**18) + u128(1000 * 10**18)
+        data[130] = 1
+        data[163:179] = u64(4_000_000_000) + u64(250_000_000)
+
+        adapter = SolendAdapter("http://localhost")
+        position = await adapter._parse_obligation("wallet", {
+            "pubkey": "obligation",
+            "account": {"data": [base64.b64encode(bytes(data)).decode(), "base64"]},
+        })
+        await adapter.close()
+
+        assert position is not None
+        assert position.health_factor == pytest.approx(1.7)
+        assert position.collaterals[0].amount == pytest.approx(4.0)
+        assert position.collaterals[0].value_usd == pytest.approx(250.0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,85 @@
+"""Tests for the incremental position store"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from position_store import PositionStore
+from protocols.base import DebtPosition, RiskLevel
+from tests.test_table import make_position
+
+
+class TestPositionStore:
+    def test_first_fetch_reports_everything(self):
+        store = PositionStore()
+        diff = store.apply([make_position("ob1"), make_position("ob2")])
+
+        assert [p.obligation_key for p in diff.added] == ["ob1", "ob2"]
+        assert diff.changed == [] and diff.unchanged == 0
+        assert len(store) == 2
+
+    def test_steady_state_reports_nothing(self):
+        store = PositionStore(hf_delta=0.02)
+        store.apply([make_position("ob1", hf=1.30)])
+        diff = store.apply([make_position("ob1", hf=1.31)])
+
+        assert diff.dirty == []
+        assert diff.to_dict() == {"added": 0, "changed": 0, "removed": 0, "unchanged": 1}
+
+    def test_slow_drift_accumulates_against_baseline(self):
+        store = PositionStore(hf_delta=0.02)
+        store.apply([make_position("ob1", hf=1.30)])
+        assert store.apply([make_position("ob1", hf=1.29)]).dirty == []
+        assert store.apply([make_position("ob1", hf=1.285)]).dirty == []
+
+        diff = store.apply([make_position("ob1", hf=1.27)])
+        assert [p.obligation_key for p in diff.changed] == ["ob1"]
+        assert store.table["ob1"].health_factor == pytest.approx(1.27)
+
+    def test_risk_level_change(self):
+        store = PositionStore()
+        store.apply([make_position("ob1", hf=1.5)])
+        position = make_position("ob1", hf=1.5)
+        position.risk_level = RiskLevel.WARNING
+        assert store.apply([position]).changed == [position]
+
+    def test_composition_change(self):
+        store = PositionStore()
+        store.apply([make_position("ob1")])
+        position = make_position("ob1")
+        position.debts = [DebtPosition("BONKmint...", "BONK", 1e9, 1000, 0.2)]
+        assert store.apply([position]).changed == [position]
+
+    def test_value_change(self):
+        store = PositionStore(value_delta=0.05)
+        store.apply([make_position("ob1")])
+        position = make_position("ob1")
+        position.total_debt_usd = 1100
+        assert store.apply([position]).changed == [position]
+
+    def test_stale_position_rereported(self):
+        store = PositionStore(max_age_seconds=300)
+        store.apply([make_position("ob1")])
+        position = make_position("ob1")
+        position.timestamp += 301
+        assert store.apply([position]).changed == [position]
+
+    def test_missing_positions_removed(self):
+        store = PositionStore()
+        store.apply([make_position("ob1"), make_position("ob2")])
+        diff = store.apply([make_position("ob2")])
+
+        assert diff.removed == ["ob1"]
+        assert "ob1" not in store.table
+        assert store.apply([make_position("ob1"), make_position("ob2")]).added[0].obligation_key == "ob1"
+
+    def test_mark_updates_baseline(self):
+        store = PositionStore(hf_delta=0.02)
+        store.apply([make_position("ob1", hf=1.30)])
+        store.mark(make_position("ob1", hf=1.10))
+        assert store.apply([make_position("ob1", hf=1.11)]).dirty == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
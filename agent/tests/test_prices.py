@@ -0,0 +1,151 @@
+"""Tests for price feeds and health-factor repricing"""
+import base64
+import struct
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+
+from solders.pubkey import Pubkey
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from protocols.kamino import KaminoAdapter
+from protocols.layouts import decode_pyth_price
+from protocols.prices import PriceFeed, PriceTracker, PythPriceFeed, StaticPriceFeed
+from tests.test_fetcher import kamino_obligation
+from tests.test_table import make_position
+
+
+def pyth_account(price: int, exponent: int, status: int = 1) -> bytes:
+    data = bytearray(240)
+    struct.pack_into("<I", data, 0, 0xA1B2C3D4)
+    struct.pack_into("<i", data, 20, exponent)
+    struct.pack_into("<qQI", data, 208, price, 10, status)
+    return bytes(data)
+
+
+class TestPythLayout:
+    def test_decodes_aggregate_price(self):
+        assert decode_pyth_price(pyth_account(14_250_000_000, -8)) == pytest.approx(142.5)
+
+    def test_rejects_bad_accounts(self):
+        assert decode_pyth_price(pyth_account(1, -8, status=0)) is None
+        assert decode_pyth_price(b"\x00" * 240) is None
+        assert decode_pyth_price(b"\x00" * 16) is None
+
+
+class TestPythPriceFeed:
+    @pytest.mark.asyncio
+    async def test_reads_all_oracles_in_one_call(self):
+        calls = []
+
+        async def get_accounts(keys):
+            calls.append(keys)
+            return {"oracleSOL": pyth_account(15_000_000_000, -8), "oracleBAD": None}
+
+        fetcher = SimpleNamespace(start_cycle=lambda: None, get_accounts=get_accounts)
+        feed = PythPriceFeed(fetcher, {"SOLmint...": "oracleSOL", "BADmint...": "oracleBAD"})
+
+        assert await feed.read() == {"SOLmint...": pytest.approx(150.0)}
+        assert calls == [["oracleSOL", "oracleBAD"]]
+
+
+class TestPriceTracker:
+    def tracker_with_position(self):
+        # SOL 1500 + USDC 500 collateral, USDT 1000 debt, read at HF 1.7
+        tracker = PriceTracker()
+        tracker.update({"SOLmint...": 150.0, "USDCmint...": 1.0, "USDTmint...": 1.0})
+        tracker.track(make_position("ob1", hf=1.7))
+        return tracker
+
+    def test_collateral_price_drop_lowers_hf(self):
+        tracker = self.tracker_with_position()
+        repriced = tracker.update({"SOLmint...": 75.0})
+
+        # Weighted collateral 1275 + 450 → 637.5 + 450
+        assert repriced == {"ob1": pytest.approx(1.7 * (637.5 + 450) / (1275 + 450))}
+
+    def test_debt_price_rise_lowers_hf(self):
+        tracker = self.tracker_with_position()
+        repriced = tracker.update({"USDTmint...": 1.25})
+        assert repriced["ob1"] == pytest.approx(1.7 / 1.25)
+
+    def test_unrelated_or_tiny_moves_skip_positions(self):
+        tracker = self.tracker_with_position()
+        assert tracker.update({"BONKmint...": 0.00002}) == {}
+        assert tracker.update({"SOLmint...": 150.01}) == {}
+        assert tracker.stats["repriced"] == 0
+
+    def test_first_price_after_read_is_reference(self):
+        tracker = PriceTracker()
+        tracker.track(make_position("ob1", hf=1.7))
+        assert tracker.update({"SOLmint...": 150.0}) == {"ob1": pytest.approx(1.7)}
+        assert tracker.update({"SOLmint...": 300.0})["ob1"] > 1.7
+
+    def test_retrack_resets_reference(self):
+        tracker = self.tracker_with_position()
+        tracker.update({"SOLmint...": 75.0})
+        tracker.track(make_position("ob1", hf=1.2))
+        assert tracker.health_factor("ob1") == pytest.approx(1.2)
+
+    def test_reprice_scales_values_consistently_with_hf(self):
+        tracker = self.tracker_with_position()
+        tracker.update({"SOLmint...": 75.0, "USDTmint...": 1.25})
+        position = make_position("ob1", hf=1.7)
+        repriced = tracker.reprice(position)
+
+        assert [c.value_usd for c in repriced.collaterals] == pytest.approx([750, 500])
+        assert [d.value_usd for d in repriced.debts] == pytest.approx([1250])
+        assert repriced.total_collateral_usd == pytest.approx(1250)
+        assert repriced.total_debt_usd == pytest.approx(1250)
+        assert repriced.net_value_usd == pytest.approx(0)
+        assert repriced.health_factor == pytest.approx(tracker.health_factor("ob1"))
+        # The HF moved by the same ratio as the repriced weighted collateral over debt
+        weighted = sum(c.value_usd * c.liquidation_threshold for c in repriced.collaterals)
+        before = sum(c.value_usd * c.liquidation_threshold for c in position.collaterals)
+        assert repriced.health_factor == pytest.approx(1.7 * (weighted / before) / (1250 / 1000))
+        # Scaled from the read-time values, so repricing a repriced copy doesn't compound
+        assert tracker.reprice(repriced) == repriced
+        assert position.collaterals[0].value_usd == 1500
+
+    def test_untrack(self):
+        tracker = self.tracker_with_position()
+        tracker.untrack("ob1")
+        assert len(tracker) == 0
+        assert tracker.update({"SOLmint...": 10.0}) == {}
+
+
+class TestAdapterPositions:
+    @pytest.mark.asyncio
+    async def test_reprices_by_reserve_address(self):
+        adapter = KaminoAdapter("http://rpc.test")
+        raw = base64.b64encode(kamino_obligation(1000, 750)).decode()
+        position = await adapter.parse_account("Owner1", {"pubkey": "ob1", "account": {"data": [raw, "base64"]}})
+        deposit_reserve = str(Pubkey.from_bytes(bytes(range(1, 33))))
+        borrow_reserve = str(Pubkey.from_bytes(bytes(range(33, 65))))
+        assert [c.reserve for c in position.collaterals] == [deposit_reserve]
+        assert [d.reserve for d in position.debts] == [borrow_reserve]
+
+        tracker = PriceTracker()
+        tracker.update({deposit_reserve: 150.0, borrow_reserve: 1.0})
+        tracker.track(position)
+        repriced = tracker.update({deposit_reserve: 120.0})
+        assert repriced == {"ob1": pytest.approx(position.health_factor * 0.8)}
+        await adapter.close()
+
+    def test_feed_is_abstract(self):
+        with pytest.raises(TypeError):
+            PriceFeed()
+
+
+class TestStaticPriceFeed:
+    @pytest.mark.asyncio
+    async def test_set_price(self):
+        feed = StaticPriceFeed({"SOLmint...": 150.0})
+        feed.set_price("SOLmint...", 140.0)
+        assert await feed.read() == {"SOLmint...": 140.0}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,199 @@
+"""Tests for the multi-endpoint RPC router against local stub servers"""
+import asyncio
+import pytest
+import sys
+import os
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import SolanaConfig
+from protocols.router import EndpointUnavailable, RPCRouter
+from protocols.rpc import RPCClient
+
+
+class StubRPC:
+    """Local JSON-RPC server with configurable delay and failure status"""
+
+    def __init__(self, name: str, delay: float = 0.0, status: int = 200):
+        self.name = name
+        self.delay = delay
+        self.status = status
+        self.hits = 0
+        self.inflight = 0
+        self.peak_inflight = 0
+        self._runner = None
+        self.url = ""
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.hits += 1
+        self.inflight += 1
+        self.peak_inflight = max(self.peak_inflight, self.inflight)
+        body = await request.json()
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.inflight -= 1
+        if self.status != 200:
+            return web.json_response({"error": "unavailable"}, status=self.status)
+        return web.json_response({"jsonrpc": "2.0", "id": body["id"], "result": self.name})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/", self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/"
+        return self
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+
+def payload(method: str = "getAccountInfo") -> dict:
+    return {"jsonrpc": "2.0", "id": 1, "method": method, "params": ["Key"]}
+
+
+class TestRPCRouter:
+    """Test endpoint scoring, failover and hedging"""
+
+    @pytest.mark.asyncio
+    async def test_prefers_fastest_endpoint(self):
+        slow = await StubRPC("slow", delay=0.05).start()
+        fast = await StubRPC("fast", delay=0.0).start()
+        router = RPCRouter([slow.url, fast.url], client=RPCClient(http2=False))
+
+        # Warm both endpoints, then the fast one should take the traffic
+        for _ in range(2):
+            for url in (slow.url, fast.url):
+                await router._send(url, payload())
+        results = [(await router.post(json=payload())).json()["result"] for _ in range(5)]
+        assert results == ["fast"] * 5
+        assert router.ranked()[0] == fast.url
+
+        await router.client.aclose()
+        await slow.stop()
+        await fast.stop()
+
+    @pytest.mark.asyncio
+    async def test_fails_over_and_benches_bad_endpoint(self):
+        broken = await StubRPC("broken", status=503).start()
+        good = await StubRPC("good").start()
+        router = RPCRouter(
+            [broken.url, good.url],
+            client=RPCClient(http2=False),
+            default_latency=0.001,
+            max_consecutive_errors=2,
+        )
+        # Make the broken endpoint look fastest initially
+        router.scores[good.url].ewma_latency = 1.0
+
+        for _ in range(3):
+            response = await router.post(json=payload())
+            assert response.json()["result"] == "good"
+
+        assert router.stats["failovers"] >= 1
+        assert not router.scores[broken.url].healthy
+        assert router.ranked()[-1] == broken.url
+        assert broken.hits == 2
+
+        await router.client.aclose()
+        await broken.stop()
+        await good.stop()
+
+    @pytest.mark.asyncio
+    async def test_all_endpoints_down_raises(self):
+        a = await StubRPC("a", status=500).start()
+        b = await StubRPC("b", status=429).start()
+        router = RPCRouter([a.url, b.url], client=RPCClient(http2=False))
+        with pytest.raises(EndpointUnavailable, match=r"HTTP (429|500)"):
+            await router.post(json=payload())
+        await router.client.aclose()
+        await a.stop()
+        await b.stop()
+
+    @pytest.mark.asyncio
+    async def test_hedged_read_beats_stalled_primary(self):
+        stalled = await StubRPC("stalled", delay=1.0).start()
+        quick = await StubRPC("quick", delay=0.0).start()
+        router = RPCRouter(
+            [stalled.url, quick.url],
+            client=RPCClient(http2=False),
+            hedge_reads=True,
+            hedge_min_delay=0.02,
+            default_latency=0.02,
+        )
+        router.scores[quick.url].ewma_latency = 0.5  # primary looks better on paper
+
+        start = asyncio.get_running_loop().time()
+        response = await router.post(json=payload("getProgramAccounts"))
+        elapsed = asyncio.get_running_loop().time() - start
+
+        assert response.json()["result"] == "quick"
+        assert elapsed < 0.5
+        assert router.stats["hedges"] == 1
+        assert router.stats["hedge_wins"] == 1
+
+        await router.client.aclose()
+        await stalled.stop()
+        await quick.stop()
+
+    @pytest.mark.asyncio
+    async def test_writes_are_never_hedged(self):
+        stalled = await StubRPC("stalled", delay=0.1).start()
+        quick = await StubRPC("quick").start()
+        router = RPCRouter(
+            [stalled.url, quick.url],
+            client=RPCClient(http2=False),
+            hedge_reads=True,
+            hedge_min_delay=0.01,
+            default_latency=0.01,
+        )
+        router.scores[quick.url].ewma_latency = 0.5
+
+        response = await router.post(json=payload("sendTransaction"))
+        assert response.json()["result"] == "stalled"
+        assert quick.hits == 0
+        assert router.stats["hedges"] == 0
+
+        await router.client.aclose()
+        await stalled.stop()
+        await quick.stop()
+
+    @pytest.mark.asyncio
+    async def test_inflight_capped_per_endpoint(self):
+        a = await StubRPC("a", delay=0.05).start()
+        b = await StubRPC("b", delay=0.05).start()
+        router = RPCRouter([a.url, b.url], client=RPCClient(http2=False), max_inflight_per_endpoint=2)
+
+        await asyncio.gather(*(router._send(url, payload()) for url in (a.url, b.url) for _ in range(5)))
+        # Each endpoint is limited on its own; one saturated endpoint doesn't hold back the other
+        assert a.peak_inflight == 2
+        assert b.peak_inflight == 2
+        assert a.hits == b.hits == 5
+
+        await router.client.aclose()
+        await a.stop()
+        await b.stop()
+
+    def test_requires_endpoints(self):
+        with pytest.raises(ValueError):
+            RPCRouter([])
+
+    def test_endpoint_list_sets_primary_rpc_url(self):
+        single = SolanaConfig(rpc_url="https://fallback", rpc_urls=["https://only"])
+        assert single.rpc_url == "https://only"
+
+        several = SolanaConfig(rpc_url="https://fallback", rpc_urls=["https://a", "https://b"])
+        assert several.rpc_url == "https://a"
+
+        unset = SolanaConfig(rpc_url="https://fallback", rpc_urls=[])
+        assert unset.rpc_url == "https://fallback"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,175 @@
+"""Tests for the shared pooled RPC client"""
+import asyncio
+import json
+import pytest
+import sys
+import os
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from protocols.rpc import RPCBatcher, RPCClient, endpoint_key, percentile
+from protocols.kamino import KaminoAdapter
+from executor import RebalanceExecutor
+
+
+def slow_transport(delay: float = 0.02, status: int = 200) -> httpx.AsyncBaseTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(delay)
+        return httpx.Response(status, json={"jsonrpc": "2.0", "id": 1, "result": []})
+    return httpx.MockTransport(handler)
+
+
+class TestRPCClient:
+    """Test per-endpoint metrics and pool bounds"""
+
+    @pytest.mark.asyncio
+    async def test_metrics_per_endpoint(self):
+        rpc = RPCClient(transport=slow_transport(0.0), http2=False)
+        await rpc.post("https://rpc-a.test/?api-key=SECRET", json={})
+        await rpc.post("https://rpc-a.test/?api-key=SECRET", json={})
+        await rpc.get("https://quote.test/v6/quote")
+
+        metrics = rpc.get_metrics()
+        assert set(metrics) == {"https://rpc-a.test", "https://quote.test"}
+        assert metrics["https://rpc-a.test"]["requests"] == 2
+        assert metrics["https://rpc-a.test"]["in_flight"] == 0
+        assert "SECRET" not in str(metrics)
+        await rpc.aclose()
+
+    @pytest.mark.asyncio
+    async def test_inflight_capped_and_queue_wait_recorded(self):
+        rpc = RPCClient(max_connections=2, transport=slow_transport(0.02), http2=False)
+        await asyncio.gather(*(rpc.post("https://rpc.test", json={}) for _ in range(6)))
+
+        m = rpc.metrics["https://rpc.test"]
+        assert m.max_in_flight == 2
+        assert m.requests == 6
+        assert max(m.queue_waits) >= 0.03
+        d = m.to_dict()
+        assert d["latency_p99_ms"] >= d["latency_p50_ms"] >= 15
+        await rpc.aclose()
+
+    @pytest.mark.asyncio
+    async def test_errors_counted(self):
+        def failing(request):
+            raise httpx.ConnectError("refused")
+
+        rpc = RPCClient(transport=httpx.MockTransport(failing), http2=False)
+        with pytest.raises(httpx.ConnectError):
+            await rpc.post("https://rpc.test", json={})
+        assert rpc.metrics["https://rpc.test"].errors == 1
+        assert rpc.metrics["https://rpc.test"].in_flight == 0
+        await rpc.aclose()
+
+    @pytest.mark.asyncio
+    async def test_shared_client_not_closed_by_users(self):
+        rpc = RPCClient(transport=slow_transport(0.0), http2=False)
+        adapter = KaminoAdapter("https://rpc.test", client=rpc)
+        executor = RebalanceExecutor("https://rpc.test", "key", "wallet", client=rpc)
+
+        await adapter.close()
+        await executor.close()
+        assert not rpc.client.is_closed
+
+        assert await adapter._get_obligation_accounts("Wallet1") == []
+        assert rpc.metrics["https://rpc.test"].requests == 1
+        await rpc.aclose()
+        assert rpc.client.is_closed
+
+
+class BatchRPC:
+    """Answers JSON-RPC batch arrays, echoing method names, in reverse order"""
+
+    def __init__(self, drop_ids: tuple = ()):
+        self.bodies: list = []
+        self.drop_ids = drop_ids
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.bodies.append(body)
+        replies = [
+            {"jsonrpc": "2.0", "id": call["id"], "result": {"method": call["method"], "params": call["params"]}}
+            for call in body
+            if call["id"] not in self.drop_ids
+        ]
+        return httpx.Response(200, json=list(reversed(replies)))
+
+
+class TestRPCBatcher:
+    """Test coalescing of concurrent calls into JSON-RPC batches"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_request(self):
+        rpc = BatchRPC()
+        client = httpx.AsyncClient(transport=httpx.MockTransport(rpc))
+        batcher = RPCBatcher("https://rpc.test", client=client)
+
+        replies = await asyncio.gather(*(
+            batcher.call("getAccountInfo", [f"Key{i}"]) for i in range(10)
+        ))
+        assert len(rpc.bodies) == 1
+        assert len(rpc.bodies[0]) == 10
+        assert len({call["id"] for call in rpc.bodies[0]}) == 10
+        # Replies arrive reversed but each caller gets its own
+        assert [r["result"]["params"] for r in replies] == [[f"Key{i}"] for i in range(10)]
+        await batcher.close()
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_max_batch_size(self):
+        rpc = BatchRPC()
+        client = httpx.AsyncClient(transport=httpx.MockTransport(rpc))
+        batcher = RPCBatcher("https://rpc.test", client=client, max_batch_size=4)
+
+        await asyncio.gather(*(batcher.call("getSlot", []) for _ in range(10)))
+        assert [len(b) for b in rpc.bodies] == [4, 4, 2]
+        assert batcher.stats == {"calls": 10, "batches": 3, "largest_batch": 4}
+        await batcher.close()
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_missing_reply_raises_for_that_caller_only(self):
+        rpc = BatchRPC(drop_ids=(2,))
+        client = httpx.AsyncClient(transport=httpx.MockTransport(rpc))
+        batcher = RPCBatcher("https://rpc.test", client=client)
+
+        results = await asyncio.gather(
+            batcher.call("getSlot", []),
+            batcher.call("getSlot", []),
+            return_exceptions=True,
+        )
+        assert results[0]["result"]["method"] == "getSlot"
+        assert isinstance(results[1], RuntimeError)
+        await batcher.close()
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_adapters_route_through_batcher(self):
+        rpc = BatchRPC()
+        client = httpx.AsyncClient(transport=httpx.MockTransport(rpc))
+        batcher = RPCBatcher("https://rpc.test", client=client)
+        adapter = KaminoAdapter("https://rpc.test", batcher=batcher)
+
+        await asyncio.gather(*(adapter.get_health_factor(f"Obl{i}") for i in range(5)))
+        assert len(rpc.bodies) == 1
+        assert {call["method"] for call in rpc.bodies[0]} == {"getAccountInfo"}
+        await adapter.close()
+        await batcher.close()
+        await client.aclose()
+
+
+class TestHelpers:
+    """Test endpoint keys and percentiles"""
+
+    def test_endpoint_key_strips_path_and_query(self):
+        assert endpoint_key("https://mainnet.helius-rpc.com/?api-key=abc") == "https://mainnet.helius-rpc.com"
+
+    def test_percentile_on_deque(self):
+        from collections import deque
+        assert percentile(deque([3.0, 1.0, 2.0]), 50) == 2.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
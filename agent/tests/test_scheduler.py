@@ -0,0 +1,119 @@
+"""Tests for the priority scheduler"""
+import asyncio
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scheduler import PriorityScheduler, distance_to_liquidation, priority
+from tests.test_analyzer import make_position
+
+
+def labelled(label: str, health_factor: float, debt: float):
+    position = make_position(health_factor=health_factor, collateral=debt * 2, debt=debt)
+    position.obligation_key = label
+    return position
+
+
+class Recorder:
+    def __init__(self):
+        self.analyzed = []
+        self.executed = []
+
+    async def analyze(self, positions):
+        await asyncio.sleep(0)
+        self.analyzed.append([p.obligation_key for p in positions])
+        return [p.obligation_key for p in positions]
+
+    async def execute(self, position, analysis):
+        await asyncio.sleep(0)
+        assert analysis == position.obligation_key
+        self.executed.append(analysis)
+
+
+class TestPriority:
+    def test_risk_level_then_distance_then_debt(self):
+        positions = [
+            labelled("small_warning", 1.4, 200),
+            labelled("big_emergency", 1.01, 5_000_000),
+            labelled("small_emergency", 1.01, 1000),
+            labelled("closer_emergency", 1.0, 10),
+            labelled("critical", 1.1, 50_000),
+        ]
+        ordered = [p.obligation_key for p in sorted(positions, key=priority)]
+        assert ordered == ["closer_emergency", "big_emergency", "small_emergency", "critical", "small_warning"]
+
+    def test_distance_to_liquidation(self):
+        assert distance_to_liquidation(make_position(health_factor=2.0)) == pytest.approx(0.5)
+        assert distance_to_liquidation(make_position(health_factor=float("inf"))) == 1.0
+
+
+class TestPriorityScheduler:
+    @pytest.mark.asyncio
+    async def test_urgent_positions_handled_first(self):
+        recorder = Recorder()
+        scheduler = PriorityScheduler(recorder.analyze, recorder.execute, analysis_workers=1, execution_workers=1)
+        await scheduler.run([
+            labelled("warning", 1.4, 200),
+            labelled("critical", 1.1, 50_000),
+            labelled("emergency", 1.01, 5_000_000),
+        ])
+
+        assert recorder.analyzed == [["emergency"], ["critical"], ["warning"]]
+        assert recorder.executed == ["emergency", "critical", "warning"]
+        assert scheduler.get_stats() == {
+            "scheduled": 3, "analyzed": 3, "executed": 3, "errors": 0, "skipped_inflight": 0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_analysis_batches_in_priority_order(self):
+        recorder = Recorder()
+        scheduler = PriorityScheduler(recorder.analyze, recorder.execute, analysis_workers=1, batch_size=2)
+        await scheduler.run([labelled(f"ob{i}", 1.4 - i * 0.1, 100) for i in range(3)])
+
+        assert recorder.analyzed == [["ob2", "ob1"], ["ob0"]]
+        assert sorted(recorder.executed) == ["ob0", "ob1", "ob2"]
+
+    @pytest.mark.asyncio
+    async def test_errors_do_not_stall_pipeline(self):
+        recorder = Recorder()
+
+        async def flaky_execute(position, analysis):
+            if position.obligation_key == "bad":
+                raise RuntimeError("tx failed")
+            await recorder.execute(position, analysis)
+
+        scheduler = PriorityScheduler(recorder.analyze, flaky_execute)
+        await scheduler.run([labelled("bad", 1.01, 100), labelled("good", 1.3, 100)])
+
+        assert recorder.executed == ["good"]
+        assert scheduler.stats["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_overlapping_runs_handle_a_position_once(self):
+        recorder = Recorder()
+        release = asyncio.Event()
+
+        async def slow_execute(position, analysis):
+            await release.wait()
+            await recorder.execute(position, analysis)
+
+        scheduler = PriorityScheduler(recorder.analyze, slow_execute)
+        cycle = asyncio.create_task(scheduler.run([labelled("ob1", 1.01, 100), labelled("ob2", 1.1, 100)]))
+        await asyncio.sleep(0.01)
+        # A streamed update for ob1 while the cycle is still executing it
+        await scheduler.run([labelled("ob1", 1.0, 100)])
+        release.set()
+        await cycle
+
+        assert sorted(recorder.executed) == ["ob1", "ob2"]
+        assert scheduler.stats["skipped_inflight"] == 1
+
+        # Once the cycle is done the position can be scheduled again
+        await scheduler.run([labelled("ob1", 1.0, 100)])
+        assert recorder.executed.count("ob1") == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
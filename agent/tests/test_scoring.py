@@ -0,0 +1,119 @@
+"""Tests for vectorized health scoring"""
+import asyncio
+import base64
+import random
+import pytest
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from protocols.base import HEALTHY_CODE, RISK_LEVELS, Protocol, RiskLevel, classify_risk_codes
+from protocols.kamino import KaminoAdapter, OBLIGATION_SIZE as KAMINO_SIZE
+from protocols.marginfi import MarginFiAdapter, MARGIN_ACCOUNT_SIZE
+from protocols.solend import SolendAdapter, OBLIGATION_SIZE as SOLEND_SIZE
+from protocols.scoring import score_accounts
+from tests.test_fetcher import kamino_obligation
+
+
+def parse_all(adapter, buffers: list[bytes]) -> list:
+    async def parse():
+        return [
+            await adapter.parse_account("Owner1", {
+                "pubkey": f"Account{i}",
+                "account": {"data": [base64.b64encode(b).decode(), "base64"]},
+            })
+            for i, b in enumerate(buffers)
+        ]
+    return asyncio.run(parse())
+
+
+class TestScoreAccounts:
+    def test_kamino_health_factors(self):
+        scores = score_accounts(Protocol.KAMINO, [
+            kamino_obligation(2000, 1000),
+            kamino_obligation(1000, 0),
+            kamino_obligation(1000, 850),
+        ])
+        assert scores.health_factor.tolist() == pytest.approx([1.7, float("inf"), 1.0])
+        assert scores.collateral.tolist() == pytest.approx([2000, 1000, 1000])
+        assert [scores.risk_level(i) for i in range(len(scores))] == [
+            RiskLevel.HEALTHY, RiskLevel.HEALTHY, RiskLevel.EMERGENCY,
+        ]
+
+    def test_kamino_borrows_follow_the_deposits_present(self):
+        # Two deposits push the borrows array 48 bytes further in
+        data = bytearray(KAMINO_SIZE)
+        data[72] = 2
+        for i, value in enumerate((600, 400)):
+            data[73 + 48 * i + 40:73 + 48 * i + 48] = int(value * 1e6).to_bytes(8, "little")
+        data[169] = 1
+        data[170 + 40:170 + 48] = int(850 * 1e6).to_bytes(8, "little")
+
+        scores = score_accounts(Protocol.KAMINO, [bytes(data)])
+        assert scores.collateral[0] == pytest.approx(1000)
+        assert scores.debt[0] == pytest.approx(850)
+        assert scores.health_factor[0] == pytest.approx(1.0)
+
+    def test_short_accounts_score_like_the_parser(self):
+        scores = score_accounts(Protocol.KAMINO, [b"\x00" * 50, kamino_obligation(2000, 1000)])
+        # Nothing to decode: no debt, as parse_account reports
+        assert scores.health_factor[0] == float("inf")
+        assert scores.health_factor[1] == pytest.approx(1.7)
+
+    def test_empty_batch(self):
+        for protocol in (Protocol.KAMINO, Protocol.MARGINFI, Protocol.SOLEND):
+            assert len(score_accounts(protocol, [])) == 0
+
+    @pytest.mark.parametrize("protocol,adapter_cls,size", [
+        (Protocol.KAMINO, KaminoAdapter, KAMINO_SIZE),
+        (Protocol.MARGINFI, MarginFiAdapter, MARGIN_ACCOUNT_SIZE),
+        (Protocol.SOLEND, SolendAdapter, SOLEND_SIZE),
+    ])
+    def test_matches_parse_account(self, protocol, adapter_cls, size):
+        """Batch scores agree with each adapter's parse_account on the same bytes"""
+        rng = random.Random(9)
+        adapter = adapter_cls("http://localhost")
+        # Full accounts plus sizes that cut into each layout's fields and entry arrays
+        sizes = [size, size, size, 0, 50, 72, 73, 82, 90, 97, 98, 121, 130, 500, 842]
+        buffers = [rng.randbytes(rng.choice(sizes)) for _ in range(300)]
+        # Sparse accounts, closer to real ones: few entries, small values
+        for _ in range(100):
+            data = bytearray(size)
+            data[72] = rng.randrange(4)
+            data[73:73 + 48 * 8] = rng.randbytes(48 * 8)
+            buffers.append(bytes(data))
+
+        scores = score_accounts(protocol, buffers)
+        positions = parse_all(adapter, buffers)
+
+        np.testing.assert_allclose(scores.collateral, [p.total_collateral_usd for p in positions], rtol=1e-12)
+        np.testing.assert_allclose(scores.debt, [p.total_debt_usd for p in positions], rtol=1e-12)
+        np.testing.assert_allclose(scores.health_factor, [p.health_factor for p in positions], rtol=1e-12)
+        assert [scores.risk_level(i) for i in range(len(buffers))] == [p.risk_level for p in positions]
+
+
+class TestClassifyRiskCodes:
+    def test_thresholds_match_classify_risk(self):
+        hf = np.array([0.5, 1.05, 1.1, 1.2, 1.4, 1.5, 3.0, np.inf, np.nan])
+        levels = [RISK_LEVELS[code] for code in classify_risk_codes(hf)]
+        adapter = KaminoAdapter("http://localhost")
+        assert levels == [adapter.classify_risk(x) for x in hf]
+        assert levels[:7] == [
+            RiskLevel.EMERGENCY, RiskLevel.CRITICAL, RiskLevel.CRITICAL, RiskLevel.WARNING,
+            RiskLevel.WARNING, RiskLevel.HEALTHY, RiskLevel.HEALTHY,
+        ]
+
+    def test_custom_thresholds(self):
+        codes = classify_risk_codes([1.1, 1.7, 2.5], warn=2.0, critical=1.5, emergency=1.2)
+        assert [RISK_LEVELS[c] for c in codes] == [RiskLevel.EMERGENCY, RiskLevel.WARNING, RiskLevel.HEALTHY]
+
+    def test_at_risk_selection(self):
+        codes = classify_risk_codes([3.0, 1.1, 2.0, 1.3])
+        assert np.flatnonzero(codes < HEALTHY_CODE).tolist() == [1, 3]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
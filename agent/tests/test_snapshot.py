@@ -0,0 +1,105 @@
+"""Tests for market-wide program snapshots"""
+import asyncio
+import base64
+import json
+import pytest
+import sys
+import os
+
+import httpx
+from solders.pubkey import Pubkey
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from protocols.snapshot import ProgramSnapshot
+from protocols.kamino import KaminoAdapter, OBLIGATION_SIZE, OBLIGATION_OWNER_OFFSET
+
+
+def make_obligation(owner: Pubkey, collateral_usd: float = 2000, debt_usd: float = 1000) -> bytes:
+    """Minimal Kamino obligation with one deposit and one borrow"""
+    data = bytearray(OBLIGATION_SIZE)
+    data[OBLIGATION_OWNER_OFFSET:OBLIGATION_OWNER_OFFSET + 32] = bytes(owner)
+    data[72] = 1
+    data[73 + 40:73 + 48] = int(collateral_usd * 1e6).to_bytes(8, "little")
+    data[121] = 1
+    data[122 + 40:122 + 48] = int(debt_usd * 1e6).to_bytes(8, "little")
+    return bytes(data)
+
+
+class FakeProgramRPC:
+    """Answers getProgramAccounts with a fixed account set and records calls"""
+
+    def __init__(self, accounts: list[tuple[str, bytes]]):
+        self.accounts = accounts
+        self.requests: list[dict] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append(body)
+        result = [
+            {"pubkey": key, "account": {"data": [base64.b64encode(data).decode(), "base64"]}}
+            for key, data in self.accounts
+        ]
+        return httpx.Response(200, json={"jsonrpc": "2.0", "id": 1, "result": result})
+
+
+class TestProgramSnapshot:
+    """Test owner indexing and scan reuse"""
+
+    def setup_method(self):
+        self.owners = [Pubkey.new_unique() for _ in range(3)]
+        self.rpc = FakeProgramRPC([
+            ("Obl0", make_obligation(self.owners[0])),
+            ("Obl1", make_obligation(self.owners[0])),
+            ("Obl2", make_obligation(self.owners[1])),
+        ])
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(self.rpc))
+
+    def make_snapshot(self, max_age: float = 30) -> ProgramSnapshot:
+        return ProgramSnapshot(
+            self.client, "http://rpc.test", "Program1111",
+            OBLIGATION_SIZE, OBLIGATION_OWNER_OFFSET, max_age,
+        )
+
+    @pytest.mark.asyncio
+    async def test_index_by_owner(self):
+        snapshot = self.make_snapshot()
+        assert [a["pubkey"] for a in await snapshot.accounts_for(str(self.owners[0]))] == ["Obl0", "Obl1"]
+        assert len(await snapshot.accounts_for(str(self.owners[1]))) == 1
+        assert await snapshot.accounts_for(str(self.owners[2])) == []
+
+    @pytest.mark.asyncio
+    async def test_only_datasize_filter(self):
+        snapshot = self.make_snapshot()
+        await snapshot.refresh()
+        filters = self.rpc.requests[0]["params"][1]["filters"]
+        assert filters == [{"dataSize": OBLIGATION_SIZE}]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_scan(self):
+        snapshot = self.make_snapshot()
+        await asyncio.gather(*(snapshot.accounts_for(str(o)) for o in self.owners * 10))
+        assert snapshot.scan_count == 1
+        assert len(self.rpc.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_rescan_after_max_age(self):
+        snapshot = self.make_snapshot(max_age=0)
+        await snapshot.accounts_for(str(self.owners[0]))
+        await snapshot.accounts_for(str(self.owners[0]))
+        assert snapshot.scan_count == 2
+
+    @pytest.mark.asyncio
+    async def test_adapter_answers_wallets_from_snapshot(self):
+        adapter = KaminoAdapter("http://rpc.test", snapshot_max_age=30)
+        adapter.client = self.client
+        adapter.snapshot.client = self.client
+
+        results = await asyncio.gather(*(adapter.get_positions(str(o)) for o in self.owners))
+        assert [len(r) for r in results] == [2, 1, 0]
+        assert results[0][0].health_factor == pytest.approx(1.7)
+        assert len(self.rpc.requests) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
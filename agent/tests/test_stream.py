@@ -0,0 +1,261 @@
+"""Tests for the websocket account stream against a local stand-in server"""
+import asyncio
+import base64
+import json
+import pytest
+import sys
+import os
+
+import websockets
+from solders.pubkey import Pubkey
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from protocols.base import PositionData, Protocol, RiskLevel
+from protocols.kamino import KaminoAdapter, OBLIGATION_SIZE
+from stream import AccountStream
+
+
+def make_obligation(collateral_usd: float, debt_usd: float) -> str:
+    data = bytearray(OBLIGATION_SIZE)
+    data[72] = 1
+    data[73 + 40:73 + 48] = int(collateral_usd * 1e6).to_bytes(8, "little")
+    data[121] = 1
+    data[122 + 40:122 + 48] = int(debt_usd * 1e6).to_bytes(8, "little")
+    return base64.b64encode(bytes(data)).decode()
+
+
+def make_position(key: str) -> PositionData:
+    return PositionData(
+        protocol=Protocol.KAMINO,
+        owner=str(Pubkey.new_unique()),
+        obligation_key=key,
+        health_factor=2.0,
+        total_collateral_usd=2000,
+        total_debt_usd=850,
+        net_value_usd=1150,
+        risk_level=RiskLevel.HEALTHY,
+    )
+
+
+class FakeValidatorWS:
+    """Minimal stand-in for a Solana pubsub endpoint"""
+
+    def __init__(self):
+        self.subscriptions: dict[int, str] = {}
+        self.requests: list[dict] = []
+        self.connections = []
+        self.subscribed = asyncio.Event()
+        self._next_sub = 100
+
+    async def handler(self, ws):
+        self.connections.append(ws)
+        async for raw in ws:
+            msg = json.loads(raw)
+            self.requests.append(msg)
+            if msg["method"].endswith("Subscribe"):
+                sub_id = self._next_sub
+                self._next_sub += 1
+                self.subscriptions[sub_id] = msg["params"][0]
+                await ws.send(json.dumps({"jsonrpc": "2.0", "result": sub_id, "id": msg["id"]}))
+                self.subscribed.set()
+            else:
+                await ws.send(json.dumps({"jsonrpc": "2.0", "result": True, "id": msg["id"]}))
+
+    async def notify_account(self, key: str, data_b64: str):
+        sub_id = next(s for s, k in self.subscriptions.items() if k == key)
+        await self.connections[-1].send(json.dumps({
+            "jsonrpc": "2.0",
+            "method": "accountNotification",
+            "params": {
+                "subscription": sub_id,
+                "result": {"context": {"slot": 1}, "value": {"data": [data_b64, "base64"]}},
+            },
+        }))
+
+    async def notify_program(self, program_id: str, key: str, data_b64: str):
+        sub_id = next(s for s, k in self.subscriptions.items() if k == program_id)
+        await self.connections[-1].send(json.dumps({
+            "jsonrpc": "2.0",
+            "method": "programNotification",
+            "params": {
+                "subscription": sub_id,
+                "result": {
+                    "context": {"slot": 1},
+                    "value": {"pubkey": key, "account": {"data": [data_b64, "base64"]}},
+                },
+            },
+        }))
+
+
+async def wait_for(predicate, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+class TestAccountStream:
+    """Test subscription and change dispatch over a real websocket"""
+
+    @pytest.mark.asyncio
+    async def test_account_change_reaches_callback(self):
+        validator = FakeValidatorWS()
+        updates: list[PositionData] = []
+
+        async def on_update(position):
+            updates.append(position)
+
+        async with websockets.serve(validator.handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            stream = AccountStream(f"ws://127.0.0.1:{port}", on_update=on_update)
+            adapter = KaminoAdapter("http://rpc.test")
+            await stream.track(make_position("Obligation1"), adapter)
+
+            task = asyncio.create_task(stream.run())
+            await asyncio.wait_for(validator.subscribed.wait(), 2)
+            await wait_for(lambda: stream._subscriptions)
+
+            await validator.notify_account("Obligation1", make_obligation(1000, 800))
+            await wait_for(lambda: updates)
+
+            assert updates[0].obligation_key == "Obligation1"
+            assert updates[0].health_factor == pytest.approx(1.0625)
+            assert updates[0].risk_level == RiskLevel.CRITICAL
+
+            await stream.stop()
+            await task
+            await adapter.close()
+
+    @pytest.mark.asyncio
+    async def test_unchanged_data_not_reparsed(self):
+        validator = FakeValidatorWS()
+        updates: list[PositionData] = []
+
+        async def on_update(position):
+            updates.append(position)
+
+        async with websockets.serve(validator.handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            stream = AccountStream(f"ws://127.0.0.1:{port}", on_update=on_update)
+            adapter = KaminoAdapter("http://rpc.test")
+            await stream.track(make_position("Obligation1"), adapter)
+
+            task = asyncio.create_task(stream.run())
+            await wait_for(lambda: stream._subscriptions)
+
+            data = make_obligation(1000, 500)
+            await validator.notify_account("Obligation1", data)
+            await validator.notify_account("Obligation1", data)
+            await validator.notify_account("Obligation1", make_obligation(1000, 600))
+            await wait_for(lambda: stream.stats["notifications"] == 3)
+            await wait_for(lambda: not stream._deliveries)
+
+            assert stream.stats["positions_updated"] == 2
+            assert stream.stats["unchanged_skipped"] == 1
+            assert updates[-1].total_debt_usd == pytest.approx(600)
+
+            await stream.stop()
+            await task
+            await adapter.close()
+
+    @pytest.mark.asyncio
+    async def test_slow_callback_does_not_block_receive_loop(self):
+        validator = FakeValidatorWS()
+        updates: list[PositionData] = []
+        release = asyncio.Event()
+
+        async def on_update(position):
+            updates.append(position)
+            await release.wait()
+
+        async with websockets.serve(validator.handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            stream = AccountStream(f"ws://127.0.0.1:{port}", on_update=on_update)
+            adapter = KaminoAdapter("http://rpc.test")
+            await stream.track(make_position("Obligation1"), adapter)
+
+            task = asyncio.create_task(stream.run())
+            await wait_for(lambda: stream._subscriptions)
+
+            await validator.notify_account("Obligation1", make_obligation(1000, 500))
+            await wait_for(lambda: updates)
+            # Received and parsed while the first handler is still running
+            await validator.notify_account("Obligation1", make_obligation(1000, 600))
+            await validator.notify_account("Obligation1", make_obligation(1000, 700))
+            await wait_for(lambda: stream.stats["positions_updated"] == 3)
+            assert len(updates) == 1
+
+            release.set()
+            await wait_for(lambda: not stream._deliveries)
+            assert [p.total_debt_usd for p in updates] == pytest.approx([500, 700])
+            assert stream.stats["updates_coalesced"] == 1
+
+            await stream.stop()
+            await task
+            await adapter.close()
+
+    @pytest.mark.asyncio
+    async def test_track_while_connected_and_program_subscribe(self):
+        validator = FakeValidatorWS()
+        updates: list[PositionData] = []
+
+        async def on_update(position):
+            updates.append(position)
+
+        async with websockets.serve(validator.handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            stream = AccountStream(f"ws://127.0.0.1:{port}", on_update=on_update)
+            adapter = KaminoAdapter("http://rpc.test")
+
+            task = asyncio.create_task(stream.run())
+            await asyncio.wait_for(stream.connected.wait(), 2)
+
+            await stream.track_program("KLend111", [{"dataSize": OBLIGATION_SIZE}])
+            await stream.track(make_position("Obligation2"), adapter)
+            await wait_for(lambda: len(stream._subscriptions) == 2)
+
+            # Untracked accounts in the program are ignored
+            await validator.notify_program("KLend111", "Other", make_obligation(1000, 900))
+            await validator.notify_program("KLend111", "Obligation2", make_obligation(1000, 900))
+            await wait_for(lambda: updates)
+
+            assert [p.obligation_key for p in updates] == ["Obligation2"]
+            program_sub = next(r for r in validator.requests if r["method"] == "programSubscribe")
+            assert program_sub["params"][1]["filters"] == [{"dataSize": OBLIGATION_SIZE}]
+
+            await stream.untrack("Obligation2")
+            await wait_for(lambda: any(r["method"] == "accountUnsubscribe" for r in validator.requests))
+
+            await stream.stop()
+            await task
+            await adapter.close()
+
+    @pytest.mark.asyncio
+    async def test_resubscribes_after_reconnect(self):
+        validator = FakeValidatorWS()
+
+        async def on_update(position):
+            pass
+
+        async with websockets.serve(validator.handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            stream = AccountStream(f"ws://127.0.0.1:{port}", on_update=on_update, reconnect_delay=0.01)
+            adapter = KaminoAdapter("http://rpc.test")
+            await stream.track(make_position("Obligation1"), adapter)
+
+            task = asyncio.create_task(stream.run())
+            await wait_for(lambda: len(validator.connections) == 1 and stream._subscriptions)
+
+            await validator.connections[0].close()
+            await wait_for(lambda: len(validator.connections) == 2 and stream.stats["reconnects"] == 1)
+            await wait_for(lambda: sum(r["method"] == "accountSubscribe" for r in validator.requests) == 2)
+
+            await stream.stop()
+            await task
+            await adapter.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,105 @@
+"""Tests for the columnar PositionTable"""
+import pytest
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from protocols.base import (
+    CollateralPosition, DebtPosition, PositionData, Protocol, RiskLevel,
+)
+from protocols.table import PositionTable
+
+
+def make_position(key: str, hf: float = 1.7, protocol: Protocol = Protocol.KAMINO) -> PositionData:
+    return PositionData(
+        protocol=protocol,
+        owner="wallet1",
+        obligation_key=key,
+        health_factor=hf,
+        total_collateral_usd=2000,
+        total_debt_usd=1000,
+        net_value_usd=1000,
+        risk_level=RiskLevel.HEALTHY,
+        collaterals=[
+            CollateralPosition("SOLmint...", "SOL", 10, 1500, 0.75, 0.85),
+            CollateralPosition("USDCmint...", "USDC", 500, 500, 0.8, 0.9),
+        ],
+        debts=[DebtPosition("USDTmint...", "USDT", 1000, 1000, 0.05)],
+        timestamp=1234.5,
+    )
+
+
+class TestPositionTable:
+    def test_view_round_trips_position(self):
+        table = PositionTable()
+        position = make_position("ob1")
+        table.upsert(position)
+
+        view = table["ob1"]
+        assert view.to_position() == position
+        assert view.ltv_ratio == pytest.approx(0.5)
+        assert view.to_risk_summary() == position.to_risk_summary()
+        assert view.liquidation_price is None
+        assert view.asset_mints == ("SOLmint...", "USDCmint...", "USDTmint...")
+
+    def test_upsert_overwrites_row(self):
+        table = PositionTable()
+        table.upsert(make_position("ob1", hf=1.7))
+        table.upsert(make_position("ob1", hf=1.1))
+
+        assert len(table) == 1
+        assert table["ob1"].health_factor == pytest.approx(1.1)
+
+    def test_view_writes_through(self):
+        table = PositionTable()
+        view = table.upsert(make_position("ob1"))
+        view.risk_level = RiskLevel.CRITICAL
+        view.health_factor = 1.15
+
+        assert table["ob1"].risk_level == RiskLevel.CRITICAL
+        assert table.health_factors()[0] == pytest.approx(1.15)
+
+    def test_remove_keeps_rows_contiguous(self):
+        table = PositionTable(capacity=2)
+        for i, hf in enumerate([1.1, 2.0, 3.0]):
+            table.upsert(make_position(f"ob{i}", hf=hf, protocol=Protocol.SOLEND))
+        survivor = table["ob2"]
+
+        assert table.remove("ob0") is True
+        assert table.remove("ob0") is False
+        assert len(table) == 2
+        assert sorted(table.keys()) == ["ob1", "ob2"]
+        assert survivor.health_factor == pytest.approx(3.0)
+        assert survivor.protocol == Protocol.SOLEND
+        assert sorted(table.health_factors().tolist()) == [2.0, 3.0]
+
+    def test_removed_view_raises(self):
+        table = PositionTable()
+        view = table.upsert(make_position("ob1"))
+        table.remove("ob1")
+        with pytest.raises(KeyError):
+            assert view.health_factor is None
+        assert table.get("ob1") is None
+
+    def test_views_from_column_selection(self):
+        table = PositionTable()
+        table.update(make_position(f"ob{i}", hf=hf) for i, hf in enumerate([3.0, 1.1, 2.0]))
+        rows = np.flatnonzero(table.health_factors() < 1.5)
+        assert [v.obligation_key for v in table.views(rows)] == ["ob1"]
+
+    def test_position_without_assets(self):
+        table = PositionTable()
+        position = make_position("ob1")
+        position.collaterals = []
+        position.debts = []
+        view = table.upsert(position)
+        assert view.collaterals == []
+        assert view.debts == []
+        assert view.asset_mints == ()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -5,7 +5,9 @@ import enum
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Protocol
+
+import numpy as np
 
 
 class HealthStatus(enum.Enum):
@@ -28,6 +30,35 @@ class HealthStatus(enum.Enum):
             return cls.WARNING
         return cls.HEALTHY
 
+    @classmethod
+    def from_health_factors(
+        cls,
+        hfs,
+        warn: float = 1.5,
+        critical: float = 1.2,
+        emergency: float = 1.05,
+        liquidation: float = 1.0,
+    ) -> np.ndarray:
+        """Classify an array of health factors in one pass.
+
+        Same bucketing as from_health_factor (upper bounds inclusive), but
+        returns int8 codes indexing HEALTH_STATUSES instead of members.
+        """
+        hfs = np.asarray(hfs, dtype=np.float64)
+        codes = np.digitize(hfs, [emergency, critical, warn], right=True).astype(np.int8) + 1
+        codes[hfs < liquidation] = 0
+        return codes
+
+
+# Bulk status codes index this tuple, worst first (see from_health_factors)
+HEALTH_STATUSES = (
+    HealthStatus.LIQUIDATED,
+    HealthStatus.EMERGENCY,
+    HealthStatus.CRITICAL,
+    HealthStatus.WARNING,
+    HealthStatus.HEALTHY,
+)
+
 
 @dataclass
 class TokenPosition:
@@ -73,11 +104,20 @@ class Position:
         return max(0, (self.total_collateral_usd - liq_price) / self.total_collateral_usd * 100)
 
 
+class RPCBatcher(Protocol):
+    """Anything that can send a JSON-RPC call as part of a batch."""
+
+    async def call(self, method: str, params: list) -> dict:
+        """Return the JSON-RPC response envelope for one call."""
+        ...
+
+
 class ProtocolAdapter(ABC):
     """Abstract base class for DeFi protocol adapters."""
 
-    def __init__(self, rpc_url: str):
+    def __init__(self, rpc_url: str, batcher: Optional[RPCBatcher] = None):
         self.rpc_url = rpc_url
+        self.batcher = batcher
 
     @property
     @abstractmethod
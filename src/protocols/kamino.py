@@ -18,7 +18,7 @@ from typing import Optional
 
 import httpx
 
-from .base import HealthStatus, Position, ProtocolAdapter, TokenPosition
+from .base import HealthStatus, Position, ProtocolAdapter, RPCBatcher, TokenPosition
 
 # Kamino Lending program ID
 KAMINO_LENDING_PROGRAM = "KLend2g3cP87ber8e3v7Fne5vhfce2Ck9MtCAEXJmob"
@@ -41,8 +41,13 @@ KNOWN_MINTS = {
 class KaminoAdapter(ProtocolAdapter):
     """Adapter for Kamino Lending protocol on Solana."""
 
-    def __init__(self, rpc_url: str, market: str = KAMINO_MAIN_MARKET):
-        super().__init__(rpc_url)
+    def __init__(
+        self,
+        rpc_url: str,
+        market: str = KAMINO_MAIN_MARKET,
+        batcher: Optional[RPCBatcher] = None,
+    ):
+        super().__init__(rpc_url, batcher)
         self.market = market
         self._client = httpx.AsyncClient(timeout=30.0)
         self._price_cache: dict[str, float] = {}
@@ -60,9 +65,12 @@ class KaminoAdapter(ProtocolAdapter):
             "method": method,
             "params": params,
         }
-        resp = await self._client.post(self.rpc_url, json=payload)
-        resp.raise_for_status()
-        result = resp.json()
+        if self.batcher is not None:
+            result = await self.batcher.call(method, params)
+        else:
+            resp = await self._client.post(self.rpc_url, json=payload)
+            resp.raise_for_status()
+            result = resp.json()
         if "error" in result:
             raise RuntimeError(f"RPC error: {result['error']}")
         return result.get("result", {})
@@ -17,7 +17,7 @@ from typing import Optional
 
 import httpx
 
-from .base import HealthStatus, Position, ProtocolAdapter, TokenPosition
+from .base import HealthStatus, Position, ProtocolAdapter, RPCBatcher, TokenPosition
 
 # MarginFi V2 program ID
 MARGINFI_PROGRAM = "MFv2hWf31Z9kbCa1snEPYctwafyhdvnV7FZnsebVacA"
@@ -38,8 +38,13 @@ MARGINFI_BANKS = {
 class MarginFiAdapter(ProtocolAdapter):
     """Adapter for MarginFi V2 lending protocol on Solana."""
 
-    def __init__(self, rpc_url: str, group: str = MARGINFI_GROUP):
-        super().__init__(rpc_url)
+    def __init__(
+        self,
+        rpc_url: str,
+        group: str = MARGINFI_GROUP,
+        batcher: Optional[RPCBatcher] = None,
+    ):
+        super().__init__(rpc_url, batcher)
         self.group = group
         self._client = httpx.AsyncClient(timeout=30.0)
 
@@ -55,9 +60,12 @@ class MarginFiAdapter(ProtocolAdapter):
             "method": method,
             "params": params,
         }
-        resp = await self._client.post(self.rpc_url, json=payload)
-        resp.raise_for_status()
-        result = resp.json()
+        if self.batcher is not None:
+            result = await self.batcher.call(method, params)
+        else:
+            resp = await self._client.post(self.rpc_url, json=payload)
+            resp.raise_for_status()
+            result = resp.json()
         if "error" in result:
             raise RuntimeError(f"RPC error: {result['error']}")
         return result.get("result", {})
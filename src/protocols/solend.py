@@ -18,7 +18,7 @@ from typing import Optional
 
 import httpx
 
-from .base import HealthStatus, Position, ProtocolAdapter, TokenPosition
+from .base import HealthStatus, Position, ProtocolAdapter, RPCBatcher, TokenPosition
 
 # Solend program IDs
 SOLEND_PROGRAM_V1 = "So1endDq2YkqhipRh3WViPa8hFb54GbLEaQo5Knh1Lz"
@@ -35,6 +35,11 @@ SOLEND_RESERVES = {
     "mSOL": "CCpirWrgNuBVLdkP2haxLTbD6XEsfiKheLyBTSPieSpY",
 }
 
+# Fixed obligation header, compiled once: version, last_update_slot,
+# (stale flag skipped), lending_market, owner, four u128 values as lo/hi
+# u64 pairs, deposits_len, borrows_len — 140 bytes
+OBLIGATION_HEADER = struct.Struct("<BQx32s32sQQQQQQQQBB")
+
 
 class SolendAdapter(ProtocolAdapter):
     """Adapter for Solend lending protocol on Solana."""
@@ -44,8 +49,9 @@ class SolendAdapter(ProtocolAdapter):
         rpc_url: str,
         pool: str = SOLEND_MAIN_POOL,
         program_id: str = SOLEND_PROGRAM_V2,
+        batcher: Optional[RPCBatcher] = None,
     ):
-        super().__init__(rpc_url)
+        super().__init__(rpc_url, batcher)
         self.pool = pool
         self.program_id = program_id
         self._client = httpx.AsyncClient(timeout=30.0)
@@ -62,9 +68,12 @@ class SolendAdapter(ProtocolAdapter):
             "method": method,
             "params": params,
         }
-        resp = await self._client.post(self.rpc_url, json=payload)
-        resp.raise_for_status()
-        result = resp.json()
+        if self.batcher is not None:
+            result = await self.batcher.call(method, params)
+        else:
+            resp = await self._client.post(self.rpc_url, json=payload)
+            resp.raise_for_status()
+            result = resp.json()
         if "error" in result:
             raise RuntimeError(f"RPC error: {result['error']}")
         return result.get("result", {})
@@ -106,50 +115,31 @@ class SolendAdapter(ProtocolAdapter):
         - Variable: deposit entries (56 bytes each)
         - Variable: borrow entries (80 bytes each)
         """
-        if len(data) < 140:
+        if len(data) < OBLIGATION_HEADER.size:
             return None
 
         try:
-            offset = 0
-
-            # Version (1 byte)
-            version = data[offset]
-            offset += 1
-
-            # Last update slot (8 bytes)
-            last_update_slot = struct.unpack_from("<Q", data, offset)[0]
-            offset += 8
-
-            # Last update stale (1 byte)
-            offset += 1
-
-            # Lending market (32 bytes)
-            lending_market = base64.b64encode(data[offset : offset + 32]).decode()
-            offset += 32
-
-            # Owner (32 bytes)
-            obligation_owner = base64.b64encode(data[offset : offset + 32]).decode()
-            offset += 32
-
-            # Deposited value - u128, WAD scaled (1e18)
-            deposited_raw = int.from_bytes(data[offset : offset + 16], "little")
-            deposited_value = deposited_raw / 1e18
-            offset += 16
-
-            # Borrowed value - u128, WAD scaled
-            borrowed_raw = int.from_bytes(data[offset : offset + 16], "little")
-            borrowed_value = borrowed_raw / 1e18
-            offset += 16
-
-            # Allowed borrow value - u128, WAD scaled
-            allowed_borrow_raw = int.from_bytes(data[offset : offset + 16], "little")
-            allowed_borrow_value = allowed_borrow_raw / 1e18
-            offset += 16
-
-            # Unhealthy borrow value - u128, WAD scaled
-            unhealthy_raw = int.from_bytes(data[offset : offset + 16], "little")
-            unhealthy_borrow_value = unhealthy_raw / 1e18
-            offset += 16
+            (
+                version,
+                last_update_slot,
+                lending_market_raw,
+                owner_raw,
+                deposited_lo, deposited_hi,
+                borrowed_lo, borrowed_hi,
+                allowed_borrow_lo, allowed_borrow_hi,
+                unhealthy_lo, unhealthy_hi,
+                deposits_len,
+                borrows_len,
+            ) = OBLIGATION_HEADER.unpack_from(memoryview(data))
+
+            lending_market = base64.b64encode(lending_market_raw).decode()
+            obligation_owner = base64.b64encode(owner_raw).decode()
+
+            # u128 values, WAD scaled (1e18)
+            deposited_value = (deposited_lo | deposited_hi << 64) / 1e18
+            borrowed_value = (borrowed_lo | borrowed_hi << 64) / 1e18
+            allowed_borrow_value = (allowed_borrow_lo | allowed_borrow_hi << 64) / 1e18
+            unhealthy_borrow_value = (unhealthy_lo | unhealthy_hi << 64) / 1e18
 
             # Calculate health factor
             health_factor = 0.0
@@ -165,12 +155,6 @@ class SolendAdapter(ProtocolAdapter):
 
             status = HealthStatus.from_health_factor(health_factor)
 
-            # Number of deposits and borrows
-            deposits_len = data[offset] if offset < len(data) else 0
-            offset += 1
-            borrows_len = data[offset] if offset < len(data) else 0
-            offset += 1
-
             position = Position(
                 protocol="solend",
                 owner=owner,